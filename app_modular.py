@@ -1,15 +1,24 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, List, Optional, Any
 import asyncio
+import json
+import time
 from datetime import datetime
+import numpy as np
+import pandas as pd
 
 # Import our modules
 from data_providers.yahoo_finance import YahooFinanceProvider
 from agents.financial_analysis_agent import FinancialAnalysisAgent
 from config.settings import settings
+from modules.columnar import ColumnarEncoder
+from modules.config import APIConfig, APISettings
+from modules.http_client import http_client
+from modules.portfolio_risk import portfolio_risk_engine
+from modules.result_cache import CoalescingResultCache
 
 # Robust logging setup
 try:
@@ -40,6 +49,33 @@ app.add_middleware(
 data_provider = YahooFinanceProvider()
 analysis_agent = FinancialAnalysisAgent()
 
+# Coalesces concurrent identical analyses and caches results per (symbol, analysis_type)
+analysis_cache = CoalescingResultCache(
+    ttl_seconds=settings.ANALYSIS_CACHE_TTL,
+    stale_seconds=settings.ANALYSIS_CACHE_STALE_TTL,
+    max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES
+)
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    """Release pooled provider connections"""
+    await http_client.aclose()
+
+async def cancel_on_disconnect(http_request: Request, coro, poll_interval: float = 0.5):
+    """Await `coro`, cancelling it if the client disconnects first"""
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
 # Pydantic models for API requests
 class StockAnalysisRequest(BaseModel):
     symbol: str
@@ -50,6 +86,14 @@ class PortfolioAnalysisRequest(BaseModel):
     symbols: List[str]
     weights: Optional[List[float]] = None
     benchmark: str = "SPY"
+    period: str = "1y"
+    confidence: float = 0.95  # VaR/CVaR confidence level
+
+class BatchAnalysisRequest(BaseModel):
+    symbols: List[str]
+    analysis_type: str = "comprehensive"
+    period: str = "1y"
+    include_memo: bool = True
 
 # API Endpoints
 @app.get("/")
@@ -91,77 +135,351 @@ async def get_stock_metrics(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/v1/stock/{symbol}/historical")
-async def get_historical_data(symbol: str, period: str = "1y"):
-    """Get historical stock data"""
+async def get_historical_data(symbol: str,
+                              http_request: Request,
+                              period: str = "1y",
+                              format: Optional[str] = None,
+                              compression: str = "none",
+                              start: Optional[str] = None,
+                              end: Optional[str] = None,
+                              fields: Optional[str] = None):
+    """
+    Get historical stock data as column-oriented JSON, Arrow IPC or Parquet.
+    
+    The format comes from ?format=json|arrow|parquet or the Accept header;
+    ?compression=gzip|zstd, ?start/?end (ISO dates) and ?fields=open,close
+    narrow and shrink the payload.
+    """
     try:
+        try:
+            fmt = ColumnarEncoder.negotiate(format, http_request.headers.get("accept"))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
         historical_data = await data_provider.get_stock_data(symbol.upper(), period)
         if historical_data.empty:
             raise HTTPException(status_code=404, detail=f"Historical data not found for symbol: {symbol}")
         
-        # Convert DataFrame to JSON
-        data_json = historical_data.to_dict('records')
+        try:
+            selected = ColumnarEncoder.select(
+                historical_data, start, end,
+                [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+            )
+            # Encoding is CPU-bound; keep it off the event loop
+            body, media_type, content_encoding = await asyncio.to_thread(
+                ColumnarEncoder.encode, selected, fmt, compression,
+                {"symbol": symbol.upper(), "period": period}
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        return JSONResponse(content={
-            "symbol": symbol.upper(),
-            "period": period,
-            "data": data_json,
-            "count": len(data_json)
-        })
+        headers = {"Vary": "Accept", "X-Row-Count": str(len(selected))}
+        if content_encoding:
+            headers["Content-Encoding"] = content_encoding
+        return Response(content=body, media_type=media_type, headers=headers)
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching historical data for {symbol}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def fetch_analysis_inputs(symbol: str):
+    """Fetch quote, metrics and statements in parallel; 404 if none are available"""
+    tasks = [
+        data_provider.get_real_time_price(symbol),
+        data_provider.get_key_metrics(symbol),
+        data_provider.get_financial_statements(symbol)
+    ]
+    
+    quote_data, metrics_data, financial_data = await asyncio.gather(*tasks)
+    
+    if not any([quote_data, metrics_data, financial_data]):
+        raise HTTPException(status_code=404, detail=f"Insufficient data found for symbol: {symbol}")
+    
+    return quote_data, metrics_data, financial_data
+
+async def build_comprehensive_analysis(symbol: str, analysis_type: str,
+                                       performance: Optional[Dict[str, Any]] = None,
+                                       risk_free_rate: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Fetch market data and generate the AI memo for one symbol.
+    
+    Batch callers pass the `performance` summary of their shared history
+    download and the batch's risk-free rate, so the memo uses them instead
+    of the configured defaults.
+    """
+    logger.info(f"Starting comprehensive analysis for {symbol}")
+    
+    quote_data, metrics_data, financial_data = await fetch_analysis_inputs(symbol)
+    
+    market_data = dict(quote_data or {})
+    if performance:
+        market_data["performance"] = performance
+    if risk_free_rate is not None:
+        market_data["risk_free_rate"] = risk_free_rate
+    
+    # Generate AI analysis
+    analysis_result = await analysis_agent.generate_investment_memo(
+        company_data=metrics_data,
+        financial_data=metrics_data,
+        market_data=market_data
+    )
+    
+    # The agent reports LLM failures in-band; raise so the result cache never stores them
+    if "error" in analysis_result:
+        raise HTTPException(status_code=502, detail=f"AI analysis failed: {analysis_result['error']}")
+    
+    logger.info(f"Completed comprehensive analysis for {symbol}")
+    
+    # Combine all data into comprehensive response
+    return {
+        "symbol": symbol,
+        "analysis_type": analysis_type,
+        "timestamp": datetime.now().isoformat(),
+        "current_quote": quote_data,
+        "financial_metrics": metrics_data,
+        "ai_analysis": analysis_result,
+        "data_quality": {
+            "quote_available": bool(quote_data),
+            "metrics_available": bool(metrics_data),
+            "financial_statements_available": bool(financial_data)
+        }
+    }
+
 @app.post("/api/v1/analysis/comprehensive")
-async def comprehensive_analysis(request: StockAnalysisRequest):
+async def comprehensive_analysis(request: StockAnalysisRequest, http_request: Request):
     """Generate comprehensive investment analysis memo"""
     try:
         symbol = request.symbol.upper()
-        logger.info(f"Starting comprehensive analysis for {symbol}")
         
-        # Fetch all required data in parallel
-        tasks = [
-            data_provider.get_real_time_price(symbol),
-            data_provider.get_key_metrics(symbol),
-            data_provider.get_financial_statements(symbol)
-        ]
+        # A disconnect only abandons this waiter; the shared computation still fills the cache
+        result, cache_info = await cancel_on_disconnect(http_request, analysis_cache.get_or_compute(
+            (symbol, request.analysis_type),
+            lambda: build_comprehensive_analysis(symbol, request.analysis_type)
+        ))
         
-        quote_data, metrics_data, financial_data = await asyncio.gather(*tasks)
-        
-        if not any([quote_data, metrics_data, financial_data]):
-            raise HTTPException(status_code=404, detail=f"Insufficient data found for symbol: {symbol}")
+        response = {**result, "data_quality": {**result["data_quality"], **cache_info}}
+        return JSONResponse(content=response)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in comprehensive analysis for {request.symbol}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.post("/api/v1/analysis/comprehensive/stream")
+async def comprehensive_analysis_stream(request: StockAnalysisRequest, http_request: Request):
+    """Stream the comprehensive analysis as server-sent events (meta, token..., done)"""
+    symbol = request.symbol.upper()
+    cache_key = (symbol, request.analysis_type)
+    
+    async def events():
+        cached = analysis_cache.peek(cache_key)
+        if cached is not None:
+            yield sse_event("meta", {k: v for k, v in cached.items() if k != "ai_analysis"})
+            if "error" in cached["ai_analysis"]:
+                yield sse_event("error", {"status_code": 502, "detail": f"AI analysis failed: {cached['ai_analysis']['error']}"})
+                return
+            yield sse_event("token", {"text": cached["ai_analysis"].get("investment_memo", "")})
+            yield sse_event("done", {"cache_status": "hit", "model_used": cached["ai_analysis"].get("model_used")})
+            return
         
-        # Generate AI analysis
-        analysis_result = await analysis_agent.generate_investment_memo(
-            company_data=metrics_data,
-            financial_data=metrics_data,
-            market_data=quote_data
-        )
+        try:
+            quote_data, metrics_data, financial_data = await fetch_analysis_inputs(symbol)
+        except HTTPException as e:
+            yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+            return
         
-        # Combine all data into comprehensive response
-        response = {
+        result = {
             "symbol": symbol,
             "analysis_type": request.analysis_type,
             "timestamp": datetime.now().isoformat(),
             "current_quote": quote_data,
             "financial_metrics": metrics_data,
-            "ai_analysis": analysis_result,
             "data_quality": {
                 "quote_available": bool(quote_data),
                 "metrics_available": bool(metrics_data),
                 "financial_statements_available": bool(financial_data)
             }
         }
+        # Market data goes out first so clients can render it before the memo starts
+        yield sse_event("meta", result)
         
-        logger.info(f"Completed comprehensive analysis for {symbol}")
-        return JSONResponse(content=response)
+        memo = []
+        try:
+            async for delta in analysis_agent.stream_investment_memo(
+                company_data=metrics_data,
+                financial_data=metrics_data,
+                market_data=quote_data
+            ):
+                # Stop generating (and release the LLM slot) once the client is gone
+                if await http_request.is_disconnected():
+                    logger.info(f"Client disconnected during streamed analysis for {symbol}")
+                    return
+                memo.append(delta)
+                yield sse_event("token", {"text": delta})
+        except Exception as e:
+            logger.error(f"Error streaming analysis for {symbol}: {str(e)}")
+            yield sse_event("error", {"status_code": 500, "detail": str(e)})
+            return
+        
+        result["ai_analysis"] = {
+            "symbol": (metrics_data or {}).get("symbol", ""),
+            "company_name": (metrics_data or {}).get("company_name", ""),
+            "analysis_date": datetime.now().isoformat(),
+            "investment_memo": "".join(memo),
+            "data_sources": ["Yahoo Finance", "Alpha Vantage", "FRED"],
+            "model_used": analysis_agent.model
+        }
+        # Completed streams populate the same cache as the JSON endpoint
+        analysis_cache.put(cache_key, result)
+        yield sse_event("done", {"cache_status": "miss", "model_used": analysis_agent.model})
     
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def fetch_risk_free_rate() -> float:
+    """Current 10-Year Treasury yield from FRED, falling back to the configured rate"""
+    if not APIConfig.FRED_API_KEY:
+        return settings.RISK_FREE_RATE
+    try:
+        response = await http_client.aget(APISettings.FRED_BASE_URL, params={
+            'series_id': APISettings.FRED_TREASURY_SERIES,
+            'api_key': APIConfig.FRED_API_KEY,
+            'limit': 1,
+            'sort_order': 'desc',
+            'file_type': 'json'
+        })
+        if response.status_code == 200:
+            observations = response.json().get('observations') or []
+            if observations:
+                return float(observations[0]['value']) / 100
     except Exception as e:
-        logger.error(f"Error in comprehensive analysis for {request.symbol}: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.warning(f"Could not fetch risk-free rate: {str(e)}")
+    return settings.RISK_FREE_RATE
+
+def history_summary(history, risk_free_rate: float) -> Dict[str, Any]:
+    """Return, volatility, Sharpe ratio and drawdown from a daily price history"""
+    if history is None or history.empty or 'close' not in history:
+        return {}
+    
+    close = history['close'].dropna()
+    returns = close.pct_change().dropna()
+    if returns.empty:
+        return {"last_close": float(close.iloc[-1])} if not close.empty else {}
+    
+    total_return = close.iloc[-1] / close.iloc[0] - 1
+    annual_return = (1 + total_return) ** (252 / len(returns)) - 1
+    volatility = returns.std() * np.sqrt(252)
+    drawdown = close / close.cummax() - 1
+    
+    return {
+        "last_close": round(float(close.iloc[-1]), 4),
+        "total_return": round(float(total_return), 4),
+        "annualized_return": round(float(annual_return), 4),
+        "annualized_volatility": round(float(volatility), 4),
+        "sharpe_ratio": round(float((annual_return - risk_free_rate) / volatility), 3) if volatility > 0 else None,
+        "max_drawdown": round(float(drawdown.min()), 4),
+        "observations": int(len(close))
+    }
+
+@app.post("/api/v1/analysis/batch")
+async def batch_analysis(request: BatchAnalysisRequest, http_request: Request):
+    """
+    Analyze a watchlist in one request, streaming one `result` event per symbol as it finishes.
+    
+    Symbols are deduplicated; price histories come from a single multi-ticker
+    download and the risk-free rate is fetched once for the whole batch. Memos
+    go through the shared analysis cache with at most BATCH_MEMO_CONCURRENCY
+    in flight.
+    """
+    submitted = [s.strip().upper() for s in request.symbols]
+    blanks_removed = submitted.count("")
+    symbols = list(dict.fromkeys(s for s in submitted if s))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="No symbols provided")
+    if len(symbols) > settings.BATCH_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BATCH_MAX_SYMBOLS} symbols per batch, got {len(symbols)}"
+        )
+    
+    async def analyze(symbol: str, history, risk_free_rate: float, memo_slots: asyncio.Semaphore) -> Dict[str, Any]:
+        performance = history_summary(history, risk_free_rate)
+        result = {"symbol": symbol, "performance": performance}
+        if not request.include_memo:
+            return result
+        try:
+            async with memo_slots:
+                # The memo reuses the batch's history download and risk-free rate
+                analysis, cache_info = await analysis_cache.get_or_compute(
+                    (symbol, request.analysis_type),
+                    lambda: build_comprehensive_analysis(symbol, request.analysis_type, performance, risk_free_rate)
+                )
+            result.update(analysis)
+            result["data_quality"] = {**analysis["data_quality"], **cache_info}
+        except HTTPException as e:
+            result["error"] = {"status_code": e.status_code, "detail": e.detail}
+        except Exception as e:
+            logger.error(f"Error in batch analysis for {symbol}: {str(e)}")
+            result["error"] = {"status_code": 500, "detail": str(e)}
+        return result
+    
+    async def events():
+        started = time.perf_counter()
+        histories, risk_free_rate = await asyncio.gather(
+            data_provider.get_batch_history(symbols, request.period),
+            fetch_risk_free_rate()
+        )
+        yield sse_event("start", {
+            "symbols": symbols,
+            "duplicates_removed": len(submitted) - blanks_removed - len(symbols),
+            "blanks_removed": blanks_removed,
+            "risk_free_rate": risk_free_rate,
+            "histories_available": len(histories)
+        })
+        
+        memo_slots = asyncio.Semaphore(settings.BATCH_MEMO_CONCURRENCY)
+        tasks = [
+            asyncio.ensure_future(analyze(symbol, histories.get(symbol), risk_free_rate, memo_slots))
+            for symbol in symbols
+        ]
+        failed = 0
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                if await http_request.is_disconnected():
+                    logger.info(f"Client disconnected during batch analysis of {len(symbols)} symbols")
+                    return
+                failed += "error" in result
+                yield sse_event("result", result)
+        finally:
+            # Unfinished memos keep filling the shared cache; only the per-symbol waiters stop
+            for task in tasks:
+                task.cancel()
+        
+        yield sse_event("done", {
+            "completed": len(symbols) - failed,
+            "failed": failed,
+            "seconds": round(time.perf_counter() - started, 2)
+        })
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.post("/api/v1/analysis/dcf")
-async def dcf_valuation(request: StockAnalysisRequest):
+async def dcf_valuation(request: StockAnalysisRequest, http_request: Request):
     """Generate DCF valuation analysis"""
     try:
         symbol = request.symbol.upper()
@@ -178,7 +496,9 @@ async def dcf_valuation(request: StockAnalysisRequest):
         combined_data = {**financial_data, **statements}
         
         # Generate DCF analysis
-        dcf_result = await analysis_agent.calculate_dcf_valuation(combined_data)
+        dcf_result = await cancel_on_disconnect(
+            http_request, analysis_agent.calculate_dcf_valuation(combined_data)
+        )
         
         response = {
             "symbol": symbol,
@@ -191,64 +511,99 @@ async def dcf_valuation(request: StockAnalysisRequest):
         logger.info(f"Completed DCF analysis for {symbol}")
         return JSONResponse(content=response)
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in DCF analysis for {request.symbol}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def close_frame(histories: Dict[str, Any]) -> pd.DataFrame:
+    """Aligned (dates x symbols) matrix of dividend-adjusted closes from get_batch_history output"""
+    return pd.DataFrame({
+        symbol: history.set_index(history.columns[0])['close']
+        for symbol, history in histories.items()
+    })
+
 @app.post("/api/v1/analysis/portfolio")
 async def portfolio_analysis(request: PortfolioAnalysisRequest):
-    """Analyze a portfolio of stocks"""
+    """Analyze a weighted portfolio: fundamentals plus volatility, beta, VaR/CVaR, drawdown and correlations"""
     try:
-        logger.info(f"Starting portfolio analysis for {len(request.symbols)} stocks")
+        symbols = [symbol.upper() for symbol in request.symbols]
+        benchmark = request.benchmark.upper()
+        if not symbols:
+            raise HTTPException(status_code=400, detail="No symbols provided")
+        if request.weights is not None and len(request.weights) != len(symbols):
+            raise HTTPException(status_code=400, detail="weights must have one entry per symbol")
+        if not 0.5 < request.confidence < 1:
+            raise HTTPException(status_code=400, detail="confidence must be between 0.5 and 1")
         
-        # Get data for all symbols in parallel
-        tasks = []
-        for symbol in request.symbols:
-            tasks.extend([
-                data_provider.get_real_time_price(symbol.upper()),
-                data_provider.get_key_metrics(symbol.upper())
-            ])
+        weights = None
+        if request.weights is not None:
+            weights = {}
+            for symbol, weight in zip(symbols, request.weights):
+                weights[symbol] = weights.get(symbol, 0.0) + weight
+        universe = list(dict.fromkeys(symbols))
+        logger.info(f"Starting portfolio analysis for {len(universe)} stocks")
         
-        results = await asyncio.gather(*tasks)
+        # One multi-ticker download covers the holdings and the benchmark
+        history_task = data_provider.get_batch_history(list(dict.fromkeys(universe + [benchmark])), request.period)
+        quote_tasks = [
+            asyncio.gather(data_provider.get_real_time_price(symbol), data_provider.get_key_metrics(symbol))
+            for symbol in universe
+        ]
+        histories, *quotes = await asyncio.gather(history_task, *quote_tasks)
         
-        # Organize results by symbol
-        portfolio_data = {}
-        for i, symbol in enumerate(request.symbols):
-            quote_idx = i * 2
-            metrics_idx = i * 2 + 1
-            
-            portfolio_data[symbol.upper()] = {
-                "quote": results[quote_idx] if quote_idx < len(results) else {},
-                "metrics": results[metrics_idx] if metrics_idx < len(results) else {}
-            }
+        portfolio_data = {
+            symbol: {"quote": quote, "metrics": metrics}
+            for symbol, (quote, metrics) in zip(universe, quotes)
+        }
         
-        # Calculate portfolio-level metrics
-        total_market_cap = sum(
-            data["metrics"].get("market_cap", 0) 
-            for data in portfolio_data.values()
-        )
+        benchmark_history = histories.get(benchmark)
+        holdings = close_frame({symbol: histories[symbol] for symbol in universe if symbol in histories})
+        if holdings.empty:
+            raise HTTPException(status_code=404, detail="No price history found for the portfolio symbols")
+        benchmark_close = close_frame({benchmark: benchmark_history})[benchmark] if benchmark_history is not None else None
         
-        weighted_pe = sum(
-            (data["metrics"].get("market_cap", 0) / total_market_cap if total_market_cap > 0 else 0) * 
-            data["metrics"].get("pe_ratio", 0)
-            for data in portfolio_data.values()
+        # Matrix work runs off the event loop; the covariance is reused for the same universe and window
+        try:
+            risk = await asyncio.to_thread(
+                portfolio_risk_engine.analyze, holdings, weights, benchmark_close, request.confidence
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        
+        # P/E weighted by the portfolio weights; zero P/E (missing or negative earnings) is skipped
+        position_weights = risk["weights"]
+        pe_weight = sum(
+            position_weights.get(symbol, 0.0)
+            for symbol, data in portfolio_data.items()
+            if data["metrics"].get("pe_ratio")
         )
+        weighted_pe = sum(
+            position_weights.get(symbol, 0.0) * data["metrics"].get("pe_ratio", 0)
+            for symbol, data in portfolio_data.items()
+            if data["metrics"].get("pe_ratio")
+        ) / pe_weight if pe_weight > 0 else 0
         
         response = {
-            "symbols": request.symbols,
-            "benchmark": request.benchmark,
+            "symbols": universe,
+            "benchmark": benchmark,
+            "period": request.period,
             "timestamp": datetime.now().isoformat(),
             "portfolio_data": portfolio_data,
             "portfolio_metrics": {
-                "total_market_cap": total_market_cap,
+                "total_market_cap": sum(data["metrics"].get("market_cap", 0) for data in portfolio_data.values()),
                 "weighted_pe_ratio": round(weighted_pe, 2),
-                "stock_count": len(request.symbols)
-            }
+                "stock_count": len(universe)
+            },
+            "risk_metrics": risk
         }
         
-        logger.info(f"Completed portfolio analysis for {len(request.symbols)} stocks")
+        logger.info(f"Completed portfolio analysis for {len(universe)} stocks")
         return JSONResponse(content=response)
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in portfolio analysis: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,8 +1,15 @@
-from groq import Groq
-from typing import Dict, List, Optional, Any
-import json
+from groq import AsyncGroq
+from typing import AsyncIterator, Dict, List, Optional, Any
+import asyncio
+import textwrap
 from datetime import datetime
 from config.settings import settings
+from modules.llm_rate_limit import llm_rate_limiter
+from modules.model_registry import ModelRegistry
+from agents.prompt_compiler import (
+    PromptCompiler, PromptSection, KEY_STATEMENT_ROWS,
+    format_fields, format_groups, format_statement
+)
 
 # Robust logging setup
 try:
@@ -16,8 +23,36 @@ class FinancialAnalysisAgent:
     """AI Agent for comprehensive financial analysis using Groq LLM"""
     
     def __init__(self):
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
+        # Async client so completions never block the event loop
+        self.client = AsyncGroq(api_key=settings.GROQ_API_KEY, timeout=settings.LLM_TIMEOUT)
         self.model = settings.DEFAULT_MODEL
+        self._llm_slots = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        self.prompt_compiler = PromptCompiler()
+    
+    async def _complete(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float):
+        """Run one chat completion after shared rate-limit admission, within the per-process concurrency limit"""
+        reserved = llm_rate_limiter.estimate_tokens(messages, max_tokens)
+        await llm_rate_limiter.aacquire(self.model, reserved)
+        try:
+            async with self._llm_slots:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+        except Exception as e:
+            self._penalize_rate_limit(e)
+            raise
+        
+        usage = getattr(response, "usage", None)
+        llm_rate_limiter.reconcile(self.model, reserved, getattr(usage, "total_tokens", None))
+        return response
+        
+    def _penalize_rate_limit(self, error: Exception):
+        """On a provider 429 despite admission, hold off every process sharing the model's budget"""
+        if getattr(error, "status_code", None) == 429:
+            llm_rate_limiter.penalize(self.model, ModelRegistry.retry_after(error))
         
     async def generate_investment_memo(self, 
                                      company_data: Dict[str, Any],
@@ -33,8 +68,7 @@ class FinancialAnalysisAgent:
         prompt = self._create_investment_memo_prompt(context)
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await self._complete(
                 messages=[
                     {"role": "system", "content": self._get_system_prompt()},
                     {"role": "user", "content": prompt}
@@ -58,9 +92,49 @@ class FinancialAnalysisAgent:
             logger.error(f"Error generating investment memo: {str(e)}")
             return {"error": str(e)}
     
+    async def stream_investment_memo(self,
+                                     company_data: Dict[str, Any],
+                                     financial_data: Dict[str, Any],
+                                     market_data: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Yield the investment memo text incrementally as the model produces it
+        """
+        context = self._prepare_analysis_context(company_data, financial_data, market_data)
+        prompt = self._create_investment_memo_prompt(context)
+        
+        messages = [
+            {"role": "system", "content": self._get_system_prompt()},
+            {"role": "user", "content": prompt}
+        ]
+        reserved = llm_rate_limiter.estimate_tokens(messages, settings.MAX_TOKENS)
+        await llm_rate_limiter.aacquire(self.model, reserved)
+        
+        generated = 0
+        try:
+            async with self._llm_slots:
+                stream = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=settings.MAX_TOKENS,
+                    temperature=settings.TEMPERATURE,
+                    stream=True
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        generated += len(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+        except Exception as e:
+            self._penalize_rate_limit(e)
+            raise
+        finally:
+            # Settle even when the client disconnects mid-stream and the generator is closed
+            llm_rate_limiter.reconcile(
+                self.model, reserved, llm_rate_limiter.estimate_tokens(messages) + int(generated / 3.5)
+            )
+    
     def _get_system_prompt(self) -> str:
         """System prompt defining the AI agent's role and expertise"""
-        return """
+        return textwrap.dedent("""
         You are a senior investment analyst with 15+ years of experience at top-tier global investment firms 
         (BlackRock, Goldman Sachs Asset Management). You have deep expertise in:
         
@@ -77,25 +151,20 @@ class FinancialAnalysisAgent:
         - Critical and unbiased, highlighting both opportunities and risks
         
         Always provide specific numerical analysis, ratios, and forward-looking assessments.
-        """
+        """).strip()
     
     def _create_investment_memo_prompt(self, context: Dict[str, Any]) -> str:
-        """Create detailed prompt for investment memo generation"""
-        
-        return f"""
-        Analyze the following company and provide a comprehensive investment memo:
-        
-        COMPANY DATA:
-        {json.dumps(context['company_info'], indent=2)}
-        
-        FINANCIAL METRICS:
-        {json.dumps(context['financial_metrics'], indent=2)}
+        """Create detailed prompt for investment memo generation within the model's token budget"""
         
-        STOCK PERFORMANCE:
-        {json.dumps(context['stock_performance'], indent=2)}
+        sections = [
+            PromptSection.text("COMPANY", format_fields(context['company_info']), priority=100, required=True),
+            PromptSection.text("STOCK PERFORMANCE", format_fields(context['stock_performance']), priority=90),
+            PromptSection.text("FINANCIAL METRICS", format_groups(context['financial_metrics']), priority=80),
+            PromptSection.text("MARKET CONTEXT", format_fields(context['market_context']), priority=40),
+        ]
         
-        MARKET CONTEXT:
-        {json.dumps(context['market_context'], indent=2)}
+        instructions = """
+        Analyze the company above (values: T/B/M = trillions/billions/millions; ratios as decimals; omitted fields are unavailable) and provide a comprehensive investment memo.
         
         Please structure your analysis as follows:
         
@@ -146,6 +215,8 @@ class FinancialAnalysisAgent:
         - Compare all metrics to sector and market averages
         - Be critical and objective - don't shy away from negative analysis
         """
+        
+        return self._compile_prompt(sections, instructions, reserved_tokens=settings.MAX_TOKENS)
     
     def _prepare_analysis_context(self, 
                                 company_data: Dict[str, Any],
@@ -195,22 +266,41 @@ class FinancialAnalysisAgent:
                 "52_week_high": financial_data.get("52_week_high", 0),
                 "52_week_low": financial_data.get("52_week_low", 0),
                 "beta": financial_data.get("beta", 0),
-                "volume": market_data.get("volume", 0)
+                "volume": market_data.get("volume", 0),
+                # Return/volatility/drawdown over the requested period, when the caller has the history
+                **{f"period_{key}": value for key, value in (market_data.get("performance") or {}).items()}
             },
             "market_context": {
                 "analysis_date": datetime.now().strftime("%Y-%m-%d"),
-                "risk_free_rate": settings.RISK_FREE_RATE,
+                "risk_free_rate": market_data.get("risk_free_rate", settings.RISK_FREE_RATE),
                 "market_return": settings.MARKET_RETURN
             }
         }
     
-    async def calculate_dcf_valuation(self, financial_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Calculate DCF valuation using financial data"""
+    def _create_dcf_prompt(self, financial_data: Dict[str, Any]) -> str:
+        """Create the DCF prompt from key metrics plus compact statement tables"""
+        statements = {
+            "INCOME STATEMENT": (financial_data.get("income_statement") or {}, 80),
+            "CASH FLOW": (financial_data.get("cash_flow") or {}, 70),
+            "BALANCE SHEET": (financial_data.get("balance_sheet") or {}, 60),
+        }
+        metrics = {
+            key: value for key, value in financial_data.items()
+            if key not in ("income_statement", "cash_flow", "balance_sheet", "last_updated")
+            and not isinstance(value, (dict, list))
+        }
         
-        dcf_prompt = f"""
-        Calculate a detailed DCF (Discounted Cash Flow) valuation for a company with the following financials:
+        sections = [PromptSection.text("KEY METRICS", format_fields(metrics), priority=90, required=True)]
+        for title, (statement, priority) in statements.items():
+            # Full table, then valuation rows only, then the latest two years of those rows
+            sections.append(PromptSection(title, [
+                lambda st=statement: format_statement(st),
+                lambda st=statement: format_statement(st, rows=KEY_STATEMENT_ROWS),
+                lambda st=statement: format_statement(st, max_periods=2, rows=KEY_STATEMENT_ROWS),
+            ], priority=priority))
         
-        {json.dumps(financial_data, indent=2)}
+        instructions = """
+        Calculate a detailed DCF (Discounted Cash Flow) valuation for the company above (values: T/B/M = trillions/billions/millions; statement columns are fiscal years, newest first).
         
         Provide:
         1. 5-year revenue projections with growth assumptions
@@ -225,9 +315,29 @@ class FinancialAnalysisAgent:
         Be specific with all calculations and show your work.
         """
         
+        return self._compile_prompt(sections, instructions, reserved_tokens=3000)
+    
+    def _compile_prompt(self, sections: List[PromptSection], instructions: str, reserved_tokens: int) -> str:
+        """Fit sections into the current model's budget and log what had to be cut"""
+        system_tokens = self.prompt_compiler.count_tokens(self._get_system_prompt())
+        compiled = self.prompt_compiler.compile(
+            sections, instructions, model=self.model,
+            reserved_tokens=reserved_tokens + system_tokens
+        )
+        if compiled.degraded or compiled.dropped:
+            logger.info(
+                f"Prompt trimmed to {compiled.tokens}/{compiled.budget} tokens "
+                f"(compacted: {compiled.degraded}, dropped: {compiled.dropped})"
+            )
+        return compiled.text
+    
+    async def calculate_dcf_valuation(self, financial_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Calculate DCF valuation using financial data"""
+        
+        dcf_prompt = self._create_dcf_prompt(financial_data)
+        
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await self._complete(
                 messages=[
                     {"role": "system", "content": "You are a financial modeling expert specializing in DCF valuations. Provide detailed, step-by-step calculations."},
                     {"role": "user", "content": dcf_prompt}
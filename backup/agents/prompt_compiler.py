@@ -0,0 +1,199 @@
+import math
+import numbers
+import textwrap
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from config.settings import settings
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+# Context windows (tokens) of the Groq models we route to
+MODEL_CONTEXT_WINDOWS = {
+    "llama-3.3-70b-versatile": 131072,
+    "llama-3.1-70b-versatile": 131072,
+    "llama-3.1-8b-instant": 131072,
+    "mixtral-8x7b-32768": 32768,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Statement rows that matter for valuation, in the order they should survive truncation
+KEY_STATEMENT_ROWS = [
+    "Total Revenue", "Gross Profit", "EBITDA", "Operating Income", "Pretax Income",
+    "Tax Provision", "Net Income", "Diluted EPS", "Interest Expense",
+    "Operating Cash Flow", "Capital Expenditure", "Free Cash Flow",
+    "Depreciation And Amortization", "Repurchase Of Capital Stock", "Cash Dividends Paid",
+    "Total Assets", "Total Debt", "Net Debt", "Cash And Cash Equivalents",
+    "Stockholders Equity", "Working Capital", "Ordinary Shares Number",
+]
+
+
+def format_value(value: Any) -> Optional[str]:
+    """Compact rendering of a scalar; None for values not worth sending"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "yes" if value else None
+    if isinstance(value, numbers.Real):
+        if value == 0 or math.isnan(value) or math.isinf(value):
+            return None
+        magnitude = abs(value)
+        for threshold, suffix in ((1e12, "T"), (1e9, "B"), (1e6, "M")):
+            if magnitude >= threshold:
+                return f"{value / threshold:.2f}{suffix}"
+        if magnitude >= 100:
+            return f"{value:.0f}" if float(value).is_integer() else f"{value:.1f}"
+        if magnitude >= 1:
+            return f"{value:.2f}"
+        return f"{value:.3g}"
+    text = str(value).strip()
+    return text or None
+
+
+def format_fields(values: Dict[str, Any]) -> str:
+    """`key=value` pairs on one line, skipping empty and zero fields"""
+    parts = []
+    for key, value in values.items():
+        rendered = format_value(value)
+        if rendered is not None:
+            parts.append(f"{key}={rendered}")
+    return ", ".join(parts)
+
+
+def format_groups(groups: Dict[str, Dict[str, Any]]) -> str:
+    """One line per metric group"""
+    lines = []
+    for name, values in groups.items():
+        line = format_fields(values)
+        if line:
+            lines.append(f"{name}: {line}")
+    return "\n".join(lines)
+
+
+def format_statement(statement: Dict[Any, Dict[str, Any]],
+                     max_periods: int = 4,
+                     rows: Optional[Sequence[str]] = None) -> str:
+    """
+    Render a yfinance statement dict ({period: {line_item: value}}) as a pipe table.
+
+    Periods are newest first and labelled by year. Rows that are empty in
+    every period are dropped; `rows` restricts and orders the line items.
+    """
+    periods = sorted(statement.keys(), key=str, reverse=True)[:max_periods]
+    if not periods:
+        return ""
+
+    if rows is None:
+        available = {item for period in periods for item in statement[period]}
+        ordered = [item for item in KEY_STATEMENT_ROWS if item in available]
+        rows = ordered + sorted(available - set(ordered))
+
+    labels = [str(period)[:4] for period in periods]
+    lines = ["item | " + " | ".join(labels)]
+    for item in rows:
+        cells = [format_value(statement[period].get(item)) for period in periods]
+        if any(cells):
+            lines.append(f"{item} | " + " | ".join(cell or "-" for cell in cells))
+    return "\n".join(lines) if len(lines) > 1 else ""
+
+
+@dataclass
+class PromptSection:
+    """
+    A titled block of prompt context.
+
+    `variants` are renderings from fullest to most compact; the compiler
+    moves to the next variant before dropping the section. Required
+    sections are never dropped.
+    """
+    title: str
+    variants: List[Callable[[], str]]
+    priority: int = 50
+    required: bool = False
+
+    @classmethod
+    def text(cls, title: str, body: str, priority: int = 50, required: bool = False) -> "PromptSection":
+        return cls(title, [lambda: body], priority, required)
+
+
+@dataclass
+class CompiledPrompt:
+    """Final prompt text with its token count and what was cut to fit"""
+    text: str
+    tokens: int
+    budget: int
+    degraded: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+
+class PromptCompiler:
+    """Assembles prompt sections under a per-model token budget"""
+
+    def __init__(self, max_prompt_tokens: Optional[int] = None):
+        self.max_prompt_tokens = max_prompt_tokens or settings.PROMPT_TOKEN_BUDGET
+        self._encoding = tiktoken.get_encoding("cl100k_base") if tiktoken is not None else None
+
+    def count_tokens(self, text: str) -> int:
+        """Token count; a conservative character estimate when tiktoken is unavailable"""
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return math.ceil(len(text) / 3.5)
+
+    def budget_for(self, model: str, reserved_tokens: int = 0) -> int:
+        """Prompt tokens allowed for `model` after reserving completion/system tokens"""
+        window = MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+        return max(0, min(self.max_prompt_tokens, window - reserved_tokens))
+
+    def compile(self,
+                sections: List[PromptSection],
+                instructions: str,
+                model: str,
+                reserved_tokens: int = 0) -> CompiledPrompt:
+        """
+        Render sections followed by the instructions within the model's budget.
+
+        While over budget, the lowest-priority section that can still shrink
+        moves to its next variant, or is dropped once it has none left.
+        """
+        budget = self.budget_for(model, reserved_tokens)
+        instructions = textwrap.dedent(instructions).strip()
+        level = {id(section): 0 for section in sections}
+        active = list(sections)
+        degraded, dropped = [], []
+
+        while True:
+            text = self._render(active, level, instructions)
+            tokens = self.count_tokens(text)
+            if tokens <= budget:
+                break
+
+            shrinkable = [
+                s for s in active
+                if level[id(s)] + 1 < len(s.variants) or not s.required
+            ]
+            if not shrinkable:
+                break
+
+            victim = min(shrinkable, key=lambda s: s.priority)
+            if level[id(victim)] + 1 < len(victim.variants):
+                level[id(victim)] += 1
+                degraded.append(victim.title)
+            else:
+                active.remove(victim)
+                dropped.append(victim.title)
+
+        return CompiledPrompt(text=text, tokens=tokens, budget=budget, degraded=degraded, dropped=dropped)
+
+    @staticmethod
+    def _render(sections: List[PromptSection], level: Dict[int, int], instructions: str) -> str:
+        blocks = []
+        for section in sorted(sections, key=lambda s: -s.priority):
+            body = section.variants[level[id(section)]]().strip()
+            if body:
+                blocks.append(f"## {section.title}\n{body}")
+        blocks.append(instructions)
+        return "\n\n".join(blocks)
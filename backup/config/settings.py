@@ -29,12 +29,22 @@ class Settings(BaseSettings):
     DEFAULT_MODEL: str = "llama-3.1-70b-versatile"
     MAX_TOKENS: int = 4000
     TEMPERATURE: float = 0.1
+    LLM_MAX_CONCURRENCY: int = 4  # Concurrent completions per worker process
+    LLM_TIMEOUT: int = 60  # Seconds before a completion request is abandoned
+    PROMPT_TOKEN_BUDGET: int = 3000  # Upper bound on user-prompt tokens regardless of context window
+    BATCH_MAX_SYMBOLS: int = 50  # Symbols accepted by one batch analysis request
+    BATCH_MEMO_CONCURRENCY: int = 3  # Memos generated in parallel per batch request
     
     # Data Refresh Intervals (in minutes)
     STOCK_DATA_REFRESH: int = 5
     NEWS_REFRESH: int = 15
     ECONOMIC_DATA_REFRESH: int = 60
     
+    # Comprehensive analysis result cache (seconds)
+    ANALYSIS_CACHE_TTL: int = 300
+    ANALYSIS_CACHE_STALE_TTL: int = 900  # Serve stale results while refreshing in the background
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 500
+    
     # Analysis Parameters
     LOOKBACK_DAYS: int = 252  # 1 year of trading days
     RISK_FREE_RATE: float = 0.045  # Current risk-free rate
@@ -0,0 +1,37 @@
+"""
+Shared pytest setup for the module tests
+Run from the repository root: python -m pytest backup/test_<module>.py
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'django_platform'))
+
+
+@pytest.fixture(scope='session')
+def django_app():
+    """Configure Django against in-memory SQLite so the stock_analysis helpers can be imported"""
+    django = pytest.importorskip('django')
+    pytest.importorskip('rest_framework')
+    from django.conf import settings
+
+    if not settings.configured:
+        settings.configure(
+            INSTALLED_APPS=[
+                'django.contrib.auth',
+                'django.contrib.contenttypes',
+                'rest_framework',
+                'apps.stock_analysis',
+                'apps.ai_insights',
+            ],
+            DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+            DEFAULT_AUTO_FIELD='django.db.models.BigAutoField',
+            USE_TZ=True,
+        )
+        django.setup()
+    return settings
@@ -3,6 +3,8 @@ import pandas as pd
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import asyncio
+from modules.config import CacheConfig
+from modules.info_cache import info_cache
 from .base import DataProvider
 
 # Robust logging setup
@@ -49,11 +51,54 @@ class YahooFinanceProvider(DataProvider):
             logger.error(f"Error fetching stock data for {symbol}: {str(e)}")
             return pd.DataFrame()
     
+    async def get_batch_history(self, symbols: List[str], period: str = "1y") -> Dict[str, pd.DataFrame]:
+        """
+        Get historical data for several symbols with one multi-ticker download
+        
+        Args:
+            symbols: Stock symbols, already deduplicated
+            period: Time period, as for get_stock_data
+        
+        Returns:
+            Dict of symbol -> DataFrame in the get_stock_data format; symbols
+            without data are omitted
+        """
+        if not symbols:
+            return {}
+        
+        try:
+            # Same adjusted price basis and columns as Ticker.history in get_stock_data
+            raw = await asyncio.to_thread(
+                yf.download, symbols, period=period, group_by='ticker',
+                auto_adjust=True, actions=True, threads=True, progress=False
+            )
+        except Exception as e:
+            logger.error(f"Error fetching batch history for {len(symbols)} symbols: {str(e)}")
+            return {}
+        
+        histories = {}
+        for symbol in symbols:
+            try:
+                data = raw[symbol] if isinstance(raw.columns, pd.MultiIndex) else raw
+            except KeyError:
+                continue
+            data = data.dropna(how='all')
+            if data.empty:
+                logger.warning(f"No data found for symbol: {symbol}")
+                continue
+            
+            data = data.copy()
+            data.columns = [col.replace(' ', '_').lower() for col in data.columns]
+            data.reset_index(inplace=True)
+            histories[symbol] = data
+        
+        logger.info(f"Retrieved batch history for {len(histories)}/{len(symbols)} symbols")
+        return histories
+    
     async def get_real_time_price(self, symbol: str) -> Dict[str, Any]:
         """Get real-time stock price and key metrics"""
         try:
-            ticker = yf.Ticker(symbol)
-            info = await asyncio.to_thread(lambda: ticker.info)
+            info = await asyncio.to_thread(info_cache.get, symbol, CacheConfig.INFO_QUOTE_FIELDS)
             
             return {
                 'symbol': symbol,
@@ -96,8 +141,7 @@ class YahooFinanceProvider(DataProvider):
     async def get_key_metrics(self, symbol: str) -> Dict[str, Any]:
         """Get key financial metrics and ratios"""
         try:
-            ticker = yf.Ticker(symbol)
-            info = await asyncio.to_thread(lambda: ticker.info)
+            info = await asyncio.to_thread(info_cache.get, symbol)
             
             return {
                 'symbol': symbol,
@@ -0,0 +1,84 @@
+"""
+Tests for ColumnarEncoder format negotiation and encodings
+"""
+
+import gzip
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.columnar import ColumnarEncoder, pa
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'Date': pd.date_range('2024-01-01', periods=3, tz='UTC'),
+        'Close': [100.0, np.nan, 102.5],
+        'Volume': [10, 20, 30],
+    })
+
+
+@pytest.mark.parametrize('accept, expected', [
+    (None, 'json'),
+    ('', 'json'),
+    ('text/html', 'json'),
+    ('application/vnd.apache.arrow.stream', 'arrow'),
+    ('application/x-parquet', 'parquet'),
+    ('application/json;q=0.9, application/vnd.apache.parquet', 'parquet'),
+    ('application/vnd.apache.parquet;q=0.5, application/json', 'json'),
+    ('application/vnd.apache.arrow.stream;q=0.8, */*;q=0.8', 'arrow'),
+    ('application/vnd.apache.arrow.stream;q=bogus, application/json;q=0.1', 'json'),
+])
+def test_negotiate_from_accept(accept, expected):
+    assert ColumnarEncoder.negotiate(accept=accept) == expected
+
+
+def test_explicit_format_wins_over_accept():
+    assert ColumnarEncoder.negotiate('parquet', 'application/json') == 'parquet'
+
+
+def test_unsupported_format_is_rejected():
+    with pytest.raises(ValueError, match='Unsupported format'):
+        ColumnarEncoder.negotiate('xml')
+
+
+def test_json_encoding_is_column_oriented_with_nulls(frame):
+    body, media_type, encoding = ColumnarEncoder.encode(frame, 'json', metadata={'symbol': 'AAA'})
+    payload = json.loads(body)
+
+    assert media_type == 'application/json' and encoding is None
+    assert payload['symbol'] == 'AAA' and payload['count'] == 3
+    assert payload['columns'] == {
+        'Date': ['2024-01-01', '2024-01-02', '2024-01-03'],
+        'Close': [100.0, None, 102.5],
+        'Volume': [10, 20, 30],
+    }
+
+
+def test_gzip_is_reported_as_content_encoding(frame):
+    body, _, encoding = ColumnarEncoder.encode(frame, 'json', compression='gzip')
+    assert encoding == 'gzip'
+    assert json.loads(gzip.decompress(body))['count'] == 3
+
+
+def test_select_keeps_the_date_column_and_whole_end_day(frame):
+    selected = ColumnarEncoder.select(frame, start='2024-01-02', end='2024-01-03', fields=['Volume'])
+    assert list(selected.columns) == ['Date', 'Volume']
+    assert selected['Volume'].tolist() == [20, 30]
+
+    with pytest.raises(ValueError, match='Unknown fields'):
+        ColumnarEncoder.select(frame, fields=['Nope'])
+
+
+@pytest.mark.skipif(pa is None, reason='pyarrow not installed')
+def test_arrow_round_trip(frame):
+    body, media_type, encoding = ColumnarEncoder.encode(frame, 'arrow', metadata={'symbol': 'AAA'})
+    table = pa.ipc.open_stream(io.BytesIO(body)).read_all()
+
+    assert media_type == 'application/vnd.apache.arrow.stream' and encoding is None
+    assert table.schema.metadata[b'symbol'] == b'AAA'
+    pd.testing.assert_frame_equal(table.to_pandas(), frame)
@@ -0,0 +1,93 @@
+"""
+Tests for the vectorized IndicatorEngine and the incremental indicator state
+Checks both against pandas reference definitions on a synthetic price path
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.indicators import BatchIndicatorCalculator, IndicatorEngine
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(7)
+    index = pd.bdate_range('2022-01-03', periods=300)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.015, len(index)))
+    volume = rng.integers(1_000_000, 5_000_000, len(index)).astype(float)
+    return pd.DataFrame({'Close': close, 'Volume': volume}, index=index)
+
+
+def test_rolling_mean_matches_pandas(bars):
+    expected = bars['Close'].rolling(50).mean().to_numpy()
+    np.testing.assert_allclose(IndicatorEngine.rolling_mean(bars['Close'], 50), expected, equal_nan=True)
+
+
+def test_rolling_std_matches_pandas(bars):
+    expected = bars['Close'].rolling(20).std().to_numpy()
+    np.testing.assert_allclose(IndicatorEngine.rolling_std(bars['Close'], 20), expected, rtol=1e-9, equal_nan=True)
+
+
+def test_ema_matches_pandas_adjust_false(bars):
+    expected = bars['Close'].ewm(span=12, adjust=False).mean().to_numpy()
+    np.testing.assert_allclose(IndicatorEngine.ema(bars['Close'], 12), expected)
+
+
+def test_rsi_uses_simple_mean_of_gains_and_losses(bars):
+    delta = bars['Close'].diff()
+    gain = delta.clip(lower=0).rolling(14).mean()
+    loss = (-delta).clip(lower=0).rolling(14).mean()
+    expected = (100 - 100 / (1 + gain / loss)).to_numpy()
+    np.testing.assert_allclose(IndicatorEngine.rsi(bars['Close'], 14), expected, equal_nan=True)
+
+
+def test_rsi_is_100_without_losses():
+    rsi = IndicatorEngine.rsi(np.arange(1.0, 31.0), 14)
+    assert np.isnan(rsi[:14]).all()
+    assert (rsi[14:] == 100.0).all()
+
+
+def test_compute_frame_columns_and_bollinger(bars):
+    frame = IndicatorEngine.compute_frame(bars)
+    assert list(frame.columns) == IndicatorEngine.COLUMNS
+    assert frame.index.equals(bars.index)
+
+    middle = bars['Close'].rolling(20).mean()
+    band = 2 * bars['Close'].rolling(20).std()
+    np.testing.assert_allclose(frame['bb_upper'], middle + band, rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(frame['macd_histogram'], frame['macd'] - frame['macd_signal'])
+
+
+def test_batch_matrix_matches_per_symbol(bars):
+    # Second symbol listed 100 bars later: its indicators stay NaN until its own windows fill
+    late = bars['Close'].copy()
+    late.iloc[:100] = np.nan
+    close_frame = pd.DataFrame({'AAA': bars['Close'], 'BBB': late})
+
+    frames = BatchIndicatorCalculator.compute_frames(close_frame)
+    np.testing.assert_allclose(
+        frames['sma_50']['AAA'], IndicatorEngine.rolling_mean(bars['Close'], 50), equal_nan=True
+    )
+    assert frames['sma_50']['BBB'].iloc[:149].isna().all()
+    np.testing.assert_allclose(
+        frames['sma_50']['BBB'].iloc[100:], IndicatorEngine.rolling_mean(late.iloc[100:], 50), equal_nan=True
+    )
+
+
+def test_advance_matches_engine_bar_by_bar(django_app, bars):
+    from apps.stock_analysis.indicators import INDICATOR_FIELDS, advance, empty_state
+
+    expected = IndicatorEngine.compute_frame(bars)
+    state = empty_state()
+    for (day, close, volume), (_, row) in zip(bars.itertuples(), expected.iterrows()):
+        values = advance(state, close, volume)
+        for name in INDICATOR_FIELDS:
+            if np.isnan(row[name]):
+                assert values[name] is None, (day, name)
+            else:
+                assert values[name] == pytest.approx(row[name], rel=1e-7), (day, name)
+
+    # Windows keep only what the longest indicator needs
+    assert len(state['closes']) == 200
+    assert len(state['deltas']) == 14
@@ -0,0 +1,47 @@
+"""
+Tests for parsing the structured JSON block at the end of an AI analysis
+"""
+
+import pytest
+
+
+@pytest.fixture
+def parse(django_app):
+    from apps.stock_analysis.pipeline import parse_structured_block
+    return parse_structured_block
+
+
+def test_fenced_block_is_parsed(parse):
+    text = (
+        "## Summary\nSolid quarter.\n\n"
+        '```json\n{"recommendation": "Strong Buy", "confidence": 0.8, "price_target": 210.5}\n```'
+    )
+    assert parse(text) == {'recommendation': 'strong_buy', 'confidence': 0.8, 'price_target': 210.5}
+
+
+def test_last_valid_block_wins(parse):
+    text = (
+        '```json\n{"recommendation": "sell"}\n```\n'
+        'Revised view:\n'
+        '```json\n{"recommendation": "hold", "risk_score": 40}\n```\n'
+        '```json\n{not json}\n```'
+    )
+    assert parse(text) == {'recommendation': 'hold', 'risk_score': 40.0}
+
+
+def test_bare_object_is_used_without_fences(parse):
+    text = 'Final answer: {"recommendation": "buy", "stop_loss": "95"} as discussed.'
+    assert parse(text) == {'recommendation': 'buy', 'stop_loss': 95.0}
+
+
+def test_values_are_clamped_and_invalid_ones_dropped(parse):
+    text = (
+        '```json\n{"recommendation": "moon", "confidence": 1.7, "sentiment_score": -3,'
+        ' "risk_score": "high", "price_target": -10}\n```'
+    )
+    assert parse(text) == {'confidence': 1.0, 'sentiment_score': -1.0, 'price_target': 0.0}
+
+
+@pytest.mark.parametrize('text', [None, '', 'No structured block here.'])
+def test_missing_block_yields_nothing(parse, text):
+    assert parse(text) == {}
@@ -0,0 +1,84 @@
+"""
+Tests for PortfolioRiskEngine alignment, VaR/CVaR and the covariance cache
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.portfolio_risk import PortfolioRiskEngine
+
+
+@pytest.fixture
+def closes():
+    rng = np.random.default_rng(11)
+    index = pd.bdate_range('2024-01-01', periods=260)
+    prices = 100 * np.cumprod(1 + rng.normal(0.0005, 0.012, (len(index), 3)), axis=0)
+    return pd.DataFrame(prices, index=index, columns=['AAA', 'BBB', 'CCC'])
+
+
+@pytest.fixture
+def engine():
+    return PortfolioRiskEngine(ttl_seconds=60, max_entries=4)
+
+
+def test_value_at_risk_matches_definitions():
+    portfolio = np.random.default_rng(3).normal(0.001, 0.02, 1000)
+    var = PortfolioRiskEngine._value_at_risk(portfolio, 0.95)
+
+    cutoff = np.quantile(portfolio, 0.05)
+    assert var['historical_var'] == pytest.approx(-cutoff)
+    assert var['historical_cvar'] == pytest.approx(-portfolio[portfolio <= cutoff].mean())
+    assert var['historical_cvar'] >= var['historical_var']
+
+    mu, sd = portfolio.mean(), portfolio.std(ddof=1)
+    assert var['parametric_var'] == pytest.approx(-(mu + NormalDist().inv_cdf(0.05) * sd))
+    assert var['parametric_cvar'] >= var['parametric_var']
+
+
+def test_covariance_matches_numpy_and_is_cached(engine, closes):
+    returns, _, _ = engine.align_returns(closes)
+    covariance = engine.covariance(returns)
+    np.testing.assert_allclose(covariance.to_numpy(), np.cov(returns.to_numpy(), rowvar=False))
+
+    # Column order does not change the cache entry
+    engine.covariance(returns[['CCC', 'AAA', 'BBB']])
+    assert engine.stats() == {'hits': 1, 'misses': 1, 'entries': 1}
+
+
+def test_covariance_key_changes_with_the_returns(engine, closes):
+    engine.analyze(closes)
+    restated = closes.copy()
+    restated.iloc[-1, 0] *= 1.05
+    engine.analyze(restated)
+    assert engine.stats()['misses'] == 2
+
+
+def test_common_window_is_reported(engine, closes):
+    # CCC lists 50 bars late: still above MIN_COVERAGE, so it shortens the common window
+    closes.iloc[:50, 2] = np.nan
+    report = engine.analyze(closes)
+
+    assert report['excluded_symbols'] == []
+    assert report['observations'] == len(closes) - 50 - 1
+    assert report['alignment']['limited_by'] == ['CCC']
+    assert report['alignment']['dropped_dates'] == 50
+    # The first return is on the day after CCC's first close
+    assert report['window'] == report['alignment']['common'] == [str(closes.index[51].date()), '2024-12-27']
+
+
+def test_low_coverage_symbols_are_excluded_and_weights_renormalized(engine, closes):
+    closes.iloc[:100, 1] = np.nan
+    report = engine.analyze(closes, weights={'AAA': 2.0, 'BBB': 1.0, 'CCC': 2.0})
+
+    assert report['excluded_symbols'] == ['BBB']
+    assert report['weights'] == {'AAA': 0.5, 'CCC': 0.5}
+    assert sum(report['risk_contribution'].values()) == pytest.approx(1.0)
+
+
+def test_benchmark_beta_of_itself_is_one(engine, closes):
+    report = engine.analyze(closes[['AAA']], benchmark_close=closes['AAA'])
+    assert report['benchmark']['beta'] == pytest.approx(1.0)
+    assert report['benchmark']['tracking_error'] == pytest.approx(0.0, abs=1e-12)
@@ -0,0 +1,54 @@
+"""
+Tests for the packed per-year ChunkStore encoding used by the Django platform
+Exercises the byte layout and merge rules without a database
+"""
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def store(django_app):
+    from apps.stock_analysis.timeseries import BAR_COLUMNS, ChunkStore
+    return ChunkStore('bars', BAR_COLUMNS)
+
+
+def _series(dates, close, volume):
+    close = np.asarray(close, dtype=float)
+    return {
+        'date': np.asarray(dates, dtype='datetime64[D]'),
+        'open': close - 1, 'high': close + 1, 'low': close - 2, 'close': close,
+        'adjusted_close': close, 'volume': np.asarray(volume, dtype='<i8'),
+    }
+
+
+def test_encode_decode_round_trip(store):
+    series = _series(['2024-01-03', '2024-01-02', '2024-01-04'], [101.5, 100.25, np.nan], [20, 10, 30])
+    encoded = store._encode(series)
+
+    assert encoded['row_count'] == 3
+    # Four-byte day numbers, then one contiguous block per column
+    assert len(encoded['dates']) == 3 * 4
+    assert len(encoded['data']) == 3 * sum(np.dtype(dtype).itemsize for _, dtype in store.columns)
+
+    decoded = store._decode(encoded['row_count'], encoded['dates'], encoded['data'])
+    assert decoded['date'].tolist() == np.array(['2024-01-02', '2024-01-03', '2024-01-04'], dtype='datetime64[D]').tolist()
+    np.testing.assert_array_equal(decoded['close'], [100.25, 101.5, np.nan])
+    assert decoded['volume'].dtype == np.dtype('<i8')
+    assert decoded['volume'].tolist() == [10, 20, 30]
+
+
+def test_merge_prefers_incoming_rows_on_the_same_date(store):
+    stored = _series(['2024-01-02', '2024-01-03'], [100.0, 101.0], [10, 20])
+    incoming = _series(['2024-01-03', '2024-01-04'], [105.0, 106.0], [25, 30])
+
+    merged = store._merge(stored, incoming)
+    assert merged['date'].astype(str).tolist() == ['2024-01-02', '2024-01-03', '2024-01-04']
+    assert merged['close'].tolist() == [100.0, 105.0, 106.0]
+    assert merged['volume'].tolist() == [10, 25, 30]
+
+
+def test_empty_series_has_every_column(store):
+    empty = store._empty()
+    assert set(empty) == {'date'} | {name for name, _ in store.columns}
+    assert all(len(values) == 0 for values in empty.values())
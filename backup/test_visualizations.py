@@ -0,0 +1,69 @@
+"""
+Tests for the cached, decimated chart figures
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.indicators import IndicatorEngine
+from modules.visualizations import ChartCreator
+
+
+@pytest.fixture(autouse=True)
+def empty_figure_cache():
+    ChartCreator._figure_cache.clear()
+    yield
+    ChartCreator._figure_cache.clear()
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(5)
+    index = pd.bdate_range('2023-01-02', periods=260)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(index)))
+    return pd.DataFrame({
+        'Open': close * 0.995, 'High': close * 1.01, 'Low': close * 0.985,
+        'Close': close, 'Volume': rng.integers(1_000, 5_000, len(index)),
+    }, index=index)
+
+
+def test_figure_dict_with_indicator_frame(bars):
+    indicators = IndicatorEngine.compute_frame(bars)
+    figure = ChartCreator.figure_dict(bars, 'AAA', '1y', indicators)
+
+    assert figure is not None
+    json.dumps(figure)  # Plain JSON types only
+    names = {trace.get('name') for trace in figure['data']}
+    assert 'AAA' in names
+    assert len(names) > 2  # Overlays were drawn next to the candles and volume
+
+
+def test_figure_dict_is_cached_per_overlay_set(bars):
+    indicators = IndicatorEngine.compute_frame(bars)
+    with_overlays = ChartCreator.figure_dict(bars, 'AAA', '1y', indicators)
+
+    assert ChartCreator.figure_dict(bars, 'AAA', '1y', indicators) is with_overlays
+    assert ChartCreator.figure_dict(bars, 'AAA', '1y') is not with_overlays
+    assert ChartCreator.figure_dict(bars, 'AAA', '1y', indicators.iloc[0:0]) is not with_overlays
+    assert len(ChartCreator._figure_cache) == 2
+
+
+def test_new_bar_produces_a_new_figure(bars):
+    first = ChartCreator.figure_dict(bars.iloc[:-1], 'AAA', '1y')
+    assert ChartCreator.figure_dict(bars, 'AAA', '1y') is not first
+
+
+def test_empty_data_has_no_figure():
+    assert ChartCreator.figure_dict(pd.DataFrame(columns=['Close']), 'AAA', '1y') is None
+
+
+def test_decimate_keeps_true_ranges(bars):
+    weekly, _, label = ChartCreator.decimate(bars, target_bars=60)
+    assert label == 'weekly'
+    assert len(weekly) <= 60
+    first_week = bars.loc[:weekly.index[0]]
+    assert weekly['High'].iloc[0] == first_week['High'].max()
+    assert weekly['Volume'].iloc[0] == first_week['Volume'].sum()
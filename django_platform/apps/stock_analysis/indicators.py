@@ -0,0 +1,241 @@
+"""
+Stock Analysis incremental technical indicators
+"""
+
+import copy
+import math
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Max, Min
+
+from .models import StockData, TechnicalIndicator, IndicatorState
+
+
+SMA_WINDOWS = (20, 50, 200)
+EMA_SPANS = (12, 26)
+MACD_SIGNAL_SPAN = 9
+RSI_PERIOD = 14
+BOLLINGER_WINDOW = 20
+BOLLINGER_STDS = 2.0
+VOLUME_SMA_WINDOW = 20
+
+INDICATOR_FIELDS = [
+    'sma_20', 'sma_50', 'sma_200', 'ema_12', 'ema_26',
+    'rsi', 'macd', 'macd_signal', 'macd_histogram',
+    'bb_upper', 'bb_middle', 'bb_lower', 'volume_sma'
+]
+
+
+def empty_state():
+    """Rolling state before the first bar"""
+    return {
+        'count': 0,
+        'closes': [],  # Last max(SMA_WINDOWS) closes
+        'close_sums': {str(window): 0.0 for window in SMA_WINDOWS},
+        'close_sumsq': 0.0,  # Sum of squares over the Bollinger window
+        'ema': {str(span): None for span in EMA_SPANS},
+        'macd_signal': None,
+        'deltas': [],  # Last RSI_PERIOD close-to-close changes
+        'gain_sum': 0.0,
+        'loss_sum': 0.0,
+        'volumes': [],
+        'volume_sum': 0.0,
+    }
+
+
+def _ema_step(previous, value, span):
+    if previous is None:
+        return value
+    return previous + 2.0 / (span + 1) * (value - previous)
+
+
+def advance(state, close, volume):
+    """
+    Fold one bar into the rolling state and return that day's indicator values.
+
+    Every update is O(1): windowed sums add the new value and subtract the
+    one leaving the window. Definitions match the Streamlit IndicatorEngine
+    (adjust=False EMAs, simple-mean RSI, sample-std Bollinger bands).
+    """
+    closes = state['closes']
+    previous_close = closes[-1] if closes else None
+
+    closes.append(close)
+    state['count'] += 1
+    for window in SMA_WINDOWS:
+        state['close_sums'][str(window)] += close
+        if len(closes) > window:
+            state['close_sums'][str(window)] -= closes[-window - 1]
+    state['close_sumsq'] += close * close
+    if len(closes) > BOLLINGER_WINDOW:
+        state['close_sumsq'] -= closes[-BOLLINGER_WINDOW - 1] ** 2
+    del closes[:-max(SMA_WINDOWS)]
+
+    for span in EMA_SPANS:
+        state['ema'][str(span)] = _ema_step(state['ema'][str(span)], close, span)
+    macd = state['ema']['12'] - state['ema']['26']
+    state['macd_signal'] = _ema_step(state['macd_signal'], macd, MACD_SIGNAL_SPAN)
+
+    if previous_close is not None:
+        delta = close - previous_close
+        state['deltas'].append(delta)
+        state['gain_sum'] += max(delta, 0.0)
+        state['loss_sum'] += max(-delta, 0.0)
+        if len(state['deltas']) > RSI_PERIOD:
+            leaving = state['deltas'].pop(0)
+            state['gain_sum'] -= max(leaving, 0.0)
+            state['loss_sum'] -= max(-leaving, 0.0)
+
+    state['volumes'].append(volume)
+    state['volume_sum'] += volume
+    if len(state['volumes']) > VOLUME_SMA_WINDOW:
+        state['volume_sum'] -= state['volumes'].pop(0)
+
+    count = state['count']
+    values = {
+        f'sma_{window}': state['close_sums'][str(window)] / window if count >= window else None
+        for window in SMA_WINDOWS
+    }
+    values['ema_12'] = state['ema']['12']
+    values['ema_26'] = state['ema']['26']
+    values['macd'] = macd
+    values['macd_signal'] = state['macd_signal']
+    values['macd_histogram'] = macd - state['macd_signal']
+
+    values['rsi'] = None
+    if len(state['deltas']) == RSI_PERIOD:
+        avg_gain = max(state['gain_sum'], 0.0) / RSI_PERIOD
+        avg_loss = max(state['loss_sum'], 0.0) / RSI_PERIOD
+        values['rsi'] = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+
+    values['bb_upper'] = values['bb_middle'] = values['bb_lower'] = None
+    if count >= BOLLINGER_WINDOW:
+        window_sum = state['close_sums'][str(BOLLINGER_WINDOW)]
+        variance = (state['close_sumsq'] - window_sum * window_sum / BOLLINGER_WINDOW) / (BOLLINGER_WINDOW - 1)
+        band = BOLLINGER_STDS * math.sqrt(max(variance, 0.0))
+        middle = window_sum / BOLLINGER_WINDOW
+        values.update(bb_upper=middle + band, bb_middle=middle, bb_lower=middle - band)
+
+    values['volume_sma'] = (
+        state['volume_sum'] / VOLUME_SMA_WINDOW if len(state['volumes']) == VOLUME_SMA_WINDOW else None
+    )
+    return values
+
+
+def _to_row(stock_symbol, date, values):
+    """Build a TechnicalIndicator row, rounding to each column's precision"""
+    fields = {}
+    for name in INDICATOR_FIELDS:
+        value = values.get(name)
+        if value is None:
+            fields[name] = None
+        elif name == 'volume_sma':
+            fields[name] = int(round(value))
+        else:
+            fields[name] = Decimal(str(round(value, 2 if name == 'rsi' else 4)))
+    return TechnicalIndicator(symbol=stock_symbol, date=date, **fields)
+
+
+class IndicatorMaintainer:
+    """Keeps TechnicalIndicator rows current for one symbol from stored rolling state"""
+
+    def __init__(self, stock_symbol):
+        self.stock_symbol = stock_symbol
+
+    def update(self, first_changed=None):
+        """
+        Compute indicator rows only for bars newer than the stored state.
+
+        Falls back to a full backfill when the symbol has no state yet, or
+        when `first_changed` (the earliest bar date rewritten by the last
+        upsert, as a date or ISO string) is not after the state's last date:
+        the rolling state already absorbed the old value of that bar.
+        Returns the number of indicator rows written.
+        """
+        try:
+            state_row = IndicatorState.objects.get(symbol=self.stock_symbol)
+        except IndicatorState.DoesNotExist:
+            return self.backfill()
+
+        state, since = state_row.state, state_row.last_date
+        if isinstance(first_changed, str):
+            first_changed = date.fromisoformat(first_changed)
+        if first_changed is not None and first_changed <= since:
+            # The state keeps a checkpoint from before its latest bar, which covers the
+            # common case of today's intraday bar being replaced by the final close
+            rewind = state.get('rewind')
+            if rewind is None or first_changed <= date.fromisoformat(rewind['date']):
+                return self.backfill()
+            state, since = rewind['state'], date.fromisoformat(rewind['date'])
+
+        bars = StockData.objects.filter(
+            symbol=self.stock_symbol,
+            date__gt=since
+        ).order_by('date').values_list('date', 'close_price', 'volume')
+
+        return self._apply(bars, state, state_row, since=since)
+
+    def backfill(self):
+        """Recompute every indicator row from the full bar history"""
+        from .timeseries import bar_chunks, pack_bars_from_rows
+
+        # Read closes from the packed chunks; pack them first only if they do not cover the stored bars
+        series = bar_chunks.load(self.stock_symbol)
+        stored = StockData.objects.filter(symbol=self.stock_symbol).aggregate(
+            first=Min('date'), last=Max('date'), rows=Count('id')
+        )
+        packed = series['date'].tolist()
+        if stored['rows'] != len(packed) or (packed and (stored['first'], stored['last']) != (packed[0], packed[-1])):
+            pack_bars_from_rows(self.stock_symbol)
+            series = bar_chunks.load(self.stock_symbol)
+        bars = zip(series['date'].tolist(), series['close'].tolist(), series['volume'].tolist())
+
+        state_row = IndicatorState.objects.filter(symbol=self.stock_symbol).first()
+        return self._apply(bars, empty_state(), state_row, rebuild=True)
+
+    def _apply(self, bars, state, state_row, rebuild=False, since=None):
+        from .timeseries import indicator_chunks
+
+        bars = list(bars)
+        state.pop('rewind', None)
+        rows = []
+        dates = []
+        columns = {name: [] for name in INDICATOR_FIELDS}
+        last_date = since
+        rewind = None
+        for index, (date, close, volume) in enumerate(bars):
+            if index == len(bars) - 1 and last_date is not None:
+                rewind = {'date': last_date.isoformat(), 'state': copy.deepcopy(state)}
+            values = advance(state, float(close), float(volume))
+            rows.append(_to_row(self.stock_symbol, date, values))
+            dates.append(date)
+            for name in INDICATOR_FIELDS:
+                value = values.get(name)
+                columns[name].append(math.nan if value is None else value)
+            last_date = date
+
+        if not rows:
+            return 0
+        if rewind is not None:
+            state['rewind'] = rewind
+
+        with transaction.atomic():
+            TechnicalIndicator.objects.bulk_create(
+                rows,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['symbol', 'date'],
+                update_fields=INDICATOR_FIELDS
+            )
+            store = indicator_chunks.rebuild if rebuild else indicator_chunks.write
+            store(self.stock_symbol, dates, columns)
+            if state_row is None:
+                IndicatorState.objects.create(symbol=self.stock_symbol, last_date=last_date, state=state)
+            else:
+                state_row.last_date = last_date
+                state_row.state = state
+                state_row.save(update_fields=['last_date', 'state', 'updated_at'])
+
+        return len(rows)
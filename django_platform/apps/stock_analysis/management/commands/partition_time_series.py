@@ -0,0 +1,50 @@
+"""
+Convert stock_data and technical_indicator to yearly range partitions
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from apps.stock_analysis.partitions import (
+    PARTITIONED_TABLES, convert_to_partitioned, create_indexes, ensure_partitions, is_partitioned, is_postgresql
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Partition the time series tables by year (PostgreSQL only). Migration 0004 does this at "
+        "migrate time when STOCK_DATA_PARTITIONING is set; this command enables it on a database "
+        "that has already been migrated. Each table is rewritten while holding an exclusive lock."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--years-ahead', type=int, default=settings.STOCK_DATA_PARTITIONS_AHEAD,
+            help='Future yearly partitions to create'
+        )
+        parser.add_argument(
+            '--indexes-only', action='store_true',
+            help='Only (re)build the covering and BRIN indexes, concurrently where possible'
+        )
+
+    def handle(self, *args, **options):
+        if not is_postgresql(connection):
+            raise CommandError("Time series partitioning requires PostgreSQL")
+
+        for table in PARTITIONED_TABLES:
+            if options['indexes_only']:
+                create_indexes(table)
+                self.stdout.write(f"{table}: indexes in place")
+            elif is_partitioned(table):
+                created = ensure_partitions(table, self._upcoming_years(options['years_ahead']))
+                self.stdout.write(f"{table}: already partitioned, created {len(created)} partitions")
+            else:
+                convert_to_partitioned(table, options['years_ahead'])
+                self.stdout.write(self.style.SUCCESS(f"{table}: converted to yearly partitions"))
+
+    @staticmethod
+    def _upcoming_years(years_ahead):
+        year = timezone.now().year
+        return range(year, year + years_ahead + 1)
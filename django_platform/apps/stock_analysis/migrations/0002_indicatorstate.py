@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 09:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock_analysis', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndicatorState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_date', models.DateField()),
+                ('state', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('symbol', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='indicator_state', to='stock_analysis.stocksymbol')),
+            ],
+            options={
+                'verbose_name': 'Indicator State',
+                'verbose_name_plural': 'Indicator States',
+                'db_table': 'indicator_state',
+            },
+        ),
+    ]
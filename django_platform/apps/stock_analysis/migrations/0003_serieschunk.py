@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock_analysis', '0002_indicatorstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeriesChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('bars', 'Price Bars'), ('indicators', 'Technical Indicators')], max_length=20)),
+                ('year', models.SmallIntegerField()),
+                ('row_count', models.IntegerField()),
+                ('dates', models.BinaryField()),
+                ('data', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('symbol', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='series_chunks', to='stock_analysis.stocksymbol')),
+            ],
+            options={
+                'verbose_name': 'Series Chunk',
+                'verbose_name_plural': 'Series Chunks',
+                'db_table': 'series_chunk',
+                'unique_together': {('symbol', 'kind', 'year')},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:00
+
+from django.conf import settings
+from django.db import migrations
+
+
+def index_and_partition(apps, schema_editor):
+    """
+    PostgreSQL only: BRIN/covering indexes, and yearly partitions when STOCK_DATA_PARTITIONING is on.
+
+    Runs outside a transaction so the indexes can be built CONCURRENTLY. To
+    partition an already-migrated database, use `manage.py partition_time_series`.
+    """
+    from apps.stock_analysis import partitions
+
+    connection = schema_editor.connection
+    if not partitions.is_postgresql(connection):
+        return
+    for table in partitions.PARTITIONED_TABLES:
+        if settings.STOCK_DATA_PARTITIONING and not partitions.is_partitioned(table, connection):
+            partitions.convert_to_partitioned(table, settings.STOCK_DATA_PARTITIONS_AHEAD, connection)
+        else:
+            partitions.create_indexes(table, connection)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('stock_analysis', '0003_serieschunk'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='stockdata',
+            options={'verbose_name': 'Stock Data', 'verbose_name_plural': 'Stock Data'},
+        ),
+        migrations.AlterModelOptions(
+            name='technicalindicator',
+            options={'verbose_name': 'Technical Indicator', 'verbose_name_plural': 'Technical Indicators'},
+        ),
+        migrations.RunPython(index_and_partition, migrations.RunPython.noop, atomic=False),
+    ]
@@ -49,8 +49,10 @@ class StockData(models.Model):
         db_table = 'stock_data'
         verbose_name = 'Stock Data'
         verbose_name_plural = 'Stock Data'
+        # No default ordering: every read orders explicitly, so counts, deletes and
+        # range scans are not forced through a sort. The unique (symbol, date) index
+        # serves ORDER BY date in either direction for one symbol.
         unique_together = ['symbol', 'date']
-        ordering = ['-date']
     
     def __str__(self):
         return f"{self.symbol.symbol} - {self.date}"
@@ -89,13 +91,56 @@ class TechnicalIndicator(models.Model):
         db_table = 'technical_indicator'
         verbose_name = 'Technical Indicator'
         verbose_name_plural = 'Technical Indicators'
+        # No default ordering, as for StockData
         unique_together = ['symbol', 'date']
-        ordering = ['-date']
     
     def __str__(self):
         return f"{self.symbol.symbol} Indicators - {self.date}"
 
 
+class IndicatorState(models.Model):
+    """Rolling indicator state for incremental TechnicalIndicator maintenance"""
+    
+    symbol = models.OneToOneField(StockSymbol, on_delete=models.CASCADE, related_name='indicator_state')
+    last_date = models.DateField()
+    state = models.JSONField(default=dict)  # EMA seeds, RSI gain/loss sums, rolling-window buffers
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'indicator_state'
+        verbose_name = 'Indicator State'
+        verbose_name_plural = 'Indicator States'
+    
+    def __str__(self):
+        return f"{self.symbol.symbol} Indicator State - {self.last_date}"
+
+
+class SeriesChunk(models.Model):
+    """One symbol-year of bars or indicators packed as little-endian NumPy arrays"""
+    
+    KINDS = [
+        ('bars', 'Price Bars'),
+        ('indicators', 'Technical Indicators'),
+    ]
+    
+    symbol = models.ForeignKey(StockSymbol, on_delete=models.CASCADE, related_name='series_chunks')
+    kind = models.CharField(max_length=20, choices=KINDS)
+    year = models.SmallIntegerField()
+    row_count = models.IntegerField()
+    dates = models.BinaryField()  # int32 days since 1970-01-01, ascending
+    data = models.BinaryField()  # Column arrays back to back, in the store's column order
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'series_chunk'
+        verbose_name = 'Series Chunk'
+        verbose_name_plural = 'Series Chunks'
+        unique_together = ['symbol', 'kind', 'year']
+    
+    def __str__(self):
+        return f"{self.symbol.symbol} {self.kind} {self.year} ({self.row_count} rows)"
+
+
 class AnalysisRequest(models.Model):
     """User analysis requests"""
     
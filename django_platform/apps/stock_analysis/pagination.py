@@ -0,0 +1,92 @@
+"""
+Stock Analysis pagination
+"""
+
+from datetime import date
+
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class DateKeysetPagination(BasePagination):
+    """
+    Keyset pagination for one symbol's time series, keyed on (symbol, date).
+
+    Each page is `WHERE symbol = ? AND date < :cursor ORDER BY date DESC
+    LIMIT n`, which the (symbol, date) unique index answers directly, so a
+    page deep in the history costs the same as the first one. The cursor is
+    the date of the last row returned; ?order=asc walks forward instead.
+
+    The response keeps the LimitOffsetPagination keys this endpoint used to
+    return; `count` and `previous` are always null, since counting the range
+    is the cost keyset pages avoid. The old ?ordering=date / ?ordering=-date
+    still work as aliases for ?order; any other ordering is rejected.
+    """
+
+    limit_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    order_query_param = 'order'
+    ordering_query_param = 'ordering'
+    ORDERING_ALIASES = {'date': 'asc', '-date': 'desc'}
+    max_limit = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.descending = self.get_order(request) == 'desc'
+
+        cursor = self.get_cursor(request)
+        if cursor is not None:
+            queryset = queryset.filter(date__lt=cursor) if self.descending else queryset.filter(date__gt=cursor)
+
+        # One extra row tells us whether another page exists without a COUNT(*)
+        rows = list(queryset.order_by('-date' if self.descending else 'date')[:self.limit + 1])
+        self.next_cursor = rows[self.limit - 1]['date'] if len(rows) > self.limit else None
+        return rows[:self.limit]
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': None,
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data
+        })
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor.isoformat()
+        )
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params.get(self.limit_query_param, settings.REST_FRAMEWORK['PAGE_SIZE']))
+        except ValueError:
+            raise ValidationError({self.limit_query_param: 'Must be an integer'})
+        return max(1, min(limit, self.max_limit))
+
+    def get_order(self, request):
+        ordering = request.query_params.get(self.ordering_query_param)
+        if ordering:
+            if ordering not in self.ORDERING_ALIASES:
+                raise ValidationError({self.ordering_query_param: "Only 'date' and '-date' are supported"})
+            if self.order_query_param not in request.query_params:
+                return self.ORDERING_ALIASES[ordering]
+
+        order = request.query_params.get(self.order_query_param, 'desc')
+        if order not in ('asc', 'desc'):
+            raise ValidationError({self.order_query_param: "Must be 'asc' or 'desc'"})
+        return order
+
+    def get_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            return date.fromisoformat(cursor)
+        except ValueError:
+            raise ValidationError({self.cursor_query_param: 'Must be an ISO date (YYYY-MM-DD)'})
@@ -0,0 +1,214 @@
+"""
+Stock Analysis time-range partitioning (PostgreSQL)
+"""
+
+from datetime import date
+
+from django.db import connection, transaction
+
+
+PARTITIONED_TABLES = ('stock_data', 'technical_indicator')
+
+# Index-only scans for the (symbol, latest dates) reads; other columns come from the heap
+COVERING_COLUMNS = {
+    'stock_data': ('close_price', 'volume'),
+    'technical_indicator': (),
+}
+
+
+def is_postgresql(using=None):
+    return (using or connection).vendor == 'postgresql'
+
+
+def partition_name(table, year):
+    return f"{table}_y{year}"
+
+
+def is_partitioned(table, using=None):
+    """True when `table` is a declaratively partitioned PostgreSQL table"""
+    using = using or connection
+    if not is_postgresql(using):
+        return False
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [table]
+        )
+        return cursor.fetchone() is not None
+
+
+def create_indexes(table, using=None):
+    """
+    Covering (symbol_id, date DESC) index and a BRIN index on date.
+
+    The BRIN index is a few pages even for decades of bars and lets range
+    scans over all symbols (retention, market-wide backfills) skip blocks;
+    rows arrive roughly in date order, which is what BRIN relies on.
+
+    On a plain table the indexes are built CONCURRENTLY so writes continue
+    during the build; this must run outside a transaction. A partitioned
+    parent does not support CONCURRENTLY, and is only indexed right after
+    convert_to_partitioned() has built it.
+    """
+    using = using or connection
+    include = COVERING_COLUMNS[table]
+    concurrently = '' if is_partitioned(table, using) else ' CONCURRENTLY'
+    indexes = {f"{table}_date_brin": f"ON {table} USING brin (date)"}
+    if include:
+        indexes[f"{table}_symbol_date_desc"] = f"ON {table} (symbol_id, date DESC) INCLUDE ({', '.join(include)})"
+
+    with using.cursor() as cursor:
+        for name, definition in indexes.items():
+            # An interrupted concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+            cursor.execute(
+                "SELECT NOT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+                [name]
+            )
+            row = cursor.fetchone()
+            if row is not None and row[0]:
+                cursor.execute(f"DROP INDEX{concurrently} {name}")
+            cursor.execute(f"CREATE INDEX{concurrently} IF NOT EXISTS {name} {definition}")
+
+
+def convert_to_partitioned(table, years_ahead=1, using=None):
+    """
+    Rebuild `table` as a table range-partitioned by year on `date`.
+
+    Rows are copied into yearly partitions covering the stored history plus
+    `years_ahead` future years; dates outside those land in a DEFAULT
+    partition until ensure_partitions() creates their year. The primary key
+    becomes (id, date), since PostgreSQL requires the partition key in every
+    unique constraint; id stays unique through its sequence. Constraints
+    keep the names Django's migrations gave them, so later migrations that
+    alter or drop them by name still find them.
+    """
+    using = using or connection
+    old = f"{table}_unpartitioned"
+    with transaction.atomic(using=using.alias), using.cursor() as cursor:
+        cursor.execute(f"SELECT EXTRACT(YEAR FROM MIN(date))::int, EXTRACT(YEAR FROM MAX(date))::int FROM {table}")
+        first_year, last_year = cursor.fetchone()
+        current_year = date.today().year
+        first_year = first_year or current_year
+        last_year = max(last_year or current_year, current_year) + years_ahead
+
+        names = constraint_names(table, using)
+
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {old}")
+        cursor.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE (date)")
+        cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        for year in range(first_year, last_year + 1):
+            cursor.execute(
+                f"CREATE TABLE {partition_name(table, year)} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+            )
+
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+        cursor.execute(f"DROP TABLE {old}")
+
+        # The identity sequence went with the old table; id keeps counting from its max
+        cursor.execute(f"CREATE SEQUENCE {table}_id_seq OWNED BY {table}.id")
+        cursor.execute(f"SELECT setval('{table}_id_seq', COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)")
+        cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq')")
+
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {names['p']} PRIMARY KEY (id, date)")
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {names['u']} UNIQUE (symbol_id, date)")
+        cursor.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {names['f']} FOREIGN KEY (symbol_id) "
+            f"REFERENCES stock_symbol (id) DEFERRABLE INITIALLY DEFERRED"
+        )
+    create_indexes(table, using)
+
+
+def constraint_names(table, using=None):
+    """
+    Names of `table`'s primary key, (symbol_id, date) unique and symbol_id
+    foreign key constraints, keyed by contype ('p', 'u', 'f').
+
+    Falls back to PostgreSQL-style names for any that are missing.
+    """
+    using = using or connection
+    names = {'p': f"{table}_pkey", 'u': f"{table}_symbol_id_date_uniq", 'f': f"{table}_symbol_id_fk"}
+    columns = {'p': ['id'], 'u': ['symbol_id', 'date'], 'f': ['symbol_id']}
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT con.conname, con.contype, "
+            "ARRAY(SELECT a.attname FROM unnest(con.conkey) WITH ORDINALITY k(attnum, n) "
+            "JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum ORDER BY k.n) "
+            "FROM pg_constraint con JOIN pg_class c ON c.oid = con.conrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid) AND con.contype IN ('p', 'u', 'f')",
+            [table]
+        )
+        for name, contype, keys in cursor.fetchall():
+            if list(keys) == columns[contype]:
+                names[contype] = name
+    return names
+
+
+def ensure_partitions(table, years, using=None):
+    """
+    Create any missing yearly partitions, moving matching rows out of the DEFAULT partition.
+
+    Returns the names of the partitions created.
+    """
+    using = using or connection
+    created = []
+    for year in years:
+        name = partition_name(table, year)
+        lower, upper = date(year, 1, 1), date(year + 1, 1, 1)
+        with transaction.atomic(using=using.alias), using.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [name])
+            if cursor.fetchone()[0] is not None:
+                continue
+            # ATTACH rejects a range the DEFAULT partition still holds rows for
+            cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {table}_default WHERE date >= %s AND date < %s RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved",
+                [lower, upper]
+            )
+            cursor.execute(
+                f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)",
+                [lower, upper]
+            )
+        created.append(name)
+    return created
+
+
+def drop_partitions_before(table, cutoff, using=None):
+    """
+    Remove rows dated before `cutoff`.
+
+    Yearly partitions entirely older than the cutoff are detached and
+    dropped, which is a catalog change rather than a row-by-row DELETE that
+    bloats the table and WAL; only the boundary year (and the DEFAULT
+    partition) is trimmed with a DELETE. Returns (dropped partition names,
+    rows deleted).
+    """
+    using = using or connection
+    prefix = f"{table}_y"
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s",
+            [table]
+        )
+        partitions = [row[0] for row in cursor.fetchall()]
+
+    dropped = []
+    for name in sorted(partitions):
+        year = name[len(prefix):]
+        if not (name.startswith(prefix) and year.isdigit()):
+            continue
+        if date(int(year) + 1, 1, 1) <= cutoff:
+            with transaction.atomic(using=using.alias), using.cursor() as cursor:
+                cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+                cursor.execute(f"DROP TABLE {name}")
+            dropped.append(name)
+
+    with using.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE date < %s", [cutoff])
+        deleted = cursor.rowcount
+    return dropped, deleted
@@ -0,0 +1,272 @@
+"""
+Stock Analysis staged AI pipeline
+"""
+
+import json
+import re
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import AnalysisRequest, TechnicalIndicator
+
+
+STAGES = ['fetch', 'indicators', 'prompt', 'completion', 'parse']
+
+RECOMMENDATIONS = {'strong_buy', 'buy', 'hold', 'sell', 'strong_sell'}
+
+
+class AnalysisPipeline:
+    """
+    Runs an AnalysisRequest through fetch -> indicators -> prompt -> completion -> parse.
+
+    After each stage its output and timing are checkpointed into
+    result_data['pipeline']; a rerun (e.g. a Celery retry) skips every stage
+    already recorded there, so market data is not refetched and the LLM is
+    not called again once a response has been stored.
+    """
+
+    def __init__(self, analysis):
+        self.analysis = analysis
+        self.stock_symbol = analysis.symbol
+        result_data = analysis.result_data or {}
+        self.checkpoint = result_data.get('pipeline') or {'completed': [], 'stages': {}}
+
+    @property
+    def completed(self):
+        return self.checkpoint['completed']
+
+    def output(self, stage):
+        return self.checkpoint['stages'].get(stage, {}).get('output')
+
+    def run(self):
+        """Run the remaining stages and return the final result payload"""
+        for stage in STAGES:
+            if stage in self.completed:
+                continue
+            started = time.perf_counter()
+            output = getattr(self, f'_{stage}')()
+            self.checkpoint['stages'][stage] = {
+                'output': output,
+                'seconds': round(time.perf_counter() - started, 3)
+            }
+            self.completed.append(stage)
+            self._save_checkpoint()
+
+        return self._result()
+
+    def _save_checkpoint(self):
+        result_data = {**(self.analysis.result_data or {}), 'pipeline': self.checkpoint}
+        self.analysis.result_data = result_data
+        AnalysisRequest.objects.filter(id=self.analysis.id).update(result_data=result_data)
+
+    def _fetch(self):
+        from .utils import get_stock_data, update_market_data
+        from .rate_limit import ProviderRateLimiter
+
+        # Batch workflows download history for the whole watchlist up front
+        bars = self.checkpoint.get('prefetched')
+        if bars is None:
+            ProviderRateLimiter('yahoo').acquire(cost=2)
+            bars = get_stock_data(self.stock_symbol.symbol, self.analysis.timeframe)
+            if bars is False:
+                raise ValueError(f"No price history available for {self.stock_symbol.symbol}")
+        else:
+            ProviderRateLimiter('yahoo').acquire()
+        return {'bars': bars, 'market_data': update_market_data(self.stock_symbol)}
+
+    def _indicators(self):
+        from .indicators import IndicatorMaintainer, INDICATOR_FIELDS
+
+        # Prefetched bars were already folded into the indicators by the chunk task
+        first_changed = None
+        if 'prefetched' not in self.checkpoint:
+            first_changed = (self.output('fetch')['bars'] or {}).get('first_changed')
+        rows_written = IndicatorMaintainer(self.stock_symbol).update(first_changed)
+        latest = TechnicalIndicator.objects.filter(symbol=self.stock_symbol).order_by('-date').first()
+        values = {}
+        if latest is not None:
+            values = {
+                name: float(getattr(latest, name))
+                for name in INDICATOR_FIELDS
+                if getattr(latest, name) is not None
+            }
+            values['date'] = latest.date.isoformat()
+        return {'rows_written': rows_written, 'latest': values}
+
+    def _prompt(self):
+        from apps.ai_insights.models import AnalysisPrompt
+        from .utils import format_analysis_prompt
+
+        indicators = self.output('indicators')['latest']
+        prompt_text = format_analysis_prompt(self.analysis, indicators=indicators)
+        prompt, _ = AnalysisPrompt.objects.update_or_create(
+            analysis_request=self.analysis,
+            defaults={'prompt_text': prompt_text, 'variables_used': {'indicators': indicators}}
+        )
+        return {'prompt_id': prompt.id, 'chars': len(prompt_text)}
+
+    def _completion(self):
+        from groq import Groq
+        from apps.ai_insights.models import AnalysisPrompt, AIModel, AIResponse
+        from .rate_limit import ProviderRateLimiter
+
+        prompt = AnalysisPrompt.objects.get(id=self.output('prompt')['prompt_id'])
+        ai_model, _ = AIModel.objects.get_or_create(
+            name=settings.AI_ANALYSIS_MODEL,
+            defaults={
+                'provider': 'groq',
+                'model_id': settings.AI_ANALYSIS_MODEL,
+                'max_tokens': settings.AI_ANALYSIS_MAX_TOKENS
+            }
+        )
+
+        ProviderRateLimiter('groq').acquire()
+        client = Groq(api_key=settings.GROQ_API_KEY)
+        started = time.perf_counter()
+        completion = client.chat.completions.create(
+            model=ai_model.model_id,
+            messages=[
+                {"role": "system", "content": "You are a senior equity research analyst. Be specific and quantitative."},
+                {"role": "user", "content": prompt.prompt_text}
+            ],
+            max_tokens=ai_model.max_tokens,
+            temperature=ai_model.temperature
+        )
+        response_time = time.perf_counter() - started
+
+        usage = completion.usage
+        total_tokens = getattr(usage, 'total_tokens', 0) or 0
+        response, _ = AIResponse.objects.update_or_create(
+            analysis_request=self.analysis,
+            defaults={
+                'model': ai_model,
+                'prompt_tokens': getattr(usage, 'prompt_tokens', 0) or 0,
+                'completion_tokens': getattr(usage, 'completion_tokens', 0) or 0,
+                'total_tokens': total_tokens,
+                'response_time': timedelta(seconds=response_time),
+                'cost': Decimal(total_tokens) * ai_model.cost_per_token,
+                'raw_response': completion.choices[0].message.content or ''
+            }
+        )
+        return {
+            'ai_response_id': response.id,
+            'model': ai_model.model_id,
+            'total_tokens': total_tokens,
+            'response_seconds': round(response_time, 3)
+        }
+
+    def _parse(self):
+        from apps.ai_insights.models import AIResponse, InsightMetric
+
+        response = AIResponse.objects.get(id=self.output('completion')['ai_response_id'])
+        parsed = parse_structured_block(response.raw_response)
+        scores = indicator_scores(self.output('indicators')['latest'])
+
+        with transaction.atomic():
+            response.processed_response = parsed
+            response.save(update_fields=['processed_response'])
+            InsightMetric.objects.update_or_create(
+                ai_response=response,
+                defaults={
+                    'recommendation': parsed.get('recommendation'),
+                    'confidence_score': parsed.get('confidence'),
+                    'sentiment_score': parsed.get('sentiment_score'),
+                    'risk_score': parsed.get('risk_score'),
+                    'price_target': _decimal(parsed.get('price_target')),
+                    'stop_loss': _decimal(parsed.get('stop_loss')),
+                    **scores
+                }
+            )
+        return {**parsed, **scores}
+
+    def _result(self):
+        parsed = self.output('parse') or {}
+        completion = self.output('completion') or {}
+        return {
+            'pipeline': self.checkpoint,
+            'analysis_type': self.analysis.analysis_type,
+            'symbol': self.stock_symbol.symbol,
+            'status': 'completed',
+            'model_used': completion.get('model'),
+            'recommendations': {
+                'action': parsed.get('recommendation'),
+                'confidence': parsed.get('confidence'),
+                'price_target': parsed.get('price_target'),
+                'stop_loss': parsed.get('stop_loss')
+            },
+            'scores': {
+                key: parsed.get(key)
+                for key in ('sentiment_score', 'risk_score', 'technical_score', 'momentum_score', 'volatility_score')
+            }
+        }
+
+
+def parse_structured_block(text):
+    """
+    Extract the trailing JSON summary the prompt asks for.
+
+    Values are validated and clamped to the InsightMetric ranges; anything
+    missing or malformed is left out rather than failing the analysis.
+    """
+    candidates = re.findall(r'```(?:json)?\s*(\{.*?\})\s*```', text or '', re.S)
+    if not candidates:
+        candidates = re.findall(r'(\{[^{}]*"recommendation"[^{}]*\})', text or '', re.S)
+
+    data = {}
+    for candidate in reversed(candidates):
+        try:
+            data = json.loads(candidate)
+            break
+        except ValueError:
+            continue
+
+    parsed = {}
+    recommendation = str(data.get('recommendation', '')).strip().lower().replace(' ', '_')
+    if recommendation in RECOMMENDATIONS:
+        parsed['recommendation'] = recommendation
+    for key, low, high in (
+        ('confidence', 0.0, 1.0),
+        ('sentiment_score', -1.0, 1.0),
+        ('risk_score', 0.0, 100.0),
+        ('price_target', 0.0, None),
+        ('stop_loss', 0.0, None),
+    ):
+        try:
+            value = float(data[key])
+        except (KeyError, TypeError, ValueError):
+            continue
+        value = max(low, value)
+        parsed[key] = min(high, value) if high is not None else value
+    return parsed
+
+
+def indicator_scores(latest):
+    """Deterministic technical, momentum and volatility scores from the latest indicator row"""
+    scores = {}
+    middle = latest.get('bb_middle')
+    rsi = latest.get('rsi')
+    if rsi is not None:
+        scores['momentum_score'] = round((rsi - 50) * 2, 2)
+
+    trend_checks = [
+        latest.get('sma_20') is not None and latest.get('sma_50') is not None and latest['sma_20'] > latest['sma_50'],
+        latest.get('sma_50') is not None and latest.get('sma_200') is not None and latest['sma_50'] > latest['sma_200'],
+        latest.get('macd_histogram') is not None and latest['macd_histogram'] > 0,
+        rsi is not None and 40 <= rsi <= 70,
+    ]
+    if any(value is not None for value in latest.values()):
+        scores['technical_score'] = round(100 * sum(trend_checks) / len(trend_checks), 2)
+
+    if middle and latest.get('bb_upper') is not None and latest.get('bb_lower') is not None:
+        # Band width relative to the 20-day mean; a 20% wide band maps to 100
+        band_width = (latest['bb_upper'] - latest['bb_lower']) / middle
+        scores['volatility_score'] = round(min(100.0, band_width * 500), 2)
+    return scores
+
+
+def _decimal(value):
+    return Decimal(str(round(value, 4))) if value is not None else None
@@ -0,0 +1,52 @@
+"""
+Stock Analysis provider rate limiting
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class ProviderRateLimiter:
+    """
+    Fixed-window request limiter shared by every worker through the Django cache.
+
+    With the Redis cache backend the window counter is a single atomic INCR,
+    so all Celery workers draw from the same per-provider budget.
+    """
+
+    def __init__(self, provider, limit=None, window=None):
+        default_limit, default_window = settings.PROVIDER_RATE_LIMITS.get(provider, (60, 60))
+        self.provider = provider
+        self.limit = limit or default_limit
+        self.window = window or default_window
+
+    def try_acquire(self, cost=1):
+        """Take `cost` requests from the current window; returns seconds to wait if refused"""
+        # A cost above the limit could never fit in a window; it takes a whole window instead
+        cost = min(cost, self.limit)
+        now = time.time()
+        window_id = int(now // self.window)
+        key = f"ratelimit:{self.provider}:{window_id}"
+
+        cache.add(key, 0, timeout=self.window * 2)
+        used = cache.incr(key, cost)
+        if used <= self.limit:
+            return 0.0
+
+        # Give back a refused reservation so it does not eat other callers' budget
+        cache.decr(key, cost)
+        return (window_id + 1) * self.window - now
+
+    def acquire(self, cost=1, max_wait=None):
+        """Block until the provider budget allows `cost` requests"""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(cost)
+            if delay <= 0:
+                return waited
+            if max_wait is not None and waited + delay > max_wait:
+                raise TimeoutError(f"Rate limit for {self.provider} not available within {max_wait}s")
+            time.sleep(delay)
+            waited += delay
@@ -125,12 +125,54 @@ class StockOverviewSerializer(serializers.ModelSerializer):
         fields = ('symbol', 'company_name', 'exchange', 'sector', 'industry', 'market_data', 'latest_indicators')
     
     def get_latest_indicators(self, obj):
-        latest = obj.indicators.first()
+        latest = obj.indicators.order_by('-date').first()
         if latest:
             return TechnicalIndicatorSerializer(latest).data
         return None
 
 
+class BatchAnalysisCreateSerializer(serializers.Serializer):
+    """Serializer for analyzing several symbols in one request"""
+    
+    # Blank entries are dropped (and counted) rather than failing the whole batch
+    symbols = serializers.ListField(child=serializers.CharField(max_length=10, allow_blank=True), allow_empty=False)
+    analysis_type = serializers.ChoiceField(choices=AnalysisRequest.ANALYSIS_TYPES, default='comprehensive')
+    timeframe = serializers.CharField(max_length=10, default='1y')
+    custom_prompt = serializers.CharField(required=False, allow_blank=True)
+    
+    def validate_symbols(self, value):
+        from django.conf import settings
+        
+        symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in value if symbol.strip()))
+        if not symbols:
+            raise serializers.ValidationError("No symbols provided")
+        if len(symbols) > settings.BATCH_ANALYSIS_MAX_SYMBOLS:
+            raise serializers.ValidationError(
+                f"At most {settings.BATCH_ANALYSIS_MAX_SYMBOLS} symbols per batch"
+            )
+        
+        found = set(
+            StockSymbol.objects.filter(symbol__in=symbols, is_active=True).values_list('symbol', flat=True)
+        )
+        missing = [symbol for symbol in symbols if symbol not in found]
+        if missing:
+            raise serializers.ValidationError(f"Stock symbols not found or inactive: {', '.join(missing)}")
+        return symbols
+    
+    def create(self, validated_data):
+        stock_symbols = StockSymbol.objects.in_bulk(validated_data['symbols'], field_name='symbol')
+        return AnalysisRequest.objects.bulk_create([
+            AnalysisRequest(
+                user=self.context['request'].user,
+                symbol=stock_symbols[symbol],
+                analysis_type=validated_data['analysis_type'],
+                timeframe=validated_data.get('timeframe', '1y'),
+                custom_prompt=validated_data.get('custom_prompt', '')
+            )
+            for symbol in validated_data['symbols']
+        ])
+
+
 class StockAnalysisCreateSerializer(serializers.Serializer):
     """Serializer for creating stock analysis requests"""
     
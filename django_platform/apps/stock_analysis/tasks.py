@@ -2,96 +2,357 @@
 Stock Analysis Celery tasks
 """
 
-from celery import shared_task
+import time
+
+from celery import chain, chord, group, shared_task
 from django.utils import timezone
 from datetime import timedelta
 
 
-@shared_task
-def process_stock_analysis(analysis_id):
-    """Process stock analysis request"""
+@shared_task(bind=True, max_retries=3)
+def process_stock_analysis(self, analysis_id):
+    """Run the staged AI pipeline for an analysis request, resuming from its last checkpoint"""
     from .models import AnalysisRequest
+    from .pipeline import AnalysisPipeline
     
     try:
-        analysis = AnalysisRequest.objects.get(id=analysis_id)
-        analysis.status = 'processing'
-        analysis.save()
-        
-        # Placeholder for actual AI analysis logic
-        # This would integrate with your existing AI analyzer
-        result = {
-            'analysis_type': analysis.analysis_type,
-            'symbol': analysis.symbol.symbol,
-            'status': 'completed',
-            'message': 'Analysis completed successfully',
-            'recommendations': {
-                'action': 'hold',
-                'confidence': 0.75,
-                'price_target': 150.00
-            }
-        }
-        
-        analysis.result_data = result
-        analysis.status = 'completed'
-        analysis.completed_at = timezone.now()
-        analysis.processing_time = timezone.now() - analysis.created_at
-        analysis.save()
-        
-        return f"Analysis {analysis_id} completed successfully"
-        
+        analysis = AnalysisRequest.objects.select_related('symbol').get(id=analysis_id)
     except AnalysisRequest.DoesNotExist:
         return f"Analysis {analysis_id} not found"
+    
+    if analysis.status == 'completed':
+        return f"Analysis {analysis_id} already completed"
+    
+    analysis.status = 'processing'
+    analysis.save(update_fields=['status', 'updated_at'])
+    
+    pipeline = AnalysisPipeline(analysis)
+    try:
+        result = pipeline.run()
     except Exception as e:
-        # Update analysis with error
-        try:
-            analysis = AnalysisRequest.objects.get(id=analysis_id)
-            analysis.status = 'failed'
-            analysis.error_message = str(e)
-            analysis.save()
-        except:
-            pass
+        # Completed stages are checkpointed; a retry picks up at the failed stage
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=2 ** self.request.retries * 15)
+        
+        analysis.refresh_from_db(fields=['result_data'])
+        analysis.status = 'failed'
+        analysis.error_message = f"{type(e).__name__} after stages {pipeline.completed}: {e}"
+        analysis.save(update_fields=['status', 'error_message', 'updated_at'])
         return f"Analysis {analysis_id} failed: {str(e)}"
+    
+    analysis.result_data = result
+    analysis.status = 'completed'
+    analysis.completed_at = timezone.now()
+    analysis.processing_time = analysis.completed_at - analysis.created_at
+    analysis.save()
+    
+    return f"Analysis {analysis_id} completed successfully"
+
+
+@shared_task
+def analyze_watchlist(analysis_ids, chunk_size=None):
+    """
+    Run a batch of analysis requests with shared data fetches.
+    
+    Price histories for the distinct symbols are downloaded first in
+    multi-ticker chunks; the per-symbol pipelines then start from that
+    data instead of downloading their own.
+    """
+    from django.conf import settings
+    from .models import AnalysisRequest
+    from .rate_limit import ProviderRateLimiter
+    
+    analyses = list(
+        AnalysisRequest.objects.filter(id__in=analysis_ids).select_related('symbol').order_by('created_at')
+    )
+    if not analyses:
+        return "No analysis requests to process"
+    
+    chunk_size = min(chunk_size or settings.STOCK_DATA_CHUNK_SIZE, ProviderRateLimiter('yahoo').limit)
+    # Longest requested timeframe covers every request in the batch
+    period = max((analysis.timeframe for analysis in analyses), key=_timeframe_days)
+    symbols = list(dict.fromkeys(analysis.symbol.symbol for analysis in analyses))
+    chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+    max_wait = _chunk_max_wait(len(symbols))
+    
+    chord(
+        group(update_stock_data_chunk.s(chunk, period, max_wait=max_wait) for chunk in chunks)
+    )(dispatch_watchlist_analyses.s([str(analysis.id) for analysis in analyses], time.time()))
+    
+    return f"Fetching {len(symbols)} symbols in {len(chunks)} chunks for {len(analyses)} analyses"
 
 
 @shared_task
-def update_stock_data():
-    """Update stock data for all active symbols"""
+def dispatch_watchlist_analyses(chunk_results, analysis_ids, started_at):
+    """Chord callback: seed each pipeline with the shared download, then run analyses in bounded waves"""
+    from django.conf import settings
+    from .models import AnalysisRequest
+    
+    fetched = {
+        result['symbol']: {'inserted': result.get('inserted', 0), 'updated': result.get('updated', 0)}
+        for chunk in chunk_results for result in chunk
+        if result['status'] == 'success'
+    }
+    
+    for analysis in AnalysisRequest.objects.filter(id__in=analysis_ids).select_related('symbol'):
+        bars = fetched.get(analysis.symbol.symbol)
+        if bars is None:
+            continue  # Failed downloads fall back to the pipeline's own fetch
+        result_data = analysis.result_data or {}
+        pipeline = result_data.get('pipeline') or {'completed': [], 'stages': {}}
+        pipeline['prefetched'] = bars
+        AnalysisRequest.objects.filter(id=analysis.id).update(result_data={**result_data, 'pipeline': pipeline})
+    
+    # Each wave waits for the previous one, so at most BATCH_ANALYSIS_CONCURRENCY completions are in flight
+    wave_size = settings.BATCH_ANALYSIS_CONCURRENCY
+    waves = [analysis_ids[i:i + wave_size] for i in range(0, len(analysis_ids), wave_size)]
+    chain(
+        *[group(process_stock_analysis.si(analysis_id) for analysis_id in wave) for wave in waves],
+        summarize_watchlist_analysis.si(analysis_ids, started_at)
+    ).apply_async()
+    
+    return f"Dispatched {len(analysis_ids)} analyses in {len(waves)} waves ({len(fetched)} symbols prefetched)"
+
+
+@shared_task
+def summarize_watchlist_analysis(analysis_ids, started_at):
+    """Final step of a batch analysis: report per-request outcomes"""
+    from .models import AnalysisRequest
+    
+    statuses = dict(AnalysisRequest.objects.filter(id__in=analysis_ids).values_list('symbol__symbol', 'status'))
+    summary = {
+        'analyses': len(analysis_ids),
+        'completed': sum(1 for s in statuses.values() if s == 'completed'),
+        'failed': [symbol for symbol, s in statuses.items() if s == 'failed'],
+        'wall_time': time.time() - started_at
+    }
+    
+    print(
+        f"Watchlist analysis: {summary['completed']}/{summary['analyses']} completed, "
+        f"{len(summary['failed'])} failed in {summary['wall_time']:.1f}s"
+    )
+    return summary
+
+
+def _timeframe_days(timeframe):
+    """Approximate length of a yfinance period string, for picking the widest one"""
+    units = {'d': 1, 'wk': 7, 'mo': 30, 'y': 365}
+    if timeframe == 'max':
+        return float('inf')
+    if timeframe == 'ytd':
+        return 366
+    for unit, days in units.items():
+        if timeframe.endswith(unit) and timeframe[:-len(unit)].isdigit():
+            return int(timeframe[:-len(unit)]) * days
+    return 0
+
+
+def _chunk_max_wait(symbol_count):
+    """
+    Longest a chunk may be deferred for Yahoo admission.
+
+    The provider admits about YAHOO_RATE_LIMIT symbols per window, so a
+    refresh of N symbols needs ceil(N / limit) windows; the last chunk must
+    be allowed to wait that long (plus one window of slack) rather than the
+    flat PROVIDER_RATE_LIMIT_MAX_WAIT.
+    """
+    import math
+    from django.conf import settings
+    from .rate_limit import ProviderRateLimiter
+    
+    limiter = ProviderRateLimiter('yahoo')
+    windows = math.ceil(symbol_count / limiter.limit) + 1
+    return max(settings.PROVIDER_RATE_LIMIT_MAX_WAIT, windows * limiter.window)
+
+
+@shared_task
+def update_stock_data(period='5d', chunk_size=None):
+    """Fan out a data refresh for all active symbols as chunked sub-tasks"""
+    from django.conf import settings
     from .models import StockSymbol
-    from .utils import get_stock_data
+    from .rate_limit import ProviderRateLimiter
     
-    symbols = StockSymbol.objects.filter(is_active=True)
-    updated_count = 0
+    # A chunk is admitted as one reservation, so it must fit in a single rate-limit window
+    chunk_size = min(chunk_size or settings.STOCK_DATA_CHUNK_SIZE, ProviderRateLimiter('yahoo').limit)
+    symbols = list(
+        StockSymbol.objects.filter(is_active=True).order_by('symbol').values_list('symbol', flat=True)
+    )
+    if not symbols:
+        return "No active symbols to update"
+    
+    chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+    max_wait = _chunk_max_wait(len(symbols))
+    chord(
+        group(update_stock_data_chunk.s(chunk, period, max_wait=max_wait) for chunk in chunks)
+    )(summarize_stock_data_update.s(time.time()))
+    
+    return f"Dispatched {len(chunks)} chunks for {len(symbols)} symbols"
+
+
+DOWNLOAD_MAX_RETRIES = 3
+
+
+@shared_task(bind=True, max_retries=None)
+def update_stock_data_chunk(self, symbols, period='5d', max_wait=None, rate_limit_waited=0.0, download_retries=0):
+    """
+    Download one chunk with a single multi-ticker request and upsert each symbol.
+
+    Rate-limit deferrals and download failures are both Celery retries, so
+    the task itself has no retry limit; deferrals are bounded by `max_wait`
+    seconds in total and download failures by DOWNLOAD_MAX_RETRIES.
+    """
+    import pandas as pd
+    import yfinance as yf
+    from django.conf import settings
+    from .indicators import IndicatorMaintainer
+    from .models import StockSymbol
+    from .rate_limit import ProviderRateLimiter
+    from .utils import upsert_stock_history
     
+    max_wait = max_wait or settings.PROVIDER_RATE_LIMIT_MAX_WAIT
+    retry_kwargs = {'max_wait': max_wait, 'rate_limit_waited': rate_limit_waited, 'download_retries': download_retries}
+    
+    delay = ProviderRateLimiter('yahoo').try_acquire(cost=len(symbols))
+    if delay > 0:
+        if rate_limit_waited + delay > max_wait:
+            return [
+                {'symbol': symbol, 'status': 'failed', 'latency': 0.0,
+                 'error': f"Rate limit not available within {max_wait:.0f}s"}
+                for symbol in symbols
+            ]
+        # Requeue rather than sleep so the worker is free until the window resets
+        raise self.retry(
+            countdown=delay,
+            args=[symbols, period],
+            kwargs={**retry_kwargs, 'rate_limit_waited': rate_limit_waited + delay}
+        )
+    
+    started = time.perf_counter()
+    try:
+        data = yf.download(
+            symbols,
+            period=period,
+            group_by='ticker',
+            auto_adjust=True,
+            threads=True,
+            progress=False
+        )
+    except Exception as e:
+        if download_retries < DOWNLOAD_MAX_RETRIES:
+            raise self.retry(
+                exc=e,
+                countdown=2 ** download_retries * 10,
+                args=[symbols, period],
+                kwargs={**retry_kwargs, 'download_retries': download_retries + 1}
+            )
+        return [
+            {'symbol': symbol, 'status': 'failed', 'error': f"Download failed: {e}", 'latency': 0.0}
+            for symbol in symbols
+        ]
+    download_latency = time.perf_counter() - started
+    
+    stock_symbols = StockSymbol.objects.in_bulk(symbols, field_name='symbol')
+    results = []
     for symbol in symbols:
+        symbol_started = time.perf_counter()
         try:
-            success = get_stock_data(symbol.symbol, '1d')
-            if success:
-                updated_count += 1
+            if isinstance(data.columns, pd.MultiIndex):
+                frame = data[symbol] if symbol in data.columns.get_level_values(0) else pd.DataFrame()
+            else:
+                frame = data
+            frame = frame.dropna(how='all')
+            
+            if frame.empty:
+                raise ValueError("No data returned")
+            
+            stats = upsert_stock_history(stock_symbols[symbol], frame)
         except Exception as e:
-            continue
+            results.append({'symbol': symbol, 'status': 'failed', 'error': str(e)})
+        else:
+            # The bars are stored either way; an indicator failure is reported on its own
+            try:
+                stats['indicator_rows'] = IndicatorMaintainer(stock_symbols[symbol]).update(stats['first_changed'])
+            except Exception as e:
+                stats['indicator_error'] = str(e)
+            results.append({'symbol': symbol, 'status': 'success', **stats})
+        
+        # Each symbol carries an equal share of the batched download plus its own write
+        results[-1]['latency'] = download_latency / len(symbols) + time.perf_counter() - symbol_started
+    
+    return results
+
+
+@shared_task
+def summarize_stock_data_update(chunk_results, started_at):
+    """Chord callback aggregating per-symbol results of a fan-out refresh"""
+    results = [result for chunk in chunk_results for result in chunk]
+    succeeded = [r for r in results if r['status'] == 'success']
+    failed = [r for r in results if r['status'] != 'success']
+    latencies = [r['latency'] for r in results]
     
-    return f"Updated data for {updated_count} symbols"
+    summary = {
+        'symbols': len(results),
+        'succeeded': len(succeeded),
+        'failed': len(failed),
+        'rows_inserted': sum(r.get('inserted', 0) for r in succeeded),
+        'rows_updated': sum(r.get('updated', 0) for r in succeeded),
+        'avg_latency': sum(latencies) / len(latencies) if latencies else 0.0,
+        'max_latency': max(latencies) if latencies else 0.0,
+        'wall_time': time.time() - started_at,
+        'failures': {r['symbol']: r.get('error', '') for r in failed},
+        'indicator_failures': {r['symbol']: r['indicator_error'] for r in succeeded if 'indicator_error' in r}
+    }
+    
+    print(
+        f"Stock data refresh: {summary['succeeded']}/{summary['symbols']} symbols updated, "
+        f"{summary['failed']} failed, {len(summary['indicator_failures'])} indicator failures "
+        f"in {summary['wall_time']:.1f}s"
+    )
+    return summary
 
 
 @shared_task
 def cleanup_old_data():
-    """Clean up old stock data and analysis requests"""
-    from .models import StockData, AnalysisRequest
+    """
+    Clean up old stock data and analysis requests.
+
+    Partitioned time series tables drop whole yearly partitions past the
+    retention window (and create the coming years' partitions); unpartitioned
+    ones fall back to a single DELETE.
+    """
+    from django.conf import settings
+    from .models import StockData, TechnicalIndicator, AnalysisRequest
+    from .partitions import drop_partitions_before, ensure_partitions, is_partitioned
+    from .timeseries import bar_chunks, indicator_chunks
     
-    # Remove stock data older than 5 years
-    cutoff_date = timezone.now().date() - timedelta(days=5*365)
-    old_data_count = StockData.objects.filter(date__lt=cutoff_date).count()
-    StockData.objects.filter(date__lt=cutoff_date).delete()
+    today = timezone.now().date()
+    cutoff_date = today - timedelta(days=settings.STOCK_DATA_RETENTION_YEARS * 365)
+    upcoming_years = range(today.year, today.year + settings.STOCK_DATA_PARTITIONS_AHEAD + 1)
+    
+    old_data_count = 0
+    dropped_partitions = []
+    for model in (StockData, TechnicalIndicator):
+        table = model._meta.db_table
+        if is_partitioned(table):
+            ensure_partitions(table, upcoming_years)
+            dropped, deleted = drop_partitions_before(table, cutoff_date)
+            dropped_partitions.extend(dropped)
+        else:
+            deleted, _ = model.objects.filter(date__lt=cutoff_date).delete()
+        old_data_count += deleted
+    
+    # Trim the packed chunks to the same cutoff so they keep matching the rows
+    for store in (bar_chunks, indicator_chunks):
+        store.trim_before(cutoff_date)
     
     # Remove failed analysis requests older than 30 days
     analysis_cutoff = timezone.now() - timedelta(days=30)
-    old_analyses_count = AnalysisRequest.objects.filter(
-        status='failed',
-        created_at__lt=analysis_cutoff
-    ).count()
-    AnalysisRequest.objects.filter(
+    old_analyses_count, _ = AnalysisRequest.objects.filter(
         status='failed',
         created_at__lt=analysis_cutoff
     ).delete()
     
-    return f"Cleaned up {old_data_count} old data records and {old_analyses_count} old analyses"
+    return (
+        f"Cleaned up {old_data_count} old data records, {len(dropped_partitions)} partitions "
+        f"and {old_analyses_count} old analyses"
+    )
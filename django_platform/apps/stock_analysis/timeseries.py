@@ -0,0 +1,173 @@
+"""
+Stock Analysis packed time series storage
+"""
+
+import numpy as np
+from django.db import transaction
+
+from .indicators import INDICATOR_FIELDS
+from .models import SeriesChunk
+
+
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+BAR_COLUMNS = [
+    ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+    ('adjusted_close', '<f8'), ('volume', '<i8'),
+]
+
+
+class ChunkStore:
+    """
+    Per-symbol, per-year SeriesChunk rows holding one packed array per column.
+
+    A year of daily data is a single row, so loading 20 years reads ~20 rows
+    and builds each column with np.frombuffer; no Decimal or per-row Python
+    objects are created. Missing float values are stored as NaN.
+    """
+
+    def __init__(self, kind, columns):
+        self.kind = kind
+        self.columns = [(name, np.dtype(dtype)) for name, dtype in columns]
+
+    def load(self, stock_symbol, start=None, end=None):
+        """Return {'date': datetime64[D] array, column: array, ...} for [start, end]"""
+        chunks = SeriesChunk.objects.filter(symbol=stock_symbol, kind=self.kind)
+        if start is not None:
+            chunks = chunks.filter(year__gte=start.year)
+        if end is not None:
+            chunks = chunks.filter(year__lte=end.year)
+
+        parts = [
+            self._decode(row_count, dates, data)
+            for row_count, dates, data in chunks.order_by('year').values_list('row_count', 'dates', 'data')
+        ]
+        if not parts:
+            return self._empty()
+
+        series = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+        if start is not None or end is not None:
+            mask = np.ones(len(series['date']), dtype=bool)
+            if start is not None:
+                mask &= series['date'] >= np.datetime64(start, 'D')
+            if end is not None:
+                mask &= series['date'] <= np.datetime64(end, 'D')
+            series = {name: values[mask] for name, values in series.items()}
+        return series
+
+    def exists(self, stock_symbol):
+        """Whether the symbol has any chunks of this kind"""
+        return SeriesChunk.objects.filter(symbol=stock_symbol, kind=self.kind).exists()
+
+    def write(self, stock_symbol, dates, values):
+        """
+        Merge rows into the symbol's chunks; incoming values replace stored ones on the same date.
+
+        `dates` is anything convertible to datetime64[D]; `values` maps each
+        column name to an array of the same length.
+        """
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        if len(dates) == 0:
+            return 0
+        incoming = {name: np.asarray(values[name], dtype=dtype) for name, dtype in self.columns}
+        years = dates.astype('datetime64[Y]').astype(int) + 1970
+
+        with transaction.atomic():
+            existing = {
+                year: self._decode(row_count, stored_dates, data)
+                for year, row_count, stored_dates, data in SeriesChunk.objects.select_for_update().filter(
+                    symbol=stock_symbol, kind=self.kind, year__in=set(years.tolist())
+                ).values_list('year', 'row_count', 'dates', 'data')
+            }
+
+            for year in np.unique(years):
+                in_year = years == year
+                merged = {'date': dates[in_year], **{name: array[in_year] for name, array in incoming.items()}}
+                if year in existing:
+                    merged = self._merge(existing[year], merged)
+                SeriesChunk.objects.update_or_create(
+                    symbol=stock_symbol, kind=self.kind, year=int(year),
+                    defaults=self._encode(merged)
+                )
+        return len(dates)
+
+    def rebuild(self, stock_symbol, dates, values):
+        """Replace every chunk of the symbol with the given full history"""
+        with transaction.atomic():
+            SeriesChunk.objects.filter(symbol=stock_symbol, kind=self.kind).delete()
+            return self.write(stock_symbol, dates, values)
+
+    def trim_before(self, cutoff):
+        """
+        Drop packed rows dated before `cutoff` for every symbol, mirroring row retention.
+
+        Older years are deleted outright; the boundary year's chunks are
+        rewritten without the expired rows. Returns the chunks rewritten.
+        """
+        SeriesChunk.objects.filter(kind=self.kind, year__lt=cutoff.year).delete()
+        boundary = np.datetime64(cutoff, 'D')
+        rewritten = 0
+        with transaction.atomic():
+            for chunk in SeriesChunk.objects.select_for_update().filter(kind=self.kind, year=cutoff.year):
+                series = self._decode(chunk.row_count, chunk.dates, chunk.data)
+                keep = series['date'] >= boundary
+                if keep.all():
+                    continue
+                if not keep.any():
+                    chunk.delete()
+                else:
+                    for field, value in self._encode({name: array[keep] for name, array in series.items()}).items():
+                        setattr(chunk, field, value)
+                    chunk.save(update_fields=['row_count', 'dates', 'data', 'updated_at'])
+                rewritten += 1
+        return rewritten
+
+    def _merge(self, stored, incoming):
+        combined = {name: np.concatenate([stored[name], incoming[name]]) for name in stored}
+        # Stable sort keeps stored rows before incoming ones; the last row of each date wins
+        order = np.argsort(combined['date'], kind='stable')
+        sorted_dates = combined['date'][order]
+        keep = np.append(sorted_dates[1:] != sorted_dates[:-1], True)
+        return {name: array[order][keep] for name, array in combined.items()}
+
+    def _encode(self, series):
+        order = np.argsort(series['date'], kind='stable')
+        days = (series['date'][order] - EPOCH).astype('<i4')
+        data = b''.join(series[name][order].astype(dtype).tobytes() for name, dtype in self.columns)
+        return {'row_count': len(days), 'dates': days.tobytes(), 'data': data}
+
+    def _decode(self, row_count, dates, data):
+        series = {'date': EPOCH + np.frombuffer(dates, dtype='<i4').astype('timedelta64[D]')}
+        offset = 0
+        for name, dtype in self.columns:
+            series[name] = np.frombuffer(data, dtype=dtype, count=row_count, offset=offset)
+            offset += row_count * dtype.itemsize
+        return series
+
+    def _empty(self):
+        return {'date': np.array([], dtype='datetime64[D]'),
+                **{name: np.array([], dtype=dtype) for name, dtype in self.columns}}
+
+
+def pack_bars_from_rows(stock_symbol):
+    """Rebuild a symbol's bar chunks from its StockData rows (for history stored before chunking)"""
+    from .models import StockData
+    
+    rows = list(
+        StockData.objects.filter(symbol=stock_symbol).order_by('date').values_list(
+            'date', 'open_price', 'high_price', 'low_price', 'close_price', 'adjusted_close', 'volume'
+        )
+    )
+    if not rows:
+        return 0
+    dates, *columns = zip(*rows)
+    values = {
+        name: np.array([np.nan if value is None else float(value) for value in column])
+        for (name, _), column in zip(BAR_COLUMNS[:-1], columns[:-1])
+    }
+    values['volume'] = np.array(columns[-1], dtype='<i8')
+    return bar_chunks.rebuild(stock_symbol, dates, values)
+
+
+bar_chunks = ChunkStore('bars', BAR_COLUMNS)
+indicator_chunks = ChunkStore('indicators', [(name, '<f8') for name in INDICATOR_FIELDS])
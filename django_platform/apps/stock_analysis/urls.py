@@ -30,6 +30,7 @@ urlpatterns = [
     
     # API Analysis endpoints
     path('analyze/', views.CreateAnalysisView.as_view(), name='create-analysis'),
+    path('analyze/batch/', views.BatchAnalysisView.as_view(), name='create-batch-analysis'),
     path('analyses/', views.AnalysisRequestListView.as_view(), name='analysis-list'),
     path('analyses/<uuid:id>/', views.AnalysisResultView.as_view(), name='analysis-result'),
     path('analyses/<uuid:analysis_id>/cancel/', views.cancel_analysis, name='cancel-analysis'),
@@ -5,12 +5,18 @@ Stock Analysis utilities
 import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
+from decimal import Decimal
+from django.db import transaction
 from django.utils import timezone
-from .models import StockSymbol, StockData, MarketData, TechnicalIndicator
+from .models import StockSymbol, StockData, MarketData
 
 
 def get_stock_data(symbol, timeframe='1y'):
-    """Fetch stock data from Yahoo Finance"""
+    """
+    Fetch stock data from Yahoo Finance and bulk upsert it.
+
+    Returns the row counts from upsert_stock_history, or False on failure.
+    """
     try:
         ticker = yf.Ticker(symbol)
         hist = ticker.history(period=timeframe)
@@ -26,27 +32,107 @@ def get_stock_data(symbol, timeframe='1y'):
             }
         )
         
-        # Save historical data
-        for date, row in hist.iterrows():
-            StockData.objects.update_or_create(
-                symbol=stock_symbol,
-                date=date.date(),
-                defaults={
-                    'open_price': row['Open'],
-                    'high_price': row['High'],
-                    'low_price': row['Low'],
-                    'close_price': row['Close'],
-                    'volume': row['Volume'],
-                    'adjusted_close': row['Close']
-                }
-            )
-        
-        return True
+        return upsert_stock_history(stock_symbol, hist)
     except Exception as e:
         print(f"Error fetching data for {symbol}: {e}")
         return False
 
 
+STOCK_DATA_UPDATE_FIELDS = [
+    'open_price', 'high_price', 'low_price', 'close_price', 'volume', 'adjusted_close'
+]
+
+
+def _to_price(value):
+    """Convert a float price to the Decimal stored in a decimal_places=4 column"""
+    return Decimal(str(round(float(value), 4)))
+
+
+def upsert_stock_history(stock_symbol, hist, batch_size=1000):
+    """
+    Write a yfinance history frame to StockData in one transaction.
+
+    Existing (symbol, date) rows in the frame's date range are read once and
+    diffed against the incoming bars; only new or changed bars are written,
+    with a single INSERT ... ON CONFLICT DO UPDATE per batch. The returned
+    stats include `first_changed`, the ISO date of the earliest bar written
+    (None if nothing changed), so indicator state can be rewound past it.
+    """
+    hist = hist.dropna(subset=['Open', 'High', 'Low', 'Close'])
+    stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'first_changed': None}
+    if hist.empty:
+        return stats
+    
+    dates = [timestamp.date() for timestamp in hist.index]
+    existing = {
+        row[0]: row[1:]
+        for row in StockData.objects.filter(
+            symbol=stock_symbol,
+            date__range=(min(dates), max(dates))
+        ).values_list('date', *STOCK_DATA_UPDATE_FIELDS)
+    }
+    
+    rows = []
+    for date, open_price, high, low, close, volume in zip(
+        dates,
+        hist['Open'].to_numpy(),
+        hist['High'].to_numpy(),
+        hist['Low'].to_numpy(),
+        hist['Close'].to_numpy(),
+        hist['Volume'].fillna(0).to_numpy()
+    ):
+        values = (
+            _to_price(open_price), _to_price(high), _to_price(low),
+            _to_price(close), int(volume), _to_price(close)
+        )
+        
+        current = existing.get(date)
+        if current is None:
+            stats['inserted'] += 1
+        elif tuple(current) == values:
+            stats['unchanged'] += 1
+            continue
+        else:
+            stats['updated'] += 1
+        
+        rows.append(StockData(symbol=stock_symbol, date=date, **dict(zip(STOCK_DATA_UPDATE_FIELDS, values))))
+    
+    from .timeseries import bar_chunks, pack_bars_from_rows
+    
+    # History stored before chunking is packed whole once, rather than chunking only the new bars
+    unpacked = not bar_chunks.exists(stock_symbol)
+    if not rows:
+        if unpacked:
+            pack_bars_from_rows(stock_symbol)
+        return stats
+    
+    stats['first_changed'] = min(row.date for row in rows).isoformat()
+    
+    close = hist['Close'].to_numpy(dtype=float).round(4)
+    with transaction.atomic():
+        StockData.objects.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['symbol', 'date'],
+            update_fields=STOCK_DATA_UPDATE_FIELDS
+        )
+        if unpacked:
+            pack_bars_from_rows(stock_symbol)
+        else:
+            # Keep the packed per-year chunks in step with the rows
+            bar_chunks.write(stock_symbol, dates, {
+                'open': hist['Open'].to_numpy(dtype=float).round(4),
+                'high': hist['High'].to_numpy(dtype=float).round(4),
+                'low': hist['Low'].to_numpy(dtype=float).round(4),
+                'close': close,
+                'adjusted_close': close,
+                'volume': hist['Volume'].fillna(0).to_numpy().astype('int64')
+            })
+    
+    return stats
+
+
 def update_market_data(stock_symbol):
     """Update current market data for a stock"""
     try:
@@ -80,57 +166,27 @@ def update_market_data(stock_symbol):
         return False
 
 
-def calculate_technical_indicators(symbol, period=50):
-    """Calculate technical indicators for a stock"""
+def calculate_technical_indicators(symbol, backfill=False):
+    """
+    Bring technical indicators for a stock up to date.
+
+    By default only bars newer than the stored rolling state are computed;
+    backfill=True recomputes the whole history (e.g. after a split re-adjusts
+    past prices). Returns the number of indicator rows written, or False.
+    """
+    from .indicators import IndicatorMaintainer
+    
     try:
-        stock_data = StockData.objects.filter(
-            symbol__symbol=symbol
-        ).order_by('date')[:period]
-        
-        if len(stock_data) < period:
-            return False
-        
-        # Convert to pandas DataFrame
-        df = pd.DataFrame([
-            {
-                'date': data.date,
-                'open': float(data.open_price),
-                'high': float(data.high_price),
-                'low': float(data.low_price),
-                'close': float(data.close_price),
-                'volume': data.volume
-            }
-            for data in stock_data
-        ])
-        
-        # Calculate indicators (simplified)
-        df['sma_20'] = df['close'].rolling(window=20).mean()
-        df['sma_50'] = df['close'].rolling(window=50).mean()
-        df['ema_12'] = df['close'].ewm(span=12).mean()
-        df['ema_26'] = df['close'].ewm(span=26).mean()
-        
-        # Save indicators
         stock_symbol = StockSymbol.objects.get(symbol=symbol)
-        for _, row in df.iterrows():
-            TechnicalIndicator.objects.update_or_create(
-                symbol=stock_symbol,
-                date=row['date'],
-                defaults={
-                    'sma_20': row.get('sma_20'),
-                    'sma_50': row.get('sma_50'),
-                    'ema_12': row.get('ema_12'),
-                    'ema_26': row.get('ema_26'),
-                }
-            )
-        
-        return True
+        maintainer = IndicatorMaintainer(stock_symbol)
+        return maintainer.backfill() if backfill else maintainer.update()
     except Exception as e:
         print(f"Error calculating indicators for {symbol}: {e}")
         return False
 
 
-def format_analysis_prompt(analysis_request):
-    """Format the prompt for AI analysis"""
+def format_analysis_prompt(analysis_request, indicators=None):
+    """Format the prompt for AI analysis, ending with the JSON summary the pipeline parses"""
     
     symbol = analysis_request.symbol.symbol
     analysis_type = analysis_request.analysis_type
@@ -163,9 +219,20 @@ def format_analysis_prompt(analysis_request):
     for data in recent_data[:10]:
         prompt += f"Date: {data.date}, Close: ${data.close_price}, Volume: {data.volume}\n"
     
+    if indicators:
+        prompt += "\nLatest technical indicators:\n"
+        prompt += ", ".join(
+            f"{name}={value:.2f}" for name, value in indicators.items() if isinstance(value, float)
+        )
+        prompt += "\n"
+    
     if analysis_request.custom_prompt:
         prompt += f"\n\nAdditional instructions: {analysis_request.custom_prompt}"
     
     prompt += "\n\nProvide a comprehensive analysis with specific recommendations, price targets, and risk assessment."
+    prompt += (
+        "\n\nEnd with a fenced ```json block containing: recommendation (strong_buy/buy/hold/sell/strong_sell), "
+        "confidence (0-1), sentiment_score (-1 to 1), risk_score (0-100), price_target, stop_loss."
+    )
     
     return prompt
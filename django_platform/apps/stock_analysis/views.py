@@ -5,12 +5,16 @@ Stock Analysis app views
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse
 from django.db.models import Q
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, timedelta
+import csv
+import json
 import uuid
 
 from .models import (
@@ -18,12 +22,13 @@ from .models import (
     AnalysisRequest, UserWatchlist, WatchlistItem, MarketData
 )
 from .serializers import (
-    StockSymbolSerializer, StockDataSerializer, TechnicalIndicatorSerializer,
+    StockSymbolSerializer, TechnicalIndicatorSerializer,
     AnalysisRequestSerializer, AnalysisResultSerializer, UserWatchlistSerializer,
     WatchlistItemSerializer, MarketDataSerializer, StockOverviewSerializer,
-    StockAnalysisCreateSerializer
+    StockAnalysisCreateSerializer, BatchAnalysisCreateSerializer
 )
-from .tasks import process_stock_analysis
+from .pagination import DateKeysetPagination
+from .tasks import process_stock_analysis, analyze_watchlist
 from .utils import get_stock_data, update_market_data
 
 
@@ -54,18 +59,32 @@ class StockOverviewView(generics.RetrieveAPIView):
         return get_object_or_404(StockSymbol, symbol=symbol, is_active=True)
 
 
-class StockDataView(generics.ListAPIView):
-    """Get historical stock data"""
+class _Echo:
+    """File-like object whose write() returns the line, for streaming csv.writer output"""
+    
+    def write(self, value):
+        return value
+
+
+class StockDataView(generics.GenericAPIView):
+    """
+    Get historical stock data.
+    
+    Pages are keyset-paginated on date and built from values() rows, so no
+    model instances or per-row symbol lookups are created. ?export=ndjson or
+    ?export=csv streams the whole range in date order instead.
+    """
     
-    serializer_class = StockDataSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
-    filterset_fields = ['date']
-    ordering = ['-date']
+    pagination_class = DateKeysetPagination
+    
+    FIELDS = ('id', 'date', 'open_price', 'high_price', 'low_price', 'close_price', 'volume', 'adjusted_close')
+    DECIMAL_FIELDS = ('open_price', 'high_price', 'low_price', 'close_price', 'adjusted_close')
+    EXPORT_FORMATS = ('ndjson', 'csv')
     
     def get_queryset(self):
         symbol = self.kwargs['symbol'].upper()
-        stock = get_object_or_404(StockSymbol, symbol=symbol, is_active=True)
+        self.stock = get_object_or_404(StockSymbol, symbol=symbol, is_active=True)
         
         # Get timeframe from query params
         timeframe = self.request.query_params.get('timeframe', '1y')
@@ -80,11 +99,65 @@ class StockDataView(generics.ListAPIView):
         days = timeframe_days.get(timeframe, 365)
         start_date = end_date - timedelta(days=days)
         
-        return StockData.objects.filter(
-            symbol=stock,
+        queryset = StockData.objects.filter(
+            symbol=self.stock,
             date__gte=start_date,
             date__lte=end_date
         )
+        
+        exact_date = self.request.query_params.get('date')
+        if exact_date:
+            try:
+                queryset = queryset.filter(date=date.fromisoformat(exact_date))
+            except ValueError:
+                raise ValidationError({'date': 'Must be an ISO date (YYYY-MM-DD)'})
+        return queryset
+    
+    def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        
+        export = request.query_params.get('export')
+        if export in self.EXPORT_FORMATS:
+            return self._stream_export(queryset, export)
+        
+        rows = self.paginate_queryset(queryset.values(*self.FIELDS))
+        symbol_id, symbol_name = self.stock.id, self.stock.symbol
+        for row in rows:
+            # Same representation as StockDataSerializer: decimals as strings, dates as ISO
+            for field in self.DECIMAL_FIELDS:
+                if row[field] is not None:
+                    row[field] = str(row[field])
+            row['date'] = row['date'].isoformat()
+            row['symbol'] = symbol_id
+            row['symbol_name'] = symbol_name
+        return self.get_paginated_response(rows)
+    
+    def _stream_export(self, queryset, export):
+        """Stream every row in the range in date order, fetched in server-side chunks"""
+        columns = self.FIELDS[1:]
+        rows = queryset.order_by('date').values_list(*columns).iterator(chunk_size=2000)
+        filename = f"{self.stock.symbol}_history.{export}"
+        
+        if export == 'csv':
+            writer = csv.writer(_Echo())
+            
+            def csv_lines():
+                yield writer.writerow(columns)
+                for row in rows:
+                    yield writer.writerow(row)
+            
+            content = csv_lines()
+            content_type = 'text/csv'
+        else:
+            content = (
+                json.dumps(dict(zip(columns, row)), default=str, separators=(',', ':')) + '\n'
+                for row in rows
+            )
+            content_type = 'application/x-ndjson'
+        
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
 
 class TechnicalIndicatorView(generics.ListAPIView):
@@ -115,7 +188,7 @@ class TechnicalIndicatorView(generics.ListAPIView):
             symbol=stock,
             date__gte=start_date,
             date__lte=end_date
-        )
+        ).order_by('-date')
 
 
 class CreateAnalysisView(generics.CreateAPIView):
@@ -140,6 +213,34 @@ class CreateAnalysisView(generics.CreateAPIView):
         }, status=status.HTTP_201_CREATED)
 
 
+class BatchAnalysisView(generics.CreateAPIView):
+    """Queue one analysis per symbol, sharing the price download across the batch"""
+    
+    serializer_class = BatchAnalysisCreateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        submitted = serializer.initial_data.get('symbols', [])
+        blanks_removed = sum(1 for symbol in submitted if not str(symbol).strip())
+        
+        analysis_requests = serializer.save()
+        analyze_watchlist.delay([str(analysis.id) for analysis in analysis_requests])
+        
+        # Each request completes independently; poll analyses/<id>/ for per-symbol results
+        return Response({
+            'analyses': [
+                {'id': analysis.id, 'symbol': analysis.symbol.symbol, 'status': analysis.status}
+                for analysis in analysis_requests
+            ],
+            'duplicates_removed': len(submitted) - blanks_removed - len(analysis_requests),
+            'blanks_removed': blanks_removed,
+            'message': f'{len(analysis_requests)} analysis requests created and queued for processing'
+        }, status=status.HTTP_201_CREATED)
+
+
 class AnalysisRequestListView(generics.ListAPIView):
     """List user's analysis requests"""
     
@@ -43,6 +43,7 @@ THIRD_PARTY_APPS = [
 
 LOCAL_APPS = [
     'apps.stock_analysis',
+    'apps.ai_insights',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -212,6 +213,30 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Market data refresh fan-out
+STOCK_DATA_CHUNK_SIZE = env.int('STOCK_DATA_CHUNK_SIZE', default=50)  # Symbols per yf.download call
+
+# Time series retention; with partitioning on (PostgreSQL only), stock_data and
+# technical_indicator are range-partitioned by year and retention drops partitions
+STOCK_DATA_PARTITIONING = env.bool('STOCK_DATA_PARTITIONING', default=False)
+STOCK_DATA_RETENTION_YEARS = env.int('STOCK_DATA_RETENTION_YEARS', default=5)
+STOCK_DATA_PARTITIONS_AHEAD = env.int('STOCK_DATA_PARTITIONS_AHEAD', default=1)  # Future years kept created
+
+# Provider rate limits shared by all workers through the cache: (requests, window seconds)
+PROVIDER_RATE_LIMITS = {
+    'yahoo': (env.int('YAHOO_RATE_LIMIT', default=60), 60),
+    'groq': (env.int('GROQ_RATE_LIMIT', default=30), 60),
+}
+# Minimum seconds a refresh chunk may be deferred; refreshes larger than YAHOO_RATE_LIMIT
+# symbols per window get one window per limit's worth of symbols on top
+PROVIDER_RATE_LIMIT_MAX_WAIT = env.int('PROVIDER_RATE_LIMIT_MAX_WAIT', default=300)
+
+# AI analysis pipeline
+AI_ANALYSIS_MODEL = env('AI_ANALYSIS_MODEL', default='llama-3.3-70b-versatile')
+AI_ANALYSIS_MAX_TOKENS = env.int('AI_ANALYSIS_MAX_TOKENS', default=2000)
+BATCH_ANALYSIS_MAX_SYMBOLS = env.int('BATCH_ANALYSIS_MAX_SYMBOLS', default=50)
+BATCH_ANALYSIS_CONCURRENCY = env.int('BATCH_ANALYSIS_CONCURRENCY', default=3)  # Memos in flight per batch
+
 # API Keys (from environment)
 GROQ_API_KEY = env('GROQ_API_KEY', default='')
 ALPHA_VANTAGE_API_KEY = env('ALPHA_VANTAGE_API_KEY', default='')
@@ -1,8 +1,17 @@
 # Module initialization file
 # Imports all necessary components for the Professional Stock Analytics Platform
 
-from .config import AppConfig, APIConfig, UIConfig, APISettings
+from .config import AppConfig, APIConfig, UIConfig, APISettings, CacheConfig, HTTPConfig, LLMConfig
 from .data_fetcher import DataFetcher, MetricsCalculator
+from .indicators import IndicatorEngine, BatchIndicatorCalculator
+from .data_store import OHLCVStore, ohlcv_store
+from .info_cache import TickerInfoCache, info_cache
+from .enrichment import EnrichmentPipeline
+from .http_client import HTTPClientPool, http_client
+from .model_registry import ModelRegistry, model_registry
+from .llm_cache import LLMResponseCache, llm_response_cache
+from .llm_rate_limit import LLMRateLimiter, llm_rate_limiter
+from .portfolio_risk import PortfolioRiskEngine, portfolio_risk_engine
 from .ai_analyzer import AIAnalyzer
 from .visualizations import ChartCreator, UIComponents
 from .display_components import DisplayManager
@@ -13,8 +22,28 @@ __all__ = [
     'APIConfig', 
     'UIConfig',
     'APISettings',
+    'CacheConfig',
+    'HTTPConfig',
+    'LLMConfig',
     'DataFetcher',
     'MetricsCalculator',
+    'IndicatorEngine',
+    'BatchIndicatorCalculator',
+    'OHLCVStore',
+    'ohlcv_store',
+    'TickerInfoCache',
+    'info_cache',
+    'EnrichmentPipeline',
+    'HTTPClientPool',
+    'http_client',
+    'ModelRegistry',
+    'model_registry',
+    'LLMResponseCache',
+    'llm_response_cache',
+    'LLMRateLimiter',
+    'llm_rate_limiter',
+    'PortfolioRiskEngine',
+    'portfolio_risk_engine',
     'AIAnalyzer',
     'ChartCreator',
     'UIComponents',
@@ -1,53 +1,44 @@
 # AI Analysis Module
 # Handles AI-powered investment analysis using Groq API with model fallback
 
-from groq import Groq
 import streamlit as st
+import asyncio
+import threading
 import time
-from .config import APIConfig
+from concurrent.futures import ThreadPoolExecutor
+from .config import APIConfig, LLMConfig
+from .model_registry import model_registry
+from .llm_cache import llm_response_cache
+from .llm_rate_limit import RateLimitTimeout, llm_rate_limiter
+
+# Process-wide bound on in-flight completions, shared by every AIAnalyzer instance
+_llm_slots = threading.BoundedSemaphore(LLMConfig.MAX_CONCURRENCY)
+_llm_executor = ThreadPoolExecutor(max_workers=LLMConfig.MAX_CONCURRENCY, thread_name_prefix='llm')
 
 
 class AIAnalyzer:
     """AI-powered financial analysis using Groq API with model fallback handling"""
     
-    # Current Groq models (updated September 2025)
-    PRIMARY_MODELS = [
-        "llama-3.3-70b-versatile",      # Latest Llama model
-        "llama-3.1-70b-versatile",     # Backup if 3.3 not available
-        "mixtral-8x7b-32768",          # Mixtral for complex analysis
-        "llama-3.1-8b-instant",       # Fast model for quick analysis
-    ]
-    
-    def __init__(self):
-        self.client = None
-        self.current_model = None
-        if APIConfig.GROQ_API_KEY:
-            try:
-                self.client = Groq(api_key=APIConfig.GROQ_API_KEY)
-                self._validate_models()
-            except Exception as e:
-                print(f"Groq client initialization failed: {e}")
+    PRIMARY_MODELS = LLMConfig.PRIMARY_MODELS
     
-    def _validate_models(self):
-        """Test which models are currently available"""
-        for model in self.PRIMARY_MODELS:
-            try:
-                # Test with a simple prompt
-                response = self.client.chat.completions.create(
-                    model=model,
-                    messages=[{"role": "user", "content": "Test"}],
-                    max_tokens=10,
-                    timeout=5
-                )
-                self.current_model = model
-                print(f"✅ Using Groq model: {model}")
-                break
-            except Exception as e:
-                print(f"❌ Model {model} unavailable: {str(e)[:50]}...")
-                continue
-        
-        if not self.current_model:
-            print("⚠️ No Groq models are currently available")
+    MEMO_SYSTEM_PROMPT = "You are a senior equity research analyst at Goldman Sachs with 15+ years of experience in fundamental analysis and institutional investing."
+    MEMO_SAMPLING = {
+        "temperature": 0.1,  # Low temperature for consistent analysis
+        "max_tokens": 2000,
+        "top_p": 0.9
+    }
+    
+    def __init__(self, registry=None, response_cache=None, rate_limiter=None):
+        # Cheap to construct: the client and model availability live in the shared registry
+        self.registry = registry or model_registry
+        self.response_cache = response_cache or llm_response_cache
+        self.rate_limiter = rate_limiter or llm_rate_limiter
+        self.client = self.registry.client
+    
+    @property
+    def current_model(self):
+        """Preferred model that is not currently demoted"""
+        return self.registry.current_model()
     
     def is_available(self):
         """Check if AI analysis is available"""
@@ -62,67 +53,227 @@ class AIAnalyzer:
             return "❌ No Groq models are currently available. Please try again later."
         
         try:
-            # Prepare comprehensive context
-            financial_context = self._build_financial_context(symbol, enhanced_metrics)
+            # Prompt from the cached metrics snapshot so unchanged fundamentals reuse the cached memo
+            snapshot = self.response_cache.snapshot_for(symbol, enhanced_metrics)
+            financial_context = self._build_financial_context(symbol, snapshot)
             news_context = self._build_news_context(news_articles)
             
             prompt = self._build_institutional_prompt(symbol, financial_context, news_context)
             
             # Use current working model with retry logic
-            return self._generate_with_retry(prompt)
+            return self._generate_with_retry(prompt, symbol=symbol)
             
         except Exception as e:
             return f"❌ AI Analysis Error: {str(e)}"
     
-    def _generate_with_retry(self, prompt, max_retries=3):
+    def stream_enhanced_ai_analysis(self, symbol, enhanced_metrics, news_articles):
+        """Yield the analysis text incrementally as tokens arrive from the model"""
+        if not self.client:
+            yield "❌ AI Analysis unavailable. Please add GROQ_API_KEY to .env file."
+            return
+        
+        if not self.current_model:
+            yield "❌ No Groq models are currently available. Please try again later."
+            return
+        
+        try:
+            snapshot = self.response_cache.snapshot_for(symbol, enhanced_metrics)
+            financial_context = self._build_financial_context(symbol, snapshot)
+            news_context = self._build_news_context(news_articles)
+            
+            prompt = self._build_institutional_prompt(symbol, financial_context, news_context)
+            
+            yield from self._stream_with_retry(prompt, symbol=symbol)
+            
+        except Exception as e:
+            yield f"❌ AI Analysis Error: {str(e)}"
+    
+    async def acreate_enhanced_ai_analysis(self, symbol, enhanced_metrics, news_articles):
+        """Async variant for event-loop callers; runs on the bounded LLM executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _llm_executor, self.create_enhanced_ai_analysis, symbol, enhanced_metrics, news_articles
+        )
+    
+    def _create_completion(self, **kwargs):
+        """Run one chat completion after rate-limit admission, within the process-wide concurrency limit"""
+        model = kwargs['model']
+        reserved = self.rate_limiter.estimate_tokens(kwargs['messages'], kwargs.get('max_tokens'))
+        try:
+            # Queue here until the shared RPM/TPM budgets admit the call
+            self.rate_limiter.acquire(model, reserved)
+            with _llm_slots:
+                completion = self.client.chat.completions.create(
+                    timeout=LLMConfig.REQUEST_TIMEOUT_SECONDS, **kwargs
+                )
+        except Exception as e:
+            self._report_failure(model, e)
+            raise
+        self.registry.report_success(model)
+        usage = self._usage(completion)
+        self.rate_limiter.reconcile(model, reserved, usage and usage['total_tokens'])
+        return completion
+    
+    def _stream_completion(self, **kwargs):
+        """Yield content deltas of one streamed completion, holding a concurrency slot throughout"""
+        model = kwargs['model']
+        reserved = self.rate_limiter.estimate_tokens(kwargs['messages'], kwargs.get('max_tokens'))
+        generated = 0
+        admitted = False
+        try:
+            self.rate_limiter.acquire(model, reserved)
+            admitted = True
+            with _llm_slots:
+                stream = self.client.chat.completions.create(
+                    timeout=LLMConfig.REQUEST_TIMEOUT_SECONDS, stream=True, **kwargs
+                )
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        generated += len(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+        except Exception as e:
+            self._report_failure(model, e)
+            raise
+        else:
+            self.registry.report_success(model)
+        finally:
+            # Also runs when the consumer abandons the stream (GeneratorExit). Streams carry
+            # no usage block; settle against an estimate of what was generated
+            if admitted:
+                used = self.rate_limiter.estimate_tokens(kwargs['messages']) + int(generated / 3.5)
+                self.rate_limiter.reconcile(model, reserved, used)
+    
+    def _report_failure(self, model, error):
+        """Demote the model and, on a provider 429, hold off every process sharing the budget"""
+        if isinstance(error, RateLimitTimeout):
+            # Our own admission queue was full; the model itself is healthy
+            return
+        kind = self.registry.report_failure(model, error)
+        if kind == 'rate_limited':
+            self.rate_limiter.penalize(model, self.registry.retry_after(error))
+    
+    def _memo_cache_key(self, model, prompt):
+        """Content address of a memo completion"""
+        return self.response_cache.make_key(model, self.MEMO_SYSTEM_PROMPT, prompt, **self.MEMO_SAMPLING)
+    
+    def _memo_messages(self, prompt):
+        """System and user messages for the investment memo"""
+        return [
+            {
+                "role": "system", 
+                "content": self.MEMO_SYSTEM_PROMPT
+            },
+            {
+                "role": "user", 
+                "content": prompt
+            }
+        ]
+    
+    def _stream_with_retry(self, prompt, max_retries=3, symbol=None):
+        """
+        Stream the memo with the same fallback rules as _generate_with_retry.
+        
+        Retries and model switches only happen before the first token; once
+        text has been yielded an error is appended rather than restarting.
+        """
+        for attempt in range(max_retries):
+            started = False
+            model = self.current_model
+            cache_key = self._memo_cache_key(model, prompt)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                yield cached['response']
+                return
+            
+            try:
+                parts = []
+                for delta in self._stream_completion(
+                    model=model,
+                    messages=self._memo_messages(prompt),
+                    **self.MEMO_SAMPLING
+                ):
+                    started = True
+                    parts.append(delta)
+                    yield delta
+                self.response_cache.put(cache_key, "".join(parts), model, symbol=symbol)
+                return
+                
+            except Exception as e:
+                error_msg = str(e)
+                
+                if started:
+                    yield f"\n\n❌ Stream interrupted: {error_msg}"
+                    return
+                
+                # Already queued for the full admission window; another round would only wait again
+                if isinstance(e, RateLimitTimeout):
+                    yield f"❌ AI Analysis is busy ({error_msg}). Please try again shortly."
+                    return
+                
+                # The registry has already demoted the failing model
+                if "decommissioned" in error_msg or "model_decommissioned" in error_msg:
+                    if self.current_model:
+                        print(f"Switching to model: {self.current_model}")
+                        continue
+                    
+                    yield "❌ All Groq models are currently unavailable. Please try again later."
+                    return
+                
+                # Admission control queues the retry; no sleep-and-retry here
+                elif "rate_limit" in error_msg:
+                    if self.current_model != model:
+                        print(f"Rate limited on {model}, switching to {self.current_model}")
+                    continue
+                
+                else:
+                    if attempt == max_retries - 1:
+                        yield f"❌ AI Analysis failed after {max_retries} attempts: {error_msg}"
+                        return
+                    time.sleep(1)
+                    continue
+        
+        yield "❌ AI Analysis temporarily unavailable. Please try again."
+    
+    def _generate_with_retry(self, prompt, max_retries=3, symbol=None):
         """Generate response with retry logic and model fallback"""
         
         for attempt in range(max_retries):
+            model = self.current_model
+            cache_key = self._memo_cache_key(model, prompt)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached['response']
+            
             try:
-                completion = self.client.chat.completions.create(
-                    model=self.current_model,
-                    messages=[
-                        {
-                            "role": "system", 
-                            "content": "You are a senior equity research analyst at Goldman Sachs with 15+ years of experience in fundamental analysis and institutional investing."
-                        },
-                        {
-                            "role": "user", 
-                            "content": prompt
-                        }
-                    ],
-                    temperature=0.1,  # Low temperature for consistent analysis
-                    max_tokens=2000,
-                    top_p=0.9,
-                    stream=False
+                completion = self._create_completion(
+                    model=model,
+                    messages=self._memo_messages(prompt),
+                    stream=False,
+                    **self.MEMO_SAMPLING
                 )
                 
-                return completion.choices[0].message.content
+                content = completion.choices[0].message.content
+                self.response_cache.put(cache_key, content, model, usage=self._usage(completion), symbol=symbol)
+                return content
                 
             except Exception as e:
                 error_msg = str(e)
                 
-                # Handle model decommissioned error
+                if isinstance(e, RateLimitTimeout):
+                    return f"❌ AI Analysis is busy ({error_msg}). Please try again shortly."
+                
+                # The registry has already demoted the failing model; pick up the next one
                 if "decommissioned" in error_msg or "model_decommissioned" in error_msg:
-                    print(f"Model {self.current_model} decommissioned, trying next model...")
-                    
-                    # Try next available model
-                    try:
-                        current_index = self.PRIMARY_MODELS.index(self.current_model)
-                        if current_index + 1 < len(self.PRIMARY_MODELS):
-                            self.current_model = self.PRIMARY_MODELS[current_index + 1]
-                            print(f"Switching to model: {self.current_model}")
-                            continue
-                    except ValueError:
-                        pass
+                    if self.current_model:
+                        print(f"Switching to model: {self.current_model}")
+                        continue
                     
                     return "❌ All Groq models are currently unavailable. Please try again later."
                 
-                # Handle rate limiting
+                # Handle rate limiting: the limiter paces the retry instead of sleeping here
                 elif "rate_limit" in error_msg:
-                    wait_time = 2 ** attempt  # Exponential backoff
-                    print(f"Rate limited, waiting {wait_time} seconds...")
-                    time.sleep(wait_time)
+                    if self.current_model != model:
+                        print(f"Rate limited on {model}, switching to {self.current_model}")
                     continue
                 
                 # Other errors
@@ -134,6 +285,18 @@ class AIAnalyzer:
         
         return "❌ AI Analysis temporarily unavailable. Please try again."
     
+    @staticmethod
+    def _usage(completion):
+        """Token counts reported for a completion, if any"""
+        usage = getattr(completion, 'usage', None)
+        if usage is None:
+            return None
+        return {
+            'prompt_tokens': getattr(usage, 'prompt_tokens', None),
+            'completion_tokens': getattr(usage, 'completion_tokens', None),
+            'total_tokens': getattr(usage, 'total_tokens', None)
+        }
+    
     def _build_financial_context(self, symbol, enhanced_metrics):
         """Build financial context string for AI prompt"""
         return f"""
@@ -227,7 +390,7 @@ Provide a one-sentence sentiment summary (Bullish/Bearish/Neutral) with key reas
 """
         
         try:
-            response = self.client.chat.completions.create(
+            response = self._create_completion(
                 model=self.current_model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
@@ -245,6 +408,7 @@ Provide a one-sentence sentiment summary (Bullish/Bearish/Neutral) with key reas
         return {
             "current_model": self.current_model,
             "available_models": self.PRIMARY_MODELS,
+            "model_health": self.registry.status()['models'],
             "api_key_configured": bool(APIConfig.GROQ_API_KEY),
             "client_initialized": bool(self.client),
             "is_available": self.is_available()
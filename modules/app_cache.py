@@ -0,0 +1,118 @@
+# App Cache Module
+# Streamlit cache_data/cache_resource wrappers with TTLs matched to each source's freshness
+
+import streamlit as st
+from .config import APIConfig, APISettings, CacheConfig
+from .data_fetcher import DataFetcher, MetricsCalculator
+from .info_cache import info_cache
+from .llm_cache import llm_response_cache
+from .ai_analyzer import AIAnalyzer
+
+
+class _Uncached(Exception):
+    """Carries a failed result out of a cached function so it is not stored"""
+
+
+# Fetches: failures are raised through _Uncached so the next rerun retries them
+
+@st.cache_data(ttl=CacheConfig.APP_QUOTE_TTL_SECONDS, max_entries=CacheConfig.APP_CACHE_MAX_ENTRIES, show_spinner=False)
+def _stock_data(symbol, period):
+    result = DataFetcher.get_stock_data(symbol, period)
+    if not result['success']:
+        raise _Uncached(result)
+    return result
+
+
+@st.cache_data(ttl=CacheConfig.APP_RISK_FREE_TTL_SECONDS, max_entries=1, show_spinner=False)
+def _risk_free_rate():
+    rate = DataFetcher.fetch_risk_free_rate()
+    # The fetcher falls back to the default on errors; only a key-less default is a real answer
+    if rate == APISettings.DEFAULT_RISK_FREE_RATE and APIConfig.FRED_API_KEY:
+        raise _Uncached(rate)
+    return rate
+
+
+@st.cache_data(ttl=CacheConfig.APP_FUNDAMENTALS_TTL_SECONDS, max_entries=CacheConfig.APP_CACHE_MAX_ENTRIES, show_spinner=False)
+def _alpha_vantage(symbol):
+    data = DataFetcher.fetch_alpha_vantage_fundamentals(symbol)
+    if data is None and APIConfig.ALPHA_VANTAGE_API_KEY:
+        raise _Uncached(data)
+    return data
+
+
+@st.cache_data(ttl=CacheConfig.APP_NEWS_TTL_SECONDS, max_entries=CacheConfig.APP_CACHE_MAX_ENTRIES, show_spinner=False)
+def _company_news(symbol):
+    articles = DataFetcher.fetch_company_news(symbol)
+    if not articles and APIConfig.NEWS_API_KEY:
+        raise _Uncached(articles)
+    return articles
+
+
+def _uncached_fallback(func, *args):
+    try:
+        return func(*args)
+    except _Uncached as e:
+        return e.args[0]
+
+
+def get_stock_data(symbol, period):
+    """DataFetcher.get_stock_data, cached for the quote TTL"""
+    return _uncached_fallback(_stock_data, symbol, period)
+
+
+def enrichment_sources(symbol):
+    """EnrichmentPipeline sources backed by the Streamlit cache"""
+    return {
+        'risk_free_rate': (lambda: _uncached_fallback(_risk_free_rate), APISettings.DEFAULT_RISK_FREE_RATE),
+        'alpha_vantage': (lambda: _uncached_fallback(_alpha_vantage, symbol), None),
+        'news': (lambda: _uncached_fallback(_company_news, symbol), []),
+    }
+
+
+# Derived values: keyed on their (hashed) inputs, so they follow the fetches they come from
+
+@st.cache_data(ttl=CacheConfig.APP_QUOTE_TTL_SECONDS, max_entries=CacheConfig.APP_CACHE_MAX_ENTRIES, show_spinner=False)
+def get_enhanced_financial_metrics(stock_data, av_data, risk_free_rate):
+    """MetricsCalculator.get_enhanced_financial_metrics, cached per input"""
+    return MetricsCalculator.get_enhanced_financial_metrics(stock_data, av_data, risk_free_rate)
+
+
+@st.cache_data(ttl=CacheConfig.APP_QUOTE_TTL_SECONDS, max_entries=CacheConfig.APP_CACHE_MAX_ENTRIES, show_spinner=False)
+def calculate_indicators(historical_data):
+    """Indicator series and latest indicator values for a price history"""
+    indicator_series = MetricsCalculator.calculate_indicator_series(historical_data)
+    return indicator_series, MetricsCalculator.calculate_technical_indicators(historical_data, indicator_series)
+
+
+@st.cache_data(ttl=CacheConfig.APP_SENTIMENT_TTL_SECONDS, max_entries=CacheConfig.APP_CACHE_MAX_ENTRIES, show_spinner=False)
+def _quick_sentiment(_ai_analyzer, symbol, headlines):
+    sentiment = _ai_analyzer.get_quick_sentiment(symbol, list(headlines))
+    if sentiment.startswith(("Sentiment analysis error", "Neutral - No analysis available")):
+        raise _Uncached(sentiment)
+    return sentiment
+
+
+def get_quick_sentiment(ai_analyzer, symbol, headlines):
+    """AIAnalyzer.get_quick_sentiment, cached per (symbol, headlines)"""
+    return _uncached_fallback(_quick_sentiment, ai_analyzer, symbol, tuple(headlines))
+
+
+@st.cache_resource(show_spinner=False)
+def get_ai_analyzer():
+    """Process-wide AIAnalyzer shared by every session"""
+    return AIAnalyzer()
+
+
+def refresh(symbol=None):
+    """
+    Drop cached fetches and derived values so the next rerun refetches.
+
+    With a symbol, its ticker info and memo metrics snapshot are dropped as
+    well; stored price bars keep their own incremental refresh schedule.
+    """
+    for cached in (_stock_data, _risk_free_rate, _alpha_vantage, _company_news,
+                   get_enhanced_financial_metrics, calculate_indicators, _quick_sentiment):
+        cached.clear()
+    if symbol:
+        info_cache.invalidate(symbol)
+        llm_response_cache.invalidate(symbol)
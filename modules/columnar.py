@@ -0,0 +1,154 @@
+# Columnar Transport Module
+# Column-oriented JSON, Arrow IPC and Parquet encodings of price history frames
+
+import gzip
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class ColumnarEncoder:
+    """Encodes a bars DataFrame without building one Python object per row"""
+
+    MEDIA_TYPES = {
+        'json': 'application/json',
+        'arrow': 'application/vnd.apache.arrow.stream',
+        'parquet': 'application/vnd.apache.parquet',
+    }
+    # Accept header values that select a binary format
+    ACCEPT_FORMATS = {
+        'application/vnd.apache.arrow.stream': 'arrow',
+        'application/vnd.apache.arrow.file': 'arrow',
+        'application/vnd.apache.parquet': 'parquet',
+        'application/x-parquet': 'parquet',
+    }
+    COMPRESSIONS = ('none', 'gzip', 'zstd')
+
+    @classmethod
+    def negotiate(cls, requested_format=None, accept=None):
+        """Format from an explicit ?format= or the Accept header's preferred type; JSON by default"""
+        if requested_format:
+            if requested_format not in cls.MEDIA_TYPES:
+                raise ValueError(f"Unsupported format '{requested_format}', expected one of {sorted(cls.MEDIA_TYPES)}")
+            return requested_format
+
+        # Highest q-value wins, earlier entries break ties; JSON and wildcards select the default
+        best, best_q = 'json', 0.0
+        for media_range in (accept or '').split(','):
+            media_type, *params = [part.strip() for part in media_range.split(';')]
+            fmt = cls.ACCEPT_FORMATS.get(media_type)
+            if fmt is None and media_type not in ('application/json', 'application/*', '*/*'):
+                continue
+            q = 1.0
+            for param in params:
+                name, _, value = param.partition('=')
+                if name.strip() == 'q':
+                    try:
+                        q = float(value)
+                    except ValueError:
+                        q = 0.0
+            if q > best_q:
+                best, best_q = fmt or 'json', q
+        return best
+
+    @staticmethod
+    def select(frame, start=None, end=None, fields=None, date_column='Date'):
+        """Rows in [start, end] and the requested columns (the date column is always kept)"""
+        if start is not None or end is not None:
+            dates = frame[date_column]
+            tz = getattr(dates.dt, 'tz', None)
+            mask = np.ones(len(frame), dtype=bool)
+            if start is not None:
+                mask &= (dates >= pd.Timestamp(start, tz=tz)).to_numpy()
+            if end is not None:
+                # An end date includes that whole day
+                mask &= (dates < pd.Timestamp(end, tz=tz) + pd.Timedelta(days=1)).to_numpy()
+            frame = frame[mask]
+
+        if fields:
+            unknown = [field for field in fields if field not in frame.columns]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+            frame = frame[[date_column] + [field for field in fields if field != date_column]]
+        return frame
+
+    @classmethod
+    def encode(cls, frame, fmt, compression='none', metadata=None, date_column='Date'):
+        """
+        Serialize `frame` and return (body bytes, media type, Content-Encoding or None).
+
+        Arrow and Parquet compress inside the format for zstd (their readers
+        decompress transparently); gzip, and any compression of JSON, is
+        applied to the whole body and reported as a Content-Encoding.
+        """
+        if compression not in cls.COMPRESSIONS:
+            raise ValueError(f"Unsupported compression '{compression}', expected one of {list(cls.COMPRESSIONS)}")
+        if compression == 'zstd' and fmt == 'json' and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        if fmt in ('arrow', 'parquet') and pa is None:
+            raise ValueError(f"{fmt} output requires pyarrow")
+
+        if fmt == 'json':
+            body = cls._json(frame, metadata or {}, date_column)
+        elif fmt == 'arrow':
+            body = cls._arrow(frame, metadata or {}, 'zstd' if compression == 'zstd' else None)
+        else:
+            body = cls._parquet(frame, metadata or {}, compression if compression != 'none' else 'snappy')
+
+        content_encoding = None
+        if compression == 'gzip' and fmt != 'parquet':
+            body, content_encoding = gzip.compress(body, compresslevel=5), 'gzip'
+        elif compression == 'zstd' and fmt == 'json':
+            body, content_encoding = zstandard.ZstdCompressor(level=3).compress(body), 'zstd'
+        return body, cls.MEDIA_TYPES[fmt], content_encoding
+
+    @staticmethod
+    def _json(frame, metadata, date_column):
+        columns = {}
+        for name in frame.columns:
+            series = frame[name]
+            if name == date_column:
+                columns[name] = series.dt.strftime('%Y-%m-%d').tolist()
+                continue
+            values = series.to_numpy()
+            if values.dtype.kind == 'f':
+                # JSON has no NaN; missing values become null
+                values = np.where(np.isnan(values), None, values)
+            columns[name] = values.tolist()
+        payload = {**metadata, 'count': len(frame), 'columns': columns}
+        return json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+
+    @staticmethod
+    def _table(frame, metadata):
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        schema_metadata = {**(table.schema.metadata or {}), **{k: str(v) for k, v in metadata.items()}}
+        return table.replace_schema_metadata(schema_metadata)
+
+    @classmethod
+    def _arrow(cls, frame, metadata, compression):
+        table = cls._table(frame, metadata)
+        sink = pa.BufferOutputStream()
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    @classmethod
+    def _parquet(cls, frame, metadata, compression):
+        buffer = io.BytesIO()
+        pq.write_table(cls._table(frame, metadata), buffer, compression=compression)
+        return buffer.getvalue()
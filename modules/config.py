@@ -33,6 +33,9 @@ class UIConfig:
         'hover': 'rgba(255, 255, 255, 0.1)'
     }
     
+    # Charts: longer histories are resampled (weekly, then monthly) down to about this many bars
+    CHART_TARGET_BARS = 400
+    
     # Typography
     FONTS = {
         'primary': 'Inter',
@@ -88,6 +91,81 @@ class APISettings:
     
     # Request timeouts
     TIMEOUT_SECONDS = 15
+    ENRICHMENT_DEADLINE_SECONDS = 20  # Overall budget for the concurrent enrichment stage
     
     # Default fallback values
     DEFAULT_RISK_FREE_RATE = 0.03  # 3%
+
+# Shared HTTP client settings for the REST providers (FRED, Alpha Vantage, NewsAPI)
+class HTTPConfig:
+    POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 10))  # Distinct hosts kept pooled
+    POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 20))  # Keep-alive connections per host
+    MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 3))
+    BACKOFF_BASE_SECONDS = 0.5
+    BACKOFF_MAX_SECONDS = 8.0
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    USER_AGENT = 'ProfessionalStockAnalytics/1.0'
+
+# LLM client settings
+class LLMConfig:
+    MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 4))  # Concurrent completions per process
+    REQUEST_TIMEOUT_SECONDS = 60
+    
+    # Groq models in order of preference
+    PRIMARY_MODELS = [
+        "llama-3.3-70b-versatile",      # Latest Llama model
+        "llama-3.1-70b-versatile",     # Backup if 3.3 not available
+        "mixtral-8x7b-32768",          # Mixtral for complex analysis
+        "llama-3.1-8b-instant",       # Fast model for quick analysis
+    ]
+    MODEL_REFRESH_SECONDS = 30 * 60  # Background model listing interval
+    RATE_LIMIT_COOLDOWN_SECONDS = 30  # Used when no Retry-After header is given
+    
+    # Shared request/token budgets per model: (requests per minute, tokens per minute)
+    REDIS_URL = os.getenv('REDIS_URL', '')  # Buckets fall back to a local file without Redis
+    DEFAULT_RATE_LIMIT = (30, 6000)
+    RATE_LIMITS = {
+        "llama-3.3-70b-versatile": (30, 12000),
+        "llama-3.1-70b-versatile": (30, 6000),
+        "mixtral-8x7b-32768": (30, 5000),
+        "llama-3.1-8b-instant": (30, 6000),
+    }
+    RATE_LIMIT_MAX_WAIT_SECONDS = 60  # Longest a call queues for admission; one full bucket refill
+    RATE_LIMIT_COMPLETION_TOKENS = 1200  # Output tokens reserved per call (capped at max_tokens); reconcile settles the rest
+    DECOMMISSIONED_COOLDOWN_SECONDS = 24 * 3600
+    
+    # Completion cache
+    RESPONSE_CACHE_TTL_SECONDS = int(os.getenv('LLM_RESPONSE_CACHE_TTL', 3600))
+    RESPONSE_CACHE_MATERIAL_CHANGE = 0.02  # Relative metric move that forces a fresh memo
+
+# Local Cache Configuration
+class CacheConfig:
+    # On-disk OHLCV store (one Parquet file per symbol)
+    OHLCV_STORE_DIR = os.getenv('OHLCV_STORE_DIR', os.path.join('.cache', 'ohlcv'))
+    OHLCV_REFRESH_MINUTES = 15  # Ask the provider for new bars at most this often
+    
+    # Streamlit per-rerun caches, with TTLs matched to how fast each source changes
+    APP_QUOTE_TTL_SECONDS = 60  # Price history + quote fields, and values derived from them
+    APP_NEWS_TTL_SECONDS = 15 * 60
+    APP_SENTIMENT_TTL_SECONDS = 60 * 60
+    APP_FUNDAMENTALS_TTL_SECONDS = 6 * 3600
+    APP_RISK_FREE_TTL_SECONDS = 24 * 3600  # GS10 is a monthly series
+    APP_CACHE_MAX_ENTRIES = 64  # Per cached function
+    CHART_FIGURE_CACHE_MAX_ENTRIES = 32  # Serialized figures per (symbol, period, theme)
+    
+    # Portfolio covariance matrices per (universe, window, returns)
+    COVARIANCE_TTL_SECONDS = 3600
+    COVARIANCE_MAX_ENTRIES = 64
+    
+    # Content-addressed LLM response cache
+    LLM_CACHE_DIR = os.getenv('LLM_CACHE_DIR', os.path.join('.cache', 'llm'))
+    
+    # Shared ticker.info cache
+    INFO_CACHE_MAX_SYMBOLS = 256
+    INFO_TTL_SECONDS = 6 * 3600  # Profile and fundamentals change slowly
+    INFO_QUOTE_TTL_SECONDS = 60  # Price and volume fields go stale quickly
+    INFO_QUOTE_FIELDS = (
+        'currentPrice', 'regularMarketPrice', 'previousClose',
+        'regularMarketPreviousClose', 'regularMarketChangePercent',
+        'volume', 'regularMarketVolume', 'marketCap', 'dayHigh', 'dayLow'
+    )
@@ -1,13 +1,15 @@
 # API Integration Module
 # Handles all external API calls and data fetching
 
-import requests
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import streamlit as st
 from .config import APIConfig, APISettings
+from .data_store import ohlcv_store
+from .info_cache import info_cache
+from .http_client import http_client
+from .indicators import IndicatorEngine, BatchIndicatorCalculator
 
 
 class DataFetcher:
@@ -20,8 +22,13 @@ class DataFetcher:
             if not APIConfig.FRED_API_KEY:
                 return APISettings.DEFAULT_RISK_FREE_RATE
                 
-            url = f"{APISettings.FRED_BASE_URL}?series_id={APISettings.FRED_TREASURY_SERIES}&api_key={APIConfig.FRED_API_KEY}&limit=1&sort_order=desc&file_type=json"
-            response = requests.get(url, timeout=APISettings.TIMEOUT_SECONDS)
+            response = http_client.get(APISettings.FRED_BASE_URL, params={
+                'series_id': APISettings.FRED_TREASURY_SERIES,
+                'api_key': APIConfig.FRED_API_KEY,
+                'limit': 1,
+                'sort_order': 'desc',
+                'file_type': 'json'
+            })
             
             if response.status_code == 200:
                 data = response.json()
@@ -40,8 +47,11 @@ class DataFetcher:
             if not APIConfig.ALPHA_VANTAGE_API_KEY:
                 return None
                 
-            url = f"{APISettings.ALPHA_VANTAGE_BASE_URL}?function=OVERVIEW&symbol={symbol}&apikey={APIConfig.ALPHA_VANTAGE_API_KEY}"
-            response = requests.get(url, timeout=APISettings.TIMEOUT_SECONDS)
+            response = http_client.get(APISettings.ALPHA_VANTAGE_BASE_URL, params={
+                'function': 'OVERVIEW',
+                'symbol': symbol,
+                'apikey': APIConfig.ALPHA_VANTAGE_API_KEY
+            })
             
             if response.status_code == 200:
                 data = response.json()
@@ -60,12 +70,16 @@ class DataFetcher:
                 return []
                 
             # Get company name for better search
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = info_cache.get(symbol, fields=('longName',))
             company_name = info.get('longName', symbol)
             
-            url = f"{APISettings.NEWS_API_BASE_URL}?q={company_name}&sortBy=publishedAt&pageSize=10&apiKey={APIConfig.NEWS_API_KEY}&language=en"
-            response = requests.get(url, timeout=APISettings.TIMEOUT_SECONDS)
+            response = http_client.get(APISettings.NEWS_API_BASE_URL, params={
+                'q': company_name,
+                'sortBy': 'publishedAt',
+                'pageSize': 10,
+                'apiKey': APIConfig.NEWS_API_KEY,
+                'language': 'en'
+            })
             
             if response.status_code == 200:
                 data = response.json()
@@ -79,11 +93,9 @@ class DataFetcher:
     def get_stock_data(symbol, period="1y"):
         """Fetch comprehensive stock data from Yahoo Finance"""
         try:
-            ticker = yf.Ticker(symbol)
-            
-            # Get stock info and historical data
-            info = ticker.info
-            hist = ticker.history(period=period)
+            # Get stock info and historical data (both served from local caches)
+            info = info_cache.get(symbol)
+            hist = ohlcv_store.get_history(symbol, period)
             
             if hist.empty:
                 return {"success": False, "error": "No data found"}
@@ -149,27 +161,35 @@ class MetricsCalculator:
         return metrics
 
     @staticmethod
-    def calculate_technical_indicators(historical_data):
-        """Calculate technical analysis indicators"""
+    def calculate_indicator_series(historical_data):
+        """Calculate full indicator series (SMA/EMA/RSI/MACD/Bollinger/volume SMA)"""
+        return IndicatorEngine.compute_frame(historical_data)
+
+    @staticmethod
+    def calculate_universe_indicators(close_matrix, volume_matrix=None):
+        """Calculate indicator matrices for an aligned (dates x symbols) close DataFrame"""
+        return BatchIndicatorCalculator.compute_frames(close_matrix, volume_matrix)
+
+    @staticmethod
+    def calculate_technical_indicators(historical_data, indicator_series=None):
+        """Calculate latest technical analysis indicators"""
         if historical_data.empty:
             return {}
         
-        indicators = {}
+        if indicator_series is None:
+            indicator_series = MetricsCalculator.calculate_indicator_series(historical_data)
         
-        # Simple Moving Averages
-        indicators['sma_20'] = historical_data['Close'].rolling(window=20).mean().iloc[-1]
-        indicators['sma_50'] = historical_data['Close'].rolling(window=50).mean().iloc[-1]
+        # Latest value of every indicator series
+        indicators = indicator_series.iloc[-1].to_dict()
         indicators['current_price'] = historical_data['Close'].iloc[-1]
-        
-        # RSI Calculation
-        delta = historical_data['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        indicators['rsi'] = 100 - (100 / (1 + rs)).iloc[-1]
+        indicators['current_volume'] = historical_data['Volume'].iloc[-1]
         
         # Price performance
         indicators['sma_20_diff'] = ((indicators['current_price'] / indicators['sma_20']) - 1) * 100 if not pd.isna(indicators['sma_20']) else 0
         indicators['sma_50_diff'] = ((indicators['current_price'] / indicators['sma_50']) - 1) * 100 if not pd.isna(indicators['sma_50']) else 0
         
+        # Position within the Bollinger band (0 = lower band, 1 = upper band)
+        band_width = indicators['bb_upper'] - indicators['bb_lower']
+        indicators['bb_position'] = (indicators['current_price'] - indicators['bb_lower']) / band_width if band_width else np.nan
+        
         return indicators
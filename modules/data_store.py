@@ -0,0 +1,153 @@
+# Data Store Module
+# Persistent on-disk OHLCV store with incremental refresh from Yahoo Finance
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+import yfinance as yf
+from .config import CacheConfig
+
+
+class OHLCVStore:
+    """Per-symbol Parquet store that only downloads the bars it is missing"""
+
+    # Lookback windows for the periods we persist (yfinance period strings)
+    PERIOD_OFFSETS = {
+        "1mo": pd.DateOffset(months=1),
+        "3mo": pd.DateOffset(months=3),
+        "6mo": pd.DateOffset(months=6),
+        "1y": pd.DateOffset(years=1),
+        "2y": pd.DateOffset(years=2),
+        "5y": pd.DateOffset(years=5),
+        "10y": pd.DateOffset(years=10),
+    }
+
+    def __init__(self, base_dir=None, refresh_minutes=None):
+        self.base_dir = base_dir or CacheConfig.OHLCV_STORE_DIR
+        if refresh_minutes is None:
+            refresh_minutes = CacheConfig.OHLCV_REFRESH_MINUTES
+        self.refresh_interval = timedelta(minutes=refresh_minutes)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def get_history(self, symbol, period="1y"):
+        """Return bars for the requested period, served from disk where possible"""
+        offset = self.PERIOD_OFFSETS.get(period)
+        if offset is None:
+            # ytd/max/intraday windows are not persisted
+            return yf.Ticker(symbol).history(period=period)
+
+        start_date = (pd.Timestamp.now().normalize() - offset).date()
+
+        with self._lock_for(symbol):
+            bars, meta = self._load(symbol)
+            covered_from = meta.get('covered_from')
+
+            if bars is None or bars.empty or covered_from is None or covered_from > start_date.isoformat():
+                # Stored window is shorter than requested: one full pull covers both ends
+                bars = yf.Ticker(symbol).history(period=period)
+                if bars.empty:
+                    return bars
+                self._save(symbol, bars, start_date.isoformat())
+            elif self._is_stale(meta):
+                bars = self._refresh_tail(symbol, bars, covered_from)
+
+        return bars[bars.index >= pd.Timestamp(start_date, tz=bars.index.tz)]
+
+    def invalidate(self, symbol):
+        """Drop the stored bars for a symbol"""
+        with self._lock_for(symbol):
+            for path in (self._data_path(symbol), self._meta_path(symbol)):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _refresh_tail(self, symbol, bars, covered_from):
+        """Download bars from the last stored session onwards and merge them in"""
+        last_date = bars.index[-1].date()
+        tail = yf.Ticker(symbol).history(start=last_date.isoformat())
+
+        if tail.empty:
+            self._save(symbol, bars, covered_from)
+            return bars
+
+        new_bars = tail[tail.index > bars.index[-1]]
+        has_actions = any(
+            column in new_bars and (new_bars[column] != 0).any()
+            for column in ('Dividends', 'Stock Splits')
+        )
+        if has_actions:
+            # A dividend or split re-adjusts every earlier price, so re-pull the stored window
+            bars = yf.Ticker(symbol).history(start=covered_from)
+        else:
+            # The last stored bar may have been an intraday snapshot; the tail replaces it
+            bars = pd.concat([bars[bars.index < tail.index[0]], tail])
+
+        self._save(symbol, bars, covered_from)
+        return bars
+
+    def _is_stale(self, meta):
+        """Check whether the provider should be asked for new bars"""
+        fetched_at = meta.get('fetched_at')
+        if not fetched_at:
+            return True
+        return datetime.now() - datetime.fromisoformat(fetched_at) > self.refresh_interval
+
+    def _load(self, symbol):
+        """Load stored bars and metadata; a missing or corrupt entry loads as empty"""
+        data_path = self._data_path(symbol)
+        meta_path = self._meta_path(symbol)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None, {}
+
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            return pd.read_parquet(data_path), meta
+        except Exception as e:
+            print(f"OHLCV store read failed for {symbol}: {e}")
+            return None, {}
+
+    def _save(self, symbol, bars, covered_from):
+        """Atomically write bars and metadata for a symbol"""
+        meta = {
+            'symbol': symbol,
+            'covered_from': covered_from,
+            'fetched_at': datetime.now().isoformat(),
+            'rows': len(bars)
+        }
+
+        try:
+            os.makedirs(self.base_dir, exist_ok=True)
+            data_path = self._data_path(symbol)
+            meta_path = self._meta_path(symbol)
+
+            bars.to_parquet(data_path + '.tmp')
+            os.replace(data_path + '.tmp', data_path)
+            with open(meta_path + '.tmp', 'w') as f:
+                json.dump(meta, f)
+            os.replace(meta_path + '.tmp', meta_path)
+        except Exception as e:
+            # The store is an optimisation; a failed write must not fail the fetch
+            print(f"OHLCV store write failed for {symbol}: {e}")
+
+    def _lock_for(self, symbol):
+        """Per-symbol lock so concurrent reruns do not download the same tail twice"""
+        with self._locks_guard:
+            return self._locks.setdefault(symbol.upper(), threading.Lock())
+
+    def _data_path(self, symbol):
+        return os.path.join(self.base_dir, f"{self._file_stem(symbol)}.parquet")
+
+    def _meta_path(self, symbol):
+        return os.path.join(self.base_dir, f"{self._file_stem(symbol)}.json")
+
+    @staticmethod
+    def _file_stem(symbol):
+        return symbol.upper().replace('/', '_').replace('\\', '_')
+
+
+# Process-wide store shared by every DataFetcher call
+ohlcv_store = OHLCVStore()
@@ -1,11 +1,13 @@
 # Display Components Module
 # Handles all display logic and UI components
 
+import time
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 from .config import UIConfig
 from .visualizations import UIComponents
+from . import app_cache
 
 
 class DisplayManager:
@@ -138,6 +140,36 @@ class DisplayManager:
             st.metric("RSI (14)", f"{rsi:.1f}" if not pd.isna(rsi) else "N/A", 
                      "Overbought" if rsi > 70 else ("Oversold" if rsi < 30 else "Neutral"), 
                      delta_color=rsi_color)
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            ema_12 = technical_indicators.get('ema_12', float('nan'))
+            ema_26 = technical_indicators.get('ema_26', float('nan'))
+            st.metric("EMA 12 / 26", f"${ema_12:.2f} / ${ema_26:.2f}" if not pd.isna(ema_26) else "N/A")
+            
+        with col2:
+            macd = technical_indicators.get('macd', float('nan'))
+            macd_hist = technical_indicators.get('macd_histogram', float('nan'))
+            delta_color = "normal" if not pd.isna(macd_hist) and macd_hist >= 0 else "inverse"
+            st.metric("MACD (12, 26, 9)", f"{macd:.2f}" if not pd.isna(macd) else "N/A",
+                     f"{macd_hist:+.2f} hist" if not pd.isna(macd_hist) else None, delta_color=delta_color)
+            
+        with col3:
+            bb_upper = technical_indicators.get('bb_upper', float('nan'))
+            bb_lower = technical_indicators.get('bb_lower', float('nan'))
+            bb_position = technical_indicators.get('bb_position', float('nan'))
+            st.metric("Bollinger (20, 2)", f"${bb_lower:.2f} - ${bb_upper:.2f}" if not pd.isna(bb_upper) else "N/A",
+                     f"{bb_position:.0%} of band" if not pd.isna(bb_position) else None, delta_color="off")
+            
+        with col4:
+            volume = technical_indicators.get('current_volume', 0)
+            volume_sma = technical_indicators.get('volume_sma', float('nan'))
+            if not pd.isna(volume_sma) and volume_sma:
+                st.metric("Volume vs 20-Day Avg", f"{volume/1e6:.1f}M",
+                         f"{(volume / volume_sma - 1) * 100:+.1f}%", delta_color="off")
+            else:
+                st.metric("Volume vs 20-Day Avg", "N/A")
 
     @staticmethod
     def display_company_profile(info, av_data=None):
@@ -238,6 +270,29 @@ class DisplayManager:
             else:
                 st.metric("NewsAPI", "Inactive", "API Key Required")
 
+    @staticmethod
+    def display_pipeline_timings(stage_timings, enrichment_elapsed):
+        """Display per-stage timing breakdown for the last analysis run"""
+        labels = {
+            'stock_data': 'Stock Data (Yahoo Finance)',
+            'risk_free_rate': 'Risk-Free Rate (FRED)',
+            'alpha_vantage': 'Fundamentals (Alpha Vantage)',
+            'news': 'Company News (NewsAPI)',
+            'metrics': 'Metrics & Indicators',
+            'ai_init': 'AI Model Setup'
+        }
+        
+        with st.expander(f"Pipeline Timing - enrichment {enrichment_elapsed:.2f}s (concurrent)"):
+            rows = [
+                {
+                    'Stage': labels.get(name, name),
+                    'Status': stage['status'].upper(),
+                    'Seconds': round(stage['seconds'], 3)
+                }
+                for name, stage in stage_timings.items()
+            ]
+            st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
     @staticmethod
     def display_ai_analysis(ai_analyzer, symbol, enhanced_metrics, news_articles):
         """Display AI analysis with improved state management"""
@@ -259,7 +314,7 @@ class DisplayManager:
                     
                     if headlines:
                         try:
-                            sentiment = ai_analyzer.get_quick_sentiment(symbol, headlines)
+                            sentiment = app_cache.get_quick_sentiment(ai_analyzer, symbol, headlines)
                             st.markdown("**News Sentiment:**")
                             st.info(sentiment)
                         except:
@@ -290,17 +345,22 @@ class DisplayManager:
                     st.info("Click below to generate professional AI investment analysis")
                     
                     if st.button("🧠 Generate Professional Analysis", key=f"generate_ai_{symbol}", type="primary"):
-                        with st.spinner(f"Generating analysis using {model_status['current_model']}..."):
-                            try:
-                                analysis = ai_analyzer.create_enhanced_ai_analysis(symbol, enhanced_metrics, news_articles)
-                                st.session_state[analysis_key] = {
-                                    'analysis': analysis,
-                                    'news_articles': news_articles,
-                                    'symbol': symbol
-                                }
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"❌ Analysis failed: {str(e)}")
+                        st.caption(f"Generating analysis using {model_status['current_model']}...")
+                        placeholder = st.empty()
+                        try:
+                            # Render tokens as they arrive instead of waiting for the full memo
+                            analysis = DisplayManager._render_stream(
+                                placeholder,
+                                ai_analyzer.stream_enhanced_ai_analysis(symbol, enhanced_metrics, news_articles)
+                            )
+                            st.session_state[analysis_key] = {
+                                'analysis': analysis,
+                                'news_articles': news_articles,
+                                'symbol': symbol
+                            }
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"❌ Analysis failed: {str(e)}")
                 else:
                     # Display existing analysis
                     result = st.session_state[analysis_key]
@@ -351,6 +411,21 @@ class DisplayManager:
                     st.error("**Connection failed**")
                     st.info("💡 Check your internet connection and API key")
     
+    @staticmethod
+    def _render_stream(placeholder, chunks, min_interval=0.05):
+        """Progressively render streamed markdown into a placeholder; returns the full text"""
+        text = ""
+        last_render = 0.0
+        for chunk in chunks:
+            text += chunk
+            # Throttle re-renders so long memos do not flood the frontend with deltas
+            now = time.monotonic()
+            if now - last_render >= min_interval:
+                placeholder.markdown(text + "▌")
+                last_render = now
+        placeholder.markdown(text)
+        return text
+    
     @staticmethod
     def _show_analysis_result(analysis, news_articles, symbol):
         """Helper method to display analysis results"""
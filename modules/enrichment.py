@@ -0,0 +1,88 @@
+# Enrichment Pipeline Module
+# Runs the independent enrichment fetches concurrently under one deadline
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .config import APISettings
+from .data_fetcher import DataFetcher
+
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:
+    add_script_run_ctx = None
+    get_script_run_ctx = None
+
+
+class EnrichmentPipeline:
+    """Concurrent enrichment stage with an overall deadline and per-source timings"""
+
+    def __init__(self, deadline_seconds=None, max_workers=None):
+        self.deadline_seconds = deadline_seconds or APISettings.ENRICHMENT_DEADLINE_SECONDS
+        self.max_workers = max_workers
+
+    @staticmethod
+    def default_sources(symbol):
+        """Enrichment sources for a symbol as name -> (callable, fallback value)"""
+        return {
+            'risk_free_rate': (DataFetcher.fetch_risk_free_rate, APISettings.DEFAULT_RISK_FREE_RATE),
+            'alpha_vantage': (lambda: DataFetcher.fetch_alpha_vantage_fundamentals(symbol), None),
+            'news': (lambda: DataFetcher.fetch_company_news(symbol), []),
+        }
+
+    def run(self, sources):
+        """
+        Run every source concurrently and return what finished before the deadline.
+
+        Sources still running (or failed) at the deadline contribute their
+        fallback value, so callers always get a complete result dict.
+        """
+        started = time.perf_counter()
+        ctx = get_script_run_ctx() if get_script_run_ctx else None
+        timings = {}
+
+        def timed(name, func):
+            # Attach the Streamlit context so warnings raised in workers still render
+            if ctx is not None:
+                add_script_run_ctx(threading.current_thread(), ctx)
+            t0 = time.perf_counter()
+            try:
+                return func()
+            finally:
+                timings[name] = time.perf_counter() - t0
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_workers or len(sources) or 1,
+            thread_name_prefix='enrichment'
+        )
+        try:
+            futures = {
+                name: executor.submit(timed, name, func)
+                for name, (func, _) in sources.items()
+            }
+            wait(futures.values(), timeout=self.deadline_seconds)
+        finally:
+            # Do not block on stragglers; their results are discarded
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        results = {}
+        stages = {}
+        for name, future in futures.items():
+            fallback = sources[name][1]
+            if not future.done():
+                results[name] = fallback
+                stages[name] = {'status': 'timeout', 'seconds': self.deadline_seconds}
+            elif future.exception() is not None:
+                results[name] = fallback
+                stages[name] = {'status': 'error', 'seconds': timings.get(name, 0.0),
+                                'error': str(future.exception())}
+            else:
+                results[name] = future.result()
+                stages[name] = {'status': 'ok', 'seconds': timings.get(name, 0.0)}
+
+        return {
+            'results': results,
+            'stages': stages,
+            'elapsed': time.perf_counter() - started
+        }
@@ -0,0 +1,127 @@
+# HTTP Client Module
+# Pooled keep-alive sessions with jittered retry for the REST data providers
+
+import asyncio
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from .config import APISettings, HTTPConfig
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class HTTPClientPool:
+    """Shared HTTP clients for FRED, Alpha Vantage and NewsAPI with pooling and retry"""
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, max_retries=None,
+                 backoff_base=None, backoff_max=None, timeout=None):
+        self.pool_connections = pool_connections or HTTPConfig.POOL_CONNECTIONS
+        self.pool_maxsize = pool_maxsize or HTTPConfig.POOL_MAXSIZE
+        self.max_retries = HTTPConfig.MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base or HTTPConfig.BACKOFF_BASE_SECONDS
+        self.backoff_max = backoff_max or HTTPConfig.BACKOFF_MAX_SECONDS
+        self.timeout = timeout or APISettings.TIMEOUT_SECONDS
+
+        self._session = None
+        self._async_client = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """Lazily created requests.Session with a sized keep-alive pool"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    # Retries are handled here so backoff can be jittered and honour Retry-After
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                        max_retries=0
+                    )
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.headers.update({'User-Agent': HTTPConfig.USER_AGENT})
+                    self._session = session
+        return self._session
+
+    @property
+    def async_client(self):
+        """Lazily created httpx.AsyncClient for use inside the FastAPI event loop"""
+        if httpx is None:
+            raise RuntimeError("httpx is not installed; async HTTP requests are unavailable")
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.pool_maxsize,
+                    max_keepalive_connections=self.pool_maxsize
+                ),
+                headers={'User-Agent': HTTPConfig.USER_AGENT},
+                timeout=self.timeout
+            )
+        return self._async_client
+
+    def get(self, url, params=None, timeout=None):
+        """GET with retry on connection errors, timeouts and retryable status codes"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.get(url, params=params, timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if response.status_code in HTTPConfig.RETRY_STATUS_CODES and attempt < self.max_retries:
+                time.sleep(self._backoff(attempt, response.headers.get('Retry-After')))
+                continue
+            return response
+
+    async def aget(self, url, params=None, timeout=None):
+        """Async GET with the same retry policy as get()"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.async_client.get(url, params=params, timeout=timeout or self.timeout)
+            except (httpx.TransportError, httpx.TimeoutException):
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            if response.status_code in HTTPConfig.RETRY_STATUS_CODES and attempt < self.max_retries:
+                await asyncio.sleep(self._backoff(attempt, response.headers.get('Retry-After')))
+                continue
+            return response
+
+    def close(self):
+        """Close the pooled sync session"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    async def aclose(self):
+        """Close both the async client and the sync session"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self.close()
+
+    def _backoff(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, deferring to a numeric Retry-After header"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+# Process-wide client pool shared by all provider calls
+http_client = HTTPClientPool()
@@ -0,0 +1,201 @@
+# Technical Indicators Module
+# Vectorized O(n) indicator engine over NumPy close/volume arrays
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+class IndicatorEngine:
+    """Computes the full technical indicator set in one pass over close/volume arrays"""
+
+    SMA_WINDOWS = (20, 50, 200)
+    EMA_SPANS = (12, 26)
+    MACD_SIGNAL_SPAN = 9
+    RSI_PERIOD = 14
+    BOLLINGER_WINDOW = 20
+    BOLLINGER_STDS = 2.0
+    VOLUME_SMA_WINDOW = 20
+
+    # Column order of the indicator frame (matches the TechnicalIndicator model fields)
+    COLUMNS = [
+        'sma_20', 'sma_50', 'sma_200', 'ema_12', 'ema_26',
+        'rsi', 'macd', 'macd_signal', 'macd_histogram',
+        'bb_upper', 'bb_middle', 'bb_lower', 'volume_sma'
+    ]
+
+    @staticmethod
+    def rolling_mean(values, window):
+        """
+        Trailing mean from cumulative-sum differences along axis 0.
+
+        Works on 1-D series and 2-D (dates x symbols) matrices. NaNs are
+        skipped in the sums and any window containing one is NaN, so leading
+        NaNs from shorter histories stay NaN until that column's window fills.
+        """
+        values = np.asarray(values, dtype=float)
+        out = np.full(values.shape, np.nan)
+        if len(values) < window:
+            return out
+
+        valid = ~np.isnan(values)
+        padding = np.zeros((1,) + values.shape[1:])
+        csum = np.concatenate([padding, np.cumsum(np.where(valid, values, 0.0), axis=0)])
+        count = np.concatenate([padding, np.cumsum(valid, axis=0)])
+
+        window_sum = csum[window:] - csum[:-window]
+        window_count = count[window:] - count[:-window]
+        out[window - 1:] = np.where(window_count == window, window_sum / window, np.nan)
+        return out
+
+    @staticmethod
+    def rolling_std(values, window, ddof=1):
+        """Trailing standard deviation from running sums of x and x^2"""
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return values.copy()
+
+        # Centre each column first so the sum-of-squares difference keeps its precision
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            centre = np.nanmean(values, axis=0)
+        centred = values - np.nan_to_num(centre)
+        mean = IndicatorEngine.rolling_mean(centred, window)
+        mean_sq = IndicatorEngine.rolling_mean(centred ** 2, window)
+        variance = (mean_sq - mean ** 2) * window / (window - ddof)
+        return np.sqrt(np.clip(variance, 0, None))
+
+    @staticmethod
+    def ema(values, span):
+        """
+        Exponential moving average, seeded with the first value (pandas adjust=False).
+
+        Along axis 0; each column is seeded at its first non-NaN value and
+        NaN gaps carry the previous average forward.
+        """
+        values = np.asarray(values, dtype=float)
+        out = np.empty(values.shape)
+        if len(values) == 0:
+            return out
+
+        alpha = 2.0 / (span + 1)
+        out[0] = values[0]
+        if values.ndim == 1 and not np.isnan(values).any():
+            for i in range(1, len(values)):
+                out[i] = out[i - 1] + alpha * (values[i] - out[i - 1])
+            return out
+
+        for i in range(1, len(values)):
+            prev, current = out[i - 1], values[i]
+            step = prev + alpha * (current - prev)
+            out[i] = np.where(np.isnan(prev), current, np.where(np.isnan(current), prev, step))
+        return out
+
+    @staticmethod
+    def rolling_volatility(close, window=20, periods_per_year=252):
+        """Annualised trailing standard deviation of simple returns"""
+        close = np.asarray(close, dtype=float)
+        out = np.full(close.shape, np.nan)
+        if len(close) <= window:
+            return out
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = close[1:] / close[:-1] - 1
+        out[1:] = IndicatorEngine.rolling_std(returns, window) * np.sqrt(periods_per_year)
+        return out
+
+    @staticmethod
+    def rsi(close, period=14):
+        """RSI from trailing mean gain/loss over `period` closes"""
+        close = np.asarray(close, dtype=float)
+        out = np.full(close.shape, np.nan)
+        if len(close) <= period:
+            return out
+
+        delta = np.diff(close, axis=0)
+        avg_gain = IndicatorEngine.rolling_mean(np.clip(delta, 0, None), period)
+        avg_loss = IndicatorEngine.rolling_mean(np.clip(-delta, 0, None), period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+        # No losses in the window means maximum strength
+        rsi = np.where((avg_loss == 0) & ~np.isnan(avg_gain), 100.0, rsi)
+        out[1:] = rsi
+        return out
+
+    @classmethod
+    def compute(cls, close, volume=None):
+        """Compute every indicator as a full-length array keyed by column name"""
+        close = np.asarray(close, dtype=float)
+        result = {}
+
+        for window in cls.SMA_WINDOWS:
+            result[f'sma_{window}'] = cls.rolling_mean(close, window)
+        for span in cls.EMA_SPANS:
+            result[f'ema_{span}'] = cls.ema(close, span)
+
+        result['rsi'] = cls.rsi(close, cls.RSI_PERIOD)
+
+        macd = result['ema_12'] - result['ema_26']
+        result['macd'] = macd
+        result['macd_signal'] = cls.ema(macd, cls.MACD_SIGNAL_SPAN)
+        result['macd_histogram'] = macd - result['macd_signal']
+
+        middle = cls.rolling_mean(close, cls.BOLLINGER_WINDOW)
+        band = cls.BOLLINGER_STDS * cls.rolling_std(close, cls.BOLLINGER_WINDOW)
+        result['bb_upper'] = middle + band
+        result['bb_middle'] = middle
+        result['bb_lower'] = middle - band
+
+        if volume is not None:
+            result['volume_sma'] = cls.rolling_mean(volume, cls.VOLUME_SMA_WINDOW)
+        else:
+            result['volume_sma'] = np.full(close.shape, np.nan)
+
+        return result
+
+    @classmethod
+    def compute_frame(cls, historical_data):
+        """Compute the indicator set for an OHLCV DataFrame, indexed like the input"""
+        if historical_data.empty:
+            return pd.DataFrame(columns=cls.COLUMNS)
+
+        volume = historical_data['Volume'].to_numpy() if 'Volume' in historical_data else None
+        result = cls.compute(historical_data['Close'].to_numpy(), volume)
+        return pd.DataFrame(result, index=historical_data.index, columns=cls.COLUMNS)
+
+
+class BatchIndicatorCalculator:
+    """Indicator matrices for a whole symbol universe in one vectorized call"""
+
+    VOLATILITY_WINDOW = 20
+
+    @classmethod
+    def compute(cls, close, volume=None):
+        """
+        Compute indicators for an aligned (dates x symbols) close matrix.
+
+        Returns name -> matrix of the same shape. Symbols with shorter
+        histories should be NaN-padded at the start; their indicators stay
+        NaN until each column has enough bars of its own.
+        """
+        close = np.asarray(close, dtype=float)
+        if close.ndim != 2:
+            raise ValueError(f"Expected a 2-D (dates x symbols) matrix, got shape {close.shape}")
+
+        result = IndicatorEngine.compute(close, volume)
+        result['volatility'] = IndicatorEngine.rolling_volatility(close, cls.VOLATILITY_WINDOW)
+        return result
+
+    @classmethod
+    def compute_frames(cls, close_frame, volume_frame=None):
+        """Compute indicators for a close DataFrame (index = dates, columns = symbols)"""
+        volume = None
+        if volume_frame is not None:
+            volume = volume_frame.reindex(index=close_frame.index, columns=close_frame.columns).to_numpy(dtype=float)
+
+        result = cls.compute(close_frame.to_numpy(dtype=float), volume)
+        return {
+            name: pd.DataFrame(matrix, index=close_frame.index, columns=close_frame.columns)
+            for name, matrix in result.items()
+        }
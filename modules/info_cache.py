@@ -0,0 +1,127 @@
+# Ticker Info Cache Module
+# Process-wide TTL + LRU cache for yfinance ticker.info lookups
+
+import threading
+import time
+from collections import OrderedDict
+
+import yfinance as yf
+from .config import CacheConfig
+
+
+class _InFlight:
+    """A pending info fetch that concurrent callers wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class TickerInfoCache:
+    """Shared ticker.info cache with per-field TTLs, LRU eviction and single-flight misses"""
+
+    def __init__(self, max_entries=None, default_ttl=None, field_ttls=None, fetcher=None):
+        self.max_entries = max_entries or CacheConfig.INFO_CACHE_MAX_SYMBOLS
+        self.default_ttl = default_ttl or CacheConfig.INFO_TTL_SECONDS
+        if field_ttls is None:
+            field_ttls = {field: CacheConfig.INFO_QUOTE_TTL_SECONDS for field in CacheConfig.INFO_QUOTE_FIELDS}
+        self.field_ttls = field_ttls
+        self._fetcher = fetcher or (lambda symbol: yf.Ticker(symbol).info)
+
+        self._entries = OrderedDict()  # symbol -> (fetched_at, info)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, symbol, fields=None):
+        """
+        Return ticker.info for a symbol.
+
+        `fields` names the keys the caller reads; the entry is reused while the
+        shortest TTL among them has not expired. Without `fields` every field
+        must be fresh. The returned dict is shared and must not be mutated.
+        """
+        key = symbol.upper()
+        ttl = self._ttl_for(fields)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            flight = self._in_flight.get(key)
+            if flight is None:
+                self.misses += 1
+                flight = self._in_flight[key] = _InFlight()
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            info = self._fetcher(key)
+            flight.result = info
+            if info:
+                self._store(key, info)
+            return info
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight.event.set()
+
+    def invalidate(self, symbol=None):
+        """Drop one symbol, or everything when no symbol is given"""
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(symbol.upper(), None)
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0
+            }
+
+    def _store(self, key, info):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), info)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _ttl_for(self, fields):
+        if fields is None:
+            return min([self.default_ttl, *self.field_ttls.values()])
+        if isinstance(fields, str):
+            fields = (fields,)
+        return min([self.field_ttls.get(field, self.default_ttl) for field in fields] or [self.default_ttl])
+
+
+# Process-wide cache shared by DataFetcher, the news path and the API providers
+info_cache = TickerInfoCache()
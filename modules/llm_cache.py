@@ -0,0 +1,172 @@
+# LLM Response Cache Module
+# Content-addressed on-disk cache of completions keyed on model, prompts and sampling settings
+
+import hashlib
+import json
+import numbers
+import os
+import re
+import threading
+import time
+
+from .config import CacheConfig, LLMConfig
+
+
+class LLMResponseCache:
+    """
+    Completion cache shared by every Streamlit session on the host.
+
+    Responses are stored under sha256(model, system prompt, normalized user
+    prompt, sampling settings). Per-symbol metric snapshots keep the prompt
+    stable: while the live metrics stay within the materiality threshold of
+    the stored snapshot the prompt is built from the snapshot, so it hashes
+    to the same key; a material move replaces the snapshot and, with it, the key.
+    """
+
+    def __init__(self, base_dir=None, ttl_seconds=None, material_change=None):
+        self.base_dir = base_dir or CacheConfig.LLM_CACHE_DIR
+        self.ttl_seconds = ttl_seconds or LLMConfig.RESPONSE_CACHE_TTL_SECONDS
+        self.material_change = material_change or LLMConfig.RESPONSE_CACHE_MATERIAL_CHANGE
+        self._lock = threading.Lock()
+        self._puts = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model, system_prompt, user_prompt, **sampling):
+        """Hash of everything that determines the completion"""
+        payload = {
+            'model': model,
+            'system': LLMResponseCache._normalize(system_prompt),
+            'user': LLMResponseCache._normalize(user_prompt),
+            'sampling': sampling
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Cached entry dict ({'response', 'model', 'usage', 'created_at'}) or None"""
+        entry = self._read(self._response_path(key))
+        if entry is None or time.time() - entry.get('created_at', 0) >= self.ttl_seconds:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key, response, model, usage=None, symbol=None):
+        """Store a completion; error responses should not be passed in"""
+        entry = {
+            'response': response,
+            'model': model,
+            'usage': usage,
+            'symbol': symbol,
+            'created_at': time.time()
+        }
+        self._write(self._response_path(key), entry)
+
+        with self._lock:
+            self._puts += 1
+            prune = self._puts % 50 == 0
+        if prune:
+            self.prune()
+
+    def snapshot_for(self, symbol, metrics):
+        """
+        Return the metrics snapshot the prompt for `symbol` should be built from.
+
+        The stored snapshot is reused while every numeric field is within the
+        materiality threshold; otherwise `metrics` becomes the new snapshot.
+        """
+        path = self._snapshot_path(symbol)
+        with self._lock:
+            stored = self._read(path)
+            if (stored is not None
+                    and time.time() - stored.get('created_at', 0) < self.ttl_seconds
+                    and not self._changed_materially(stored['metrics'], metrics)):
+                return stored['metrics']
+
+            # Keep JSON-serializable scalars; NumPy numbers become plain floats
+            snapshot = {
+                k: float(v) if self._is_number(v) else v
+                for k, v in metrics.items()
+                if self._is_number(v) or isinstance(v, str) or v is None
+            }
+            self._write(path, {'metrics': snapshot, 'created_at': time.time()})
+            return snapshot
+
+    def invalidate(self, symbol):
+        """Drop the snapshot for a symbol so the next prompt uses live metrics"""
+        try:
+            os.remove(self._snapshot_path(symbol))
+        except FileNotFoundError:
+            pass
+
+    def prune(self):
+        """Delete expired response files"""
+        directory = os.path.join(self.base_dir, 'responses')
+        if not os.path.isdir(directory):
+            return 0
+
+        removed = 0
+        cutoff = time.time() - self.ttl_seconds
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def _changed_materially(self, old, new):
+        for field, value in new.items():
+            if not self._is_number(value):
+                continue
+            previous = old.get(field)
+            if not self._is_number(previous):
+                return True
+            diff = abs(value - previous)
+            # Relative threshold, with an absolute floor so near-zero ratios do not flap
+            if diff > self.material_change * max(abs(value), abs(previous)) and diff > 0.005:
+                return True
+        return False
+
+    @staticmethod
+    def _is_number(value):
+        return isinstance(value, numbers.Real) and not isinstance(value, bool) and value == value
+
+    @staticmethod
+    def _normalize(text):
+        """Collapse indentation and runs of whitespace so formatting-only changes share a key"""
+        return re.sub(r'\s+', ' ', text or '').strip()
+
+    def _response_path(self, key):
+        return os.path.join(self.base_dir, 'responses', f"{key}.json")
+
+    def _snapshot_path(self, symbol):
+        return os.path.join(self.base_dir, 'snapshots', f"{symbol.upper()}.json")
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @staticmethod
+    def _write(path, payload):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+
+# Process-wide response cache
+llm_response_cache = LLMResponseCache()
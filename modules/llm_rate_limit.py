@@ -0,0 +1,244 @@
+# LLM Rate Limit Module
+# Cross-process token buckets (requests and tokens per minute) for Groq admission control
+
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+
+from .config import CacheConfig, LLMConfig
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: buckets are shared between threads of one process only
+    fcntl = None
+
+
+class RateLimitTimeout(Exception):
+    """Admission was not granted within the caller's wait limit"""
+
+
+# Refill, check and debit a set of buckets atomically. Modes: 'take' debits only if every
+# bucket has room, 'force' always debits, 'drain' lowers each level to at most -cost.
+# KEYS: bucket keys. ARGV: mode, then capacity, refill rate and cost for each key.
+_TAKE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local mode = ARGV[1]
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local base = 2 + (i - 1) * 3
+    local capacity = tonumber(ARGV[base])
+    local rate = tonumber(ARGV[base + 1])
+    local cost = tonumber(ARGV[base + 2])
+    local state = redis.call('HMGET', key, 'level', 'ts')
+    local level = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    level = math.min(capacity, level + math.max(0, now - ts) * rate)
+    levels[i] = level
+    if mode == 'take' and level < cost then
+        wait = math.max(wait, (cost - level) / rate)
+    end
+end
+for i, key in ipairs(KEYS) do
+    local cost = tonumber(ARGV[2 + (i - 1) * 3 + 2])
+    local level = levels[i]
+    if mode == 'drain' then
+        level = math.min(level, -cost)
+    elseif wait == 0 then
+        level = level - cost
+    end
+    redis.call('HSET', key, 'level', tostring(level), 'ts', tostring(now))
+    redis.call('EXPIRE', key, 600)
+end
+return tostring(wait)
+"""
+
+
+def _refill_and_take(state, buckets, mode):
+    """Pure-Python equivalent of _TAKE_SCRIPT over a {key: [level, ts]} dict"""
+    now = time.time()
+    wait = 0.0
+    levels = {}
+    for key, capacity, rate, cost in buckets:
+        level, ts = state.get(key, (capacity, now))
+        level = min(capacity, level + max(0.0, now - ts) * rate)
+        levels[key] = level
+        if mode == 'take' and level < cost:
+            wait = max(wait, (cost - level) / rate)
+
+    for key, capacity, rate, cost in buckets:
+        level = levels[key]
+        if mode == 'drain':
+            level = min(level, -cost)
+        elif wait == 0:
+            level -= cost
+        state[key] = [level, now]
+    return wait
+
+
+class _RedisBuckets:
+    """Buckets in Redis, shared by every process and host using the same server"""
+
+    def __init__(self, url):
+        self.client = redis.Redis.from_url(url, socket_timeout=2)
+        self.client.ping()
+        self._script = self.client.register_script(_TAKE_SCRIPT)
+
+    def take(self, buckets, mode='take'):
+        keys = [key for key, _, _, _ in buckets]
+        args = [mode]
+        for _, capacity, rate, cost in buckets:
+            args.extend([capacity, rate, cost])
+        return float(self._script(keys=keys, args=args))
+
+
+class _FileBuckets:
+    """Buckets in a JSON file guarded by an exclusive lock, shared by processes on one host"""
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def take(self, buckets, mode='take'):
+        with self._thread_lock, open(self.path + '.lock', 'a+') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        state = json.load(f)
+                except (FileNotFoundError, ValueError):
+                    state = {}
+
+                wait = _refill_and_take(state, buckets, mode)
+
+                tmp_path = self.path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, self.path)
+                return wait
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class LLMRateLimiter:
+    """
+    Per-model request and token budgets enforced before a call is sent.
+
+    Each model has two token buckets sized to its per-minute quota (RPM and
+    TPM) that refill continuously. A call reserves one request plus its
+    estimated tokens (prompt estimate + a typical completion, not the full
+    max_tokens, which would leave room for one call per minute on a small
+    bucket) and waits in the caller until both buckets have room;
+    reconcile() settles the estimate against the reported usage. Buckets
+    live in Redis when REDIS_URL is reachable, otherwise in a lock-protected
+    file under the local cache directory.
+    """
+
+    def __init__(self, limits=None, default_limit=None, redis_url=None, state_path=None, max_wait=None):
+        self.limits = limits or LLMConfig.RATE_LIMITS
+        self.default_limit = default_limit or LLMConfig.DEFAULT_RATE_LIMIT
+        self.redis_url = LLMConfig.REDIS_URL if redis_url is None else redis_url
+        self.state_path = state_path or os.path.join(CacheConfig.LLM_CACHE_DIR, 'rate_limits.json')
+        self.max_wait = LLMConfig.RATE_LIMIT_MAX_WAIT_SECONDS if max_wait is None else max_wait
+
+        self._backend = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        """Redis buckets if configured and reachable, else the local file buckets"""
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = self._create_backend()
+        return self._backend
+
+    @staticmethod
+    def estimate_tokens(messages, max_tokens=0):
+        """Token reservation for a chat request: prompt estimate plus an expected completion"""
+        chars = sum(len(message.get('content') or '') for message in messages)
+        return math.ceil(chars / 3.5) + min(max_tokens or 0, LLMConfig.RATE_LIMIT_COMPLETION_TOKENS)
+
+    def _admissible(self, model, tokens):
+        # A reservation larger than the bucket could never be granted
+        return min(tokens, self.limits.get(model, self.default_limit)[1])
+
+    def try_acquire(self, model, tokens):
+        """Reserve one request and `tokens` for `model`; returns seconds to wait if refused"""
+        return self.backend.take(self._buckets(model, 1, self._admissible(model, tokens)))
+
+    def acquire(self, model, tokens, max_wait=None):
+        """Block until the model's budgets admit the call; returns seconds waited"""
+        max_wait = self.max_wait if max_wait is None else max_wait
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(model, tokens)
+            if delay <= 0:
+                return waited
+            if waited + delay > max_wait:
+                raise RateLimitTimeout(f"rate_limit admission for {model} not granted within {max_wait:g}s")
+            time.sleep(delay)
+            waited += delay
+
+    async def aacquire(self, model, tokens, max_wait=None):
+        """acquire() for event-loop callers; waits without blocking the loop"""
+        max_wait = self.max_wait if max_wait is None else max_wait
+        waited = 0.0
+        while True:
+            delay = await asyncio.to_thread(self.try_acquire, model, tokens)
+            if delay <= 0:
+                return waited
+            if waited + delay > max_wait:
+                raise RateLimitTimeout(f"rate_limit admission for {model} not granted within {max_wait:g}s")
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def reconcile(self, model, reserved_tokens, used_tokens):
+        """Refund (or charge) the difference between the reservation and actual usage"""
+        if used_tokens is None:
+            return
+        reserved_tokens = self._admissible(model, reserved_tokens)
+        self.backend.take(self._buckets(model, 0, used_tokens - reserved_tokens), mode='force')
+
+    def penalize(self, model, retry_after=None):
+        """
+        After a 429 despite admission, empty the model's buckets for everyone.
+
+        The provider's budget is evidently lower than ours (or shared with
+        callers we do not see), so all processes hold off for `retry_after`.
+        """
+        rpm, tpm = self.limits.get(model, self.default_limit)
+        cooldown = retry_after or LLMConfig.RATE_LIMIT_COOLDOWN_SECONDS
+        # A level of -rate * cooldown refills to zero exactly when the cooldown ends
+        self.backend.take(self._buckets(model, rpm / 60.0 * cooldown, tpm / 60.0 * cooldown), mode='drain')
+
+    def _buckets(self, model, requests, tokens):
+        rpm, tpm = self.limits.get(model, self.default_limit)
+        return [
+            (f"llm:ratelimit:{model}:rpm", rpm, rpm / 60.0, requests),
+            (f"llm:ratelimit:{model}:tpm", tpm, tpm / 60.0, tokens),
+        ]
+
+    def _create_backend(self):
+        if self.redis_url and redis is not None:
+            try:
+                return _RedisBuckets(self.redis_url)
+            except Exception as e:
+                print(f"Redis rate limiter unavailable ({str(e)[:60]}), using local file buckets")
+        return _FileBuckets(self.state_path)
+
+
+# Process-wide limiter shared by every Groq caller
+llm_rate_limiter = LLMRateLimiter()
@@ -0,0 +1,143 @@
+# Model Registry Module
+# Process-wide Groq client and model availability tracked from observed failures
+
+import threading
+import time
+
+from groq import Groq
+from .config import APIConfig, LLMConfig
+
+
+class ModelRegistry:
+    """
+    Shared Groq client plus a ranked model list with cached availability.
+
+    Nothing is probed at construction. The first model that is neither missing
+    from the last background model listing nor serving a demotion is used;
+    completion failures demote models (long for decommissioned, short for
+    rate limits) and successes clear them.
+    """
+
+    def __init__(self, models=None, api_key=None, refresh_seconds=None, client_factory=None):
+        self.models = list(models or LLMConfig.PRIMARY_MODELS)
+        self.api_key = api_key if api_key is not None else APIConfig.GROQ_API_KEY
+        self.refresh_seconds = refresh_seconds or LLMConfig.MODEL_REFRESH_SECONDS
+        self._client_factory = client_factory or (lambda key: Groq(api_key=key))
+
+        self._client = None
+        self._client_failed = False
+        self._listed = None  # Model ids from the last successful listing; None = not yet known
+        self._listed_at = None
+        self._refreshing = False
+        self._demoted = {}  # model -> (until, reason)
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """Lazily created Groq client, or None without an API key"""
+        if self._client is None and not self._client_failed and self.api_key:
+            with self._lock:
+                if self._client is None and not self._client_failed:
+                    try:
+                        self._client = self._client_factory(self.api_key)
+                    except Exception as e:
+                        self._client_failed = True
+                        print(f"Groq client initialization failed: {e}")
+        return self._client
+
+    def current_model(self):
+        """Best model to use right now; never blocks on the network"""
+        self._maybe_refresh()
+        now = time.monotonic()
+
+        with self._lock:
+            candidates = [m for m in self.models if self._listed is None or m in self._listed]
+            rate_limited = []
+            for model in candidates:
+                until, reason = self._demoted.get(model, (0.0, None))
+                if until <= now:
+                    return model
+                if reason == 'rate_limited':
+                    rate_limited.append((until, model))
+
+        # Every model is cooling down from rate limits: use the one that frees up first
+        if rate_limited:
+            return min(rate_limited)[1]
+        return None
+
+    def report_success(self, model):
+        """Clear any demotion after a successful completion"""
+        with self._lock:
+            self._demoted.pop(model, None)
+
+    def report_failure(self, model, error):
+        """Demote `model` according to the error; returns the failure kind or None"""
+        message = str(error)
+        if 'decommissioned' in message or 'model_not_found' in message:
+            kind, cooldown = 'decommissioned', LLMConfig.DECOMMISSIONED_COOLDOWN_SECONDS
+        elif 'rate_limit' in message or getattr(error, 'status_code', None) == 429:
+            kind, cooldown = 'rate_limited', self.retry_after(error) or LLMConfig.RATE_LIMIT_COOLDOWN_SECONDS
+        else:
+            return None
+
+        with self._lock:
+            self._demoted[model] = (time.monotonic() + cooldown, kind)
+        print(f"Model {model} {kind}, demoted for {cooldown:.0f}s")
+        return kind
+
+    def status(self):
+        """Per-model availability for display and monitoring"""
+        now = time.monotonic()
+        with self._lock:
+            health = {}
+            for model in self.models:
+                until, reason = self._demoted.get(model, (0.0, None))
+                if self._listed is not None and model not in self._listed:
+                    health[model] = 'not_listed'
+                elif until > now:
+                    health[model] = reason
+                else:
+                    health[model] = 'available'
+            return {
+                'models': health,
+                'listing_age_seconds': round(now - self._listed_at, 1) if self._listed_at is not None else None
+            }
+
+    def _maybe_refresh(self):
+        """Start a background model listing when the cached one is stale"""
+        with self._lock:
+            fresh = self._listed_at is not None and time.monotonic() - self._listed_at < self.refresh_seconds
+            if self._refreshing or fresh:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name='groq-model-refresh', daemon=True).start()
+
+    def _refresh(self):
+        try:
+            client = self.client
+            if client is None:
+                return
+            listed = {model.id for model in client.models.list().data}
+            with self._lock:
+                self._listed = listed
+        except Exception as e:
+            # Keep the previous listing; failures are still caught per completion
+            print(f"Groq model listing failed: {str(e)[:80]}")
+        finally:
+            with self._lock:
+                self._listed_at = time.monotonic()
+                self._refreshing = False
+
+    @staticmethod
+    def retry_after(error):
+        """Seconds from the Retry-After header of a provider error, or None"""
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None) or {}
+        try:
+            return float(headers.get('retry-after'))
+        except (TypeError, ValueError):
+            return None
+
+
+# Process-wide registry shared by every AIAnalyzer instance
+model_registry = ModelRegistry()
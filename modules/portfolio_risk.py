@@ -0,0 +1,197 @@
+# Portfolio Risk Module
+# Vectorized portfolio risk metrics over aligned return matrices, with a shared covariance cache
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+from .config import CacheConfig
+
+
+class PortfolioRiskEngine:
+    """
+    Portfolio volatility, beta, VaR/CVaR and drawdown from one (dates x symbols) return matrix.
+
+    All metrics are matrix operations over the aligned returns, so cost grows
+    with the covariance (symbols^2) rather than with Python loops. The
+    covariance for a (universe, window, returns) triple is cached, so
+    reweighting the same universe skips the O(dates x symbols^2) product.
+    """
+
+    PERIODS_PER_YEAR = 252
+    MIN_COVERAGE = 0.8  # Share of the window a symbol must have prices for
+
+    def __init__(self, ttl_seconds=None, max_entries=None):
+        self.ttl_seconds = ttl_seconds or CacheConfig.COVARIANCE_TTL_SECONDS
+        self.max_entries = max_entries or CacheConfig.COVARIANCE_MAX_ENTRIES
+        self._covariances = OrderedDict()  # (universe, start, end, rows, digest) -> (created_at, covariance)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def align_returns(cls, close_frame):
+        """
+        Daily simple returns for a close DataFrame (index = dates, columns = symbols).
+
+        Symbols covering less than MIN_COVERAGE of the window are excluded. The
+        rest are aligned on their common window, which starts at the latest
+        first price among them (a recent listing shortens it for everyone);
+        gaps inside it (holidays on other exchanges, halts) are forward filled,
+        i.e. treated as zero-return days. Returns (returns frame, excluded
+        symbols, window), where window describes the requested and common
+        ranges and which symbols set the common start.
+        """
+        close_frame = close_frame.sort_index()
+        coverage = close_frame.notna().mean()
+        excluded = coverage.index[coverage < cls.MIN_COVERAGE].tolist()
+        prices = close_frame.drop(columns=excluded)
+
+        first_valid = prices.apply(lambda column: column.first_valid_index())
+        start = first_valid.max() if len(first_valid) else None
+        common = prices.loc[start:] if start is not None else prices.iloc[0:0]
+        returns = common.ffill().pct_change().iloc[1:]
+
+        window = {
+            "requested": [str(close_frame.index[0].date()), str(close_frame.index[-1].date())] if len(close_frame) else None,
+            "common": [str(returns.index[0].date()), str(returns.index[-1].date())] if len(returns) else None,
+            "limited_by": sorted(first_valid.index[first_valid == start].tolist()) if start is not None and start > close_frame.index[0] else [],
+            "dropped_dates": int(len(close_frame) - len(common))
+        }
+        return returns, excluded, window
+
+    def covariance(self, returns):
+        """Daily covariance of a returns frame, cached per (universe, window, returns digest)"""
+        universe = sorted(returns.columns)
+        # Same universe and dates can still carry different prices (a restated bar, a new fill)
+        digest = hashlib.sha1(np.ascontiguousarray(returns[universe].to_numpy(dtype=float)).tobytes()).hexdigest()
+        key = (tuple(universe), returns.index[0], returns.index[-1], len(returns), digest)
+        with self._lock:
+            entry = self._covariances.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+                self._covariances.move_to_end(key)
+                self.hits += 1
+                return entry[1].loc[returns.columns, returns.columns]
+            self.misses += 1
+
+        matrix = returns.to_numpy(dtype=float)
+        centered = matrix - matrix.mean(axis=0)
+        covariance = pd.DataFrame(
+            centered.T @ centered / (len(matrix) - 1),
+            index=returns.columns,
+            columns=returns.columns
+        )
+
+        with self._lock:
+            self._covariances[key] = (time.monotonic(), covariance)
+            self._covariances.move_to_end(key)
+            while len(self._covariances) > self.max_entries:
+                self._covariances.popitem(last=False)
+        return covariance
+
+    def analyze(self, close_frame, weights=None, benchmark_close=None, confidence=0.95):
+        """
+        Risk report for a weighted portfolio.
+
+        `weights` maps symbol -> weight (equal weights when omitted) and is
+        renormalized over the symbols that survive alignment. `benchmark_close`
+        is a close Series on the same calendar; beta is computed on the dates
+        both have prices for.
+        """
+        returns, excluded, window = self.align_returns(close_frame)
+        if len(returns) < 2 or returns.shape[1] == 0:
+            raise ValueError("Not enough overlapping price history to compute portfolio risk")
+
+        symbols = list(returns.columns)
+        if weights is None:
+            w = np.full(len(symbols), 1.0 / len(symbols))
+        else:
+            w = np.array([weights.get(symbol, 0.0) for symbol in symbols], dtype=float)
+            if w.sum() == 0:
+                raise ValueError("Weights sum to zero for the symbols with price history")
+            w = w / w.sum()
+
+        covariance = self.covariance(returns)
+        sigma = covariance.to_numpy()
+        std = np.sqrt(np.diag(sigma))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = np.clip(sigma / np.outer(std, std), -1.0, 1.0)
+
+        portfolio = returns.to_numpy() @ w
+        daily_variance = float(w @ sigma @ w)
+        daily_vol = np.sqrt(daily_variance)
+        # Each symbol's share of portfolio variance; sums to 1
+        contribution = w * (sigma @ w) / daily_variance if daily_variance > 0 else np.zeros_like(w)
+
+        wealth = np.cumprod(1.0 + portfolio)
+        drawdown = wealth / np.maximum.accumulate(wealth) - 1.0
+
+        report = {
+            "symbols": symbols,
+            "excluded_symbols": excluded,
+            "weights": dict(zip(symbols, np.round(w, 6).tolist())),
+            "observations": len(portfolio),
+            "window": window["common"],
+            "alignment": window,
+            "annualized_return": float(np.mean(portfolio) * self.PERIODS_PER_YEAR),
+            "annualized_volatility": float(daily_vol * np.sqrt(self.PERIODS_PER_YEAR)),
+            "max_drawdown": float(drawdown.min()),
+            "risk_contribution": dict(zip(symbols, np.round(contribution, 6).tolist())),
+            "value_at_risk": self._value_at_risk(portfolio, confidence),
+            "correlation_matrix": {
+                "symbols": symbols,
+                "values": np.round(np.nan_to_num(correlation), 4).tolist()
+            }
+        }
+
+        if benchmark_close is not None:
+            report["benchmark"] = self._benchmark_stats(returns.index, portfolio, benchmark_close)
+        return report
+
+    @staticmethod
+    def _value_at_risk(portfolio, confidence):
+        """One-day historical and parametric (normal) VaR and CVaR, as positive loss fractions"""
+        tail = 1.0 - confidence
+        cutoff = np.quantile(portfolio, tail)
+        losses = portfolio[portfolio <= cutoff]
+
+        mu = float(np.mean(portfolio))
+        sd = float(np.std(portfolio, ddof=1))
+        z = NormalDist().inv_cdf(tail)
+        return {
+            "confidence": confidence,
+            "historical_var": float(-cutoff),
+            "historical_cvar": float(-losses.mean()) if len(losses) else float(-cutoff),
+            "parametric_var": -(mu + z * sd),
+            "parametric_cvar": -(mu - sd * NormalDist().pdf(z) / tail)
+        }
+
+    @classmethod
+    def _benchmark_stats(cls, dates, portfolio, benchmark_close):
+        benchmark = benchmark_close.sort_index().ffill().pct_change().reindex(dates)
+        mask = benchmark.notna().to_numpy()
+        if mask.sum() < 2:
+            return {"beta": None, "correlation": None}
+
+        p, b = portfolio[mask], benchmark.to_numpy()[mask]
+        covariance = np.cov(p, b)
+        beta = covariance[0, 1] / covariance[1, 1] if covariance[1, 1] > 0 else None
+        return {
+            "beta": float(beta) if beta is not None else None,
+            "correlation": float(np.corrcoef(p, b)[0, 1]),
+            "annualized_return": float(np.mean(b) * cls.PERIODS_PER_YEAR),
+            "tracking_error": float(np.std(p - b, ddof=1) * np.sqrt(cls.PERIODS_PER_YEAR))
+        }
+
+    def stats(self):
+        """Covariance cache counters for monitoring"""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._covariances)}
+
+
+# Process-wide engine so the covariance cache is shared across requests
+portfolio_risk_engine = PortfolioRiskEngine()
@@ -0,0 +1,113 @@
+# Result Cache Module
+# Async request coalescing and TTL result cache with stale-while-revalidate
+
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class CoalescingResultCache:
+    """Shares one in-flight computation per key and caches completed results"""
+
+    def __init__(self, ttl_seconds, stale_seconds=0, max_entries=256):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()  # key -> (completed_at, value)
+        self._in_flight = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_compute(self, key, compute):
+        """
+        Return (value, cache_info) for `key`, calling the `compute` coroutine factory on a miss.
+
+        Fresh entries are returned directly. Entries inside the stale window
+        are returned immediately while one background refresh runs. Concurrent
+        misses for the same key await a single shared computation. Failures
+        are not cached and propagate to every waiter.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], self._info('hit', age)
+            if age < self.ttl_seconds + self.stale_seconds:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                if key not in self._in_flight:
+                    self._start(key, compute)
+                return entry[1], self._info('stale', age)
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            status = 'coalesced'
+        else:
+            self.misses += 1
+            task = self._start(key, compute)
+            status = 'miss'
+
+        # Shield so one disconnecting client does not cancel the shared computation
+        value = await asyncio.shield(task)
+        return value, self._info(status, 0.0)
+
+    def peek(self, key):
+        """Return the cached value if it is still fresh, without computing"""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+            return entry[1]
+        return None
+
+    def put(self, key, value):
+        """Store a value produced outside get_or_compute (e.g. an assembled stream)"""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when no key is given"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'size': len(self._entries),
+            'in_flight': len(self._in_flight)
+        }
+
+    def _start(self, key, compute):
+        task = asyncio.ensure_future(self._run(key, compute))
+        self._in_flight[key] = task
+        # Background refreshes may have no awaiter; mark their errors as retrieved
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _run(self, key, compute):
+        try:
+            value = await compute()
+            self.put(key, value)
+            return value
+        finally:
+            self._in_flight.pop(key, None)
+
+    def _info(self, status, age):
+        return {
+            'cache_hit': status in ('hit', 'stale', 'coalesced'),
+            'cache_status': status,
+            'cache_age_seconds': round(age, 3)
+        }
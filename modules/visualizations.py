@@ -1,26 +1,104 @@
 # Visualization Module
 # Handles chart creation and visual components
 
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import streamlit as st
 import pandas as pd
-from .config import UIConfig
+from .config import CacheConfig, UIConfig
 
 
 class ChartCreator:
     """Professional chart creation with dark theme"""
     
+    THEMES = {'dark': UIConfig.COLORS}
+    
+    # Coarser bar sizes tried in order until the chart fits the target bar count
+    RESAMPLE_RULES = [
+        ('weekly', pd.offsets.Week(weekday=4)),
+        ('monthly', pd.offsets.MonthEnd()),
+    ]
+    OHLC_AGGREGATION = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+    
+    _figure_cache = OrderedDict()  # (symbol, period, theme, overlays, data fingerprint) -> figure dict
+    _figure_lock = threading.Lock()
+    
+    @staticmethod
+    def decimate(data, indicators=None, target_bars=None):
+        """
+        Resample daily bars to weekly, then monthly, until at most `target_bars` remain.
+        
+        OHLC is aggregated so every bar keeps the true range of the days it
+        covers; indicators (computed on the daily series) take the value at
+        each bar's close. Returns (bars, indicators, bar size label).
+        """
+        target_bars = target_bars or UIConfig.CHART_TARGET_BARS
+        if len(data) <= target_bars:
+            return data, indicators, 'daily'
+        
+        aggregation = {column: how for column, how in ChartCreator.OHLC_AGGREGATION.items() if column in data}
+        for label, rule in ChartCreator.RESAMPLE_RULES:
+            bars = data.resample(rule).agg(aggregation).dropna(subset=['Close'])
+            if len(bars) <= target_bars:
+                break
+        
+        if indicators is not None and not indicators.empty:
+            indicators = indicators.resample(rule).last().reindex(bars.index)
+        return bars, indicators, label
+    
+    @staticmethod
+    def figure_dict(data, symbol, period, indicators=None, theme='dark'):
+        """
+        Plain-dict (decimated) chart for a symbol and period, cached per (symbol, period, theme, overlays).
+        
+        The key also carries the last bar and bar count, so new data produces
+        a new figure rather than a stale one. The dict holds only JSON types,
+        so st.plotly_chart can send it without rebuilding a Figure from JSON.
+        """
+        if data.empty:
+            return None
+        overlays = tuple(indicators.columns) if indicators is not None and not indicators.empty else ()
+        key = (symbol, period, theme, overlays, data.index[-1], len(data), float(data['Close'].iloc[-1]))
+        with ChartCreator._figure_lock:
+            figure = ChartCreator._figure_cache.get(key)
+            if figure is not None:
+                ChartCreator._figure_cache.move_to_end(key)
+                return figure
+        
+        fig = ChartCreator.create_dark_theme_chart(data, symbol, indicators, theme=theme)
+        if fig is None:
+            return None
+        figure = json.loads(pio.to_json(fig, validate=False))
+        
+        with ChartCreator._figure_lock:
+            ChartCreator._figure_cache[key] = figure
+            ChartCreator._figure_cache.move_to_end(key)
+            while len(ChartCreator._figure_cache) > CacheConfig.CHART_FIGURE_CACHE_MAX_ENTRIES:
+                ChartCreator._figure_cache.popitem(last=False)
+        return figure
+    
     @staticmethod
-    def create_dark_theme_chart(data, symbol):
-        """Create professional dark theme chart with geometric styling"""
+    def create_dark_theme_chart(data, symbol, indicators=None, theme='dark'):
+        """Create professional dark theme chart with geometric styling and indicator overlays"""
         try:
+            colors = ChartCreator.THEMES[theme]
+            data, indicators, bar_size = ChartCreator.decimate(data, indicators)
+            
             # Create subplots
             fig = make_subplots(
                 rows=2, cols=1,
                 shared_xaxes=True,
                 vertical_spacing=0.1,
-                subplot_titles=(f'{symbol} Price Movement', 'Volume Analysis'),
+                subplot_titles=(
+                    f'{symbol} Price Movement' + (f' ({bar_size} bars)' if bar_size != 'daily' else ''),
+                    'Volume Analysis'
+                ),
                 row_heights=[0.7, 0.3]
             )
             
@@ -33,24 +111,47 @@ class ChartCreator:
                     low=data['Low'],
                     close=data['Close'],
                     name=symbol,
-                    increasing_line_color=UIConfig.COLORS['accent_green'],
-                    decreasing_line_color=UIConfig.COLORS['accent_red'],
-                    increasing_fillcolor=UIConfig.COLORS['accent_green'],
-                    decreasing_fillcolor=UIConfig.COLORS['accent_red']
+                    increasing_line_color=colors['accent_green'],
+                    decreasing_line_color=colors['accent_red'],
+                    increasing_fillcolor=colors['accent_green'],
+                    decreasing_fillcolor=colors['accent_red']
                 ),
                 row=1, col=1
             )
             
+            # Moving average and Bollinger overlays from the indicator engine
+            if indicators is not None and not indicators.empty:
+                overlays = [
+                    ('sma_20', 'SMA 20', colors['accent_blue'], 'solid'),
+                    ('sma_50', 'SMA 50', colors['accent_orange'], 'solid'),
+                    ('bb_upper', 'BB Upper', colors['text_secondary'], 'dot'),
+                    ('bb_lower', 'BB Lower', colors['text_secondary'], 'dot'),
+                ]
+                for column, name, color, dash in overlays:
+                    fig.add_trace(
+                        go.Scatter(
+                            x=indicators.index,
+                            y=indicators[column],
+                            name=name,
+                            mode='lines',
+                            line={'color': color, 'width': 1, 'dash': dash}
+                        ),
+                        row=1, col=1
+                    )
+            
             # Volume chart with matching colors
-            colors = [UIConfig.COLORS['accent_red'] if close < open else UIConfig.COLORS['accent_green'] 
-                     for close, open in zip(data['Close'], data['Open'])]
+            volume_colors = np.where(
+                data['Close'].to_numpy() < data['Open'].to_numpy(),
+                colors['accent_red'],
+                colors['accent_green']
+            )
             
             fig.add_trace(
                 go.Bar(
                     x=data.index,
                     y=data['Volume'],
                     name='Volume',
-                    marker_color=colors,
+                    marker_color=volume_colors,
                     opacity=0.6
                 ),
                 row=2, col=1
@@ -60,12 +161,12 @@ class ChartCreator:
             fig.update_layout(
                 title={
                     'text': f'{symbol} Technical Analysis',
-                    'font': {'color': UIConfig.COLORS['text_primary'], 'size': 20, 'family': UIConfig.FONTS['primary']},
+                    'font': {'color': colors['text_primary'], 'size': 20, 'family': UIConfig.FONTS['primary']},
                     'x': 0.5
                 },
-                plot_bgcolor=UIConfig.COLORS['primary_bg'],
-                paper_bgcolor=UIConfig.COLORS['card_bg'],
-                font={'color': UIConfig.COLORS['text_primary'], 'family': UIConfig.FONTS['primary']},
+                plot_bgcolor=colors['primary_bg'],
+                paper_bgcolor=colors['card_bg'],
+                font={'color': colors['text_primary'], 'family': UIConfig.FONTS['primary']},
                 height=600,
                 showlegend=False,
                 xaxis_rangeslider_visible=False
@@ -75,18 +176,18 @@ class ChartCreator:
             fig.update_xaxes(
                 showgrid=True, 
                 gridwidth=1, 
-                gridcolor=UIConfig.COLORS['border_color'],
+                gridcolor=colors['border_color'],
                 showline=True,
-                linecolor=UIConfig.COLORS['border_color'],
-                color=UIConfig.COLORS['text_secondary']
+                linecolor=colors['border_color'],
+                color=colors['text_secondary']
             )
             fig.update_yaxes(
                 showgrid=True, 
                 gridwidth=1, 
-                gridcolor=UIConfig.COLORS['border_color'],
+                gridcolor=colors['border_color'],
                 showline=True,
-                linecolor=UIConfig.COLORS['border_color'],
-                color=UIConfig.COLORS['text_secondary']
+                linecolor=colors['border_color'],
+                color=colors['text_secondary']
             )
             
             return fig
@@ -2,19 +2,19 @@
 # Enterprise-grade financial intelligence with clean modular architecture
 
 import streamlit as st
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
 # Import modular components
 from modules import (
     AppConfig, 
-    DataFetcher, 
-    MetricsCalculator, 
-    AIAnalyzer,
     ChartCreator,
     DisplayManager,
+    EnrichmentPipeline,
     get_dark_theme_css
 )
+from modules import app_cache
 
 def setup_page():
     """Configure Streamlit page settings"""
@@ -84,38 +84,47 @@ def execute_analysis(symbol, period):
     progress_bar = st.progress(0)
     status_text = st.empty()
     
+    stage_timings = {}
+    
     try:
         # Step 1: Fetch stock data
         status_text.text("Fetching stock data...")
         progress_bar.progress(20)
         
-        stock_data = DataFetcher.get_stock_data(symbol, period)
+        t0 = time.perf_counter()
+        stock_data = app_cache.get_stock_data(symbol, period)
+        stage_timings['stock_data'] = {'status': 'ok' if stock_data['success'] else 'error',
+                                       'seconds': time.perf_counter() - t0}
         
         if not stock_data['success']:
             st.error(f"Failed to fetch data for {symbol}: {stock_data['error']}")
             return
         
-        # Step 2: Gather enhanced data
+        # Step 2: Gather enhanced data (independent sources run concurrently)
         progress_bar.progress(40)
         status_text.text("Gathering market intelligence...")
         
-        risk_free_rate = DataFetcher.fetch_risk_free_rate()
-        av_data = DataFetcher.fetch_alpha_vantage_fundamentals(symbol)
-        news_articles = DataFetcher.fetch_company_news(symbol)
+        enrichment = EnrichmentPipeline().run(app_cache.enrichment_sources(symbol))
+        risk_free_rate = enrichment['results']['risk_free_rate']
+        av_data = enrichment['results']['alpha_vantage']
+        news_articles = enrichment['results']['news']
+        stage_timings.update(enrichment['stages'])
         
         # Step 3: Process metrics and indicators
         progress_bar.progress(70)
         status_text.text("Processing analysis...")
         
-        enhanced_metrics = MetricsCalculator.get_enhanced_financial_metrics(
+        t0 = time.perf_counter()
+        enhanced_metrics = app_cache.get_enhanced_financial_metrics(
             stock_data, av_data, risk_free_rate
         )
-        technical_indicators = MetricsCalculator.calculate_technical_indicators(
-            stock_data['historical']
-        )
+        indicator_series, technical_indicators = app_cache.calculate_indicators(stock_data['historical'])
+        stage_timings['metrics'] = {'status': 'ok', 'seconds': time.perf_counter() - t0}
         
         # Step 4: Initialize AI analyzer
-        ai_analyzer = AIAnalyzer()
+        t0 = time.perf_counter()
+        ai_analyzer = app_cache.get_ai_analyzer()
+        stage_timings['ai_init'] = {'status': 'ok', 'seconds': time.perf_counter() - t0}
         
         progress_bar.progress(90)
         status_text.text("Finalizing analysis...")
@@ -124,6 +133,7 @@ def execute_analysis(symbol, period):
         DisplayManager.display_api_status_dashboard(
             ai_analyzer, av_data, news_articles
         )
+        DisplayManager.display_pipeline_timings(stage_timings, enrichment['elapsed'])
         
         # Create analysis tabs
         create_analysis_tabs(
@@ -132,7 +142,7 @@ def execute_analysis(symbol, period):
         )
         
         # Display chart
-        display_chart(stock_data, symbol)
+        display_chart(stock_data, symbol, period, indicator_series)
         
         progress_bar.progress(100)
         status_text.text("Analysis complete")
@@ -174,15 +184,15 @@ def create_analysis_tabs(stock_data, av_data, risk_free_rate, enhanced_metrics,
     with tab6:
         DisplayManager.display_company_profile(stock_data['info'], av_data)
 
-def display_chart(stock_data, symbol):
-    """Display technical chart"""
+def display_chart(stock_data, symbol, period, indicator_series=None):
+    """Display technical chart from the cached, decimated figure payload"""
     if not stock_data['historical'].empty:
         st.markdown('<div class="section-header">Technical Chart Analysis</div>', unsafe_allow_html=True)
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         
-        fig = ChartCreator.create_dark_theme_chart(stock_data['historical'], symbol)
-        if fig:
-            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+        figure = ChartCreator.figure_dict(stock_data['historical'], symbol, period, indicator_series)
+        if figure:
+            st.plotly_chart(figure, use_container_width=True, config={'displayModeBar': False})
         
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -208,13 +218,19 @@ def main():
     st.sidebar.markdown('<div class="section-header">Execution</div>', unsafe_allow_html=True)
     symbol, period = create_sidebar()
     
-    # Analysis execution
+    # Analysis execution; the executed symbol is kept so widget reruns re-render it from cache
     if st.sidebar.button("Execute Analysis", type="primary"):
         if symbol:
-            execute_analysis(symbol, period)
+            st.session_state['active_symbol'] = symbol
         else:
             st.sidebar.error("Please enter a trading symbol")
     
+    active_symbol = st.session_state.get('active_symbol')
+    if active_symbol:
+        if st.sidebar.button("Refresh Data", help="Refetch quotes, fundamentals and news"):
+            app_cache.refresh(active_symbol)
+        execute_analysis(active_symbol, period)
+    
     # Footer
     create_footer()
 